@@ -1,3 +1,6 @@
 from .axpositioning import PositioningAxes
+from .layout import LayoutBox, AxesLayout
+from .constraints import LayoutConstraints
 from .gui import adjust_figure_layout
-from .subplots import hsubplots, xyshared_plots
\ No newline at end of file
+from .subplots import hsubplots, xyshared_plots
+from .template import LayoutTemplate
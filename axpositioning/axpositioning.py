@@ -1,13 +1,21 @@
+from contextlib import contextmanager, ExitStack
 from matplotlib.axes import Axes
-from matplotlib.transforms import Bbox
+from matplotlib.transforms import BboxBase
+from .layout import LayoutBox, anchor_coefs
+from .metrics import FigureMetrics
 
 
 class PositioningAxes(Axes):
 
     """
     Class for editing axes position
+
+    the position geometry is delegated to a LayoutBox
     """
 
+    # bounds collected during a batch, None if not in a batch
+    _pending_bounds = None
+
     @classmethod
     def from_axes(cls, fig, a, **kwargs):
         return cls(fig, a.get_position().bounds, **kwargs)
@@ -19,42 +27,82 @@ class PositioningAxes(Axes):
 
     def set_anchor(self, a):
         """ensure tuple of anchor position and set using Axes.set_anchor"""
-        if a in Bbox.coefs:
-            a = Bbox.coefs[a]
-        self._anchor = a
+        self._anchor = anchor_coefs(a)
 
-    def split(self, ratio=0.5, spacing=0.1, wsplit=True):
-        anchor = self.get_anchor()
-        self.set_anchor('SW')
+    @contextmanager
+    def batch(self):
+        """
+        collect position changes and set the position only once at exit
+        the changes are discarded if an error is raised within the batch
+
+        >>>with ax.batch():
+        >>>    ax.x, ax.y, ax.w, ax.h = .5, .5, .2, .2
+        """
+        if self._pending_bounds is not None:
+            # nested batch, the outer batch sets the position
+            yield self
+            return
 
+        bounds = self._pending_bounds = self._position.bounds
+        anchor = self.get_anchor()
+        locked_aspect = self._locked_aspect
         try:
-            if wsplit:
-                pos, size = self.x, self.w
-            else:
-                pos, size = self.y, self.h
-
-            if spacing >= size:
-                raise ValueError('spacing too large, cannot split axes')
-
-            size1 = (size - spacing) * ratio
-            size2 = (size - spacing) * (1 - ratio)
-
-            pos2 = pos + size1 + spacing
-
-            if wsplit:
-                newbounds = (pos2, self.y, size2, self.h)
-                self.w = size1
-            else:
-                newbounds = (self.x, pos2, self.w, size2)
-                self.h = size1
-        finally:
+            yield self
+        except BaseException:
+            self._pending_bounds = None
             self.set_anchor(anchor)
+            self._locked_aspect = locked_aspect
+            raise
+        else:
+            newbounds, self._pending_bounds = self._pending_bounds, None
+            if newbounds != bounds:
+                self.set_position(newbounds)
+
+    def set_position(self, pos, which='both'):
+        """set the axes position, or collect it when in a batch"""
+        if self._pending_bounds is not None and which == 'both':
+            if isinstance(pos, BboxBase):
+                pos = pos.bounds
+            self._pending_bounds = tuple(map(float, pos))
+        else:
+            super(PositioningAxes, self).set_position(pos, which=which)
+
+    @property
+    def box(self):
+        """LayoutBox with the current geometry of the axes"""
+        return LayoutBox(self.bounds,
+                         anchor=self.get_anchor(),
+                         lock_aspect=self._locked_aspect,
+                         figaspect=self.figaspect)
 
+    def apply_box(self, box):
+        """set the bounds of the axes from a LayoutBox"""
+        self.bounds = box.bounds
+
+    def split(self, ratio=0.5, spacing=0.1, wsplit=True):
+        """
+        split the axes in two parts, or in multiple parts for a sequence of ratios
+        the axes is resized to the first part and the bounds of the other parts are returned
+        """
+        box = self.box
+        newbounds = box.split(ratio, spacing, wsplit=wsplit)
+        self.apply_box(box)
         return newbounds
 
+    def split_bounds(self, ratio=0.5, spacing=0.1, wsplit=True):
+        """(N, 4) array with the bounds of the axes split in N parts"""
+        return self.box.split_bounds(ratio, spacing, wsplit=wsplit)
+
+    def grid_bounds(self, shape, hspacing=0., vspacing=0., width_ratios=None, height_ratios=None):
+        """(rows, cols, 4) array with the bounds of the axes split in a grid"""
+        return self.box.grid_bounds(shape, hspacing, vspacing,
+                                    width_ratios=width_ratios, height_ratios=height_ratios)
+
     @property
     def bounds(self):
         """returns (xll, yll, w, h)"""
+        if self._pending_bounds is not None:
+            return self._pending_bounds
         return self._position.bounds
     @bounds.setter
     def bounds(self, v):
@@ -64,48 +112,44 @@ class PositioningAxes(Axes):
     @property
     def absolute_bounds(self):
         """screen coordinates of bounds"""
-        x, y, w, h = self.bounds
-        return self.rel2abs(x, 'x'), \
-               self.rel2abs(y, 'y'), \
-               self.rel2abs(w, 'w'), \
-               self.rel2abs(h, 'h')
+        return tuple(self.metrics.bounds_rel2abs(self.bounds))
 
     def x2xll(self, x):
         """convert x position to xll based on anchor"""
-        return x - self.w * self.get_anchor()[0]
+        return self.box.x2xll(x)
 
     def xll2x(self, xll):
         """convert xll to x position based on anchor"""
-        return xll + self.w * self.get_anchor()[0]
+        return self.box.xll2x(xll)
 
     def y2yll(self, y):
         """convert y position to yll based on anchor"""
-        return y - self.h * self.get_anchor()[1]
+        return self.box.y2yll(y)
 
     def yll2y(self, yll):
         """convert yll to y position based on anchor"""
-        return yll + self.h * self.get_anchor()[1]
+        return self.box.yll2y(yll)
 
     @property
     def x(self):
         """x position as xll corrected for the anchor"""
-        return self.xll2x(self.bounds[0])
+        return self.box.x
     @x.setter
     def x(self, x):
         """reset the bounds with a new x value"""
-        _, yll, w, h = self.bounds
-        xll = self.x2xll(x)
-        self.bounds = xll, yll, w, h
+        box = self.box
+        box.x = x
+        self.apply_box(box)
 
     @property
     def y(self):
-        return self.yll2y(self.bounds[1])
+        return self.box.y
     @y.setter
     def y(self, y):
         """reset the bounds with a new y value"""
-        xll, _, w, h = self.bounds
-        yll = self.y2yll(y)
-        self.bounds = xll, yll, w, h
+        box = self.box
+        box.y = y
+        self.apply_box(box)
 
     @property
     def w(self):
@@ -118,17 +162,9 @@ class PositioningAxes(Axes):
         the xll is corrected based on the anchor
         if the aspect ratio is locked, the height and yll are also adjusted
         """
-        xll, yll, w0, h = self.bounds
-
-        # adjust horizontal position based on anchor
-        xll += self.get_anchor()[0] * (w0 - w)
-
-        # adjust height if aspect is locked
-        if self._locked_aspect:
-            h0, h = h, w / self.axaspect
-            # adjust vertical position based on anchor
-            yll += self.get_anchor()[1] * (h0 - h)
-        self.bounds = xll, yll, w, h
+        box = self.box
+        box.w = w
+        self.apply_box(box)
 
     @property
     def h(self):
@@ -141,34 +177,29 @@ class PositioningAxes(Axes):
         the yll is corrected based on the anchor
         if the aspect ratio is locked, the width and xll are also adjusted
         """
-        xll, yll, w, h0 = self.bounds
+        box = self.box
+        box.h = h
+        self.apply_box(box)
 
-        # adjust vertical position based on anchor
-        yll += self.get_anchor()[1] * (h0 - h)
-
-        # adjust width if aspect is locked
-        if self._locked_aspect:
-            w0, w = w, h * self.axaspect
-            # adjust horizontal position based on anchor
-            xll += self.get_anchor()[0] * (w0 - w)
-        self.bounds = xll, yll, w, h
+    @property
+    def metrics(self):
+        """cached size and dpi metrics of the figure"""
+        return FigureMetrics.of(self.figure)
 
     @property
     def figaspect(self):
         """aspect ratio of the figure"""
-        fw, fh = self.figure.get_size_inches()
-        return fw/fh
+        return self.metrics.aspect
 
     @property
     def axaspect(self):
         """aspect ratio of the axes"""
-        return self.figaspect / self.aspect
+        return self.box.axaspect
 
     @property
     def aspect(self):
         """real aspect ratio of figure and axes together"""
-        _, _, aw, ah = self.bounds
-        return self.figaspect * (aw/ah)
+        return self.box.aspect
     @aspect.setter
     def aspect(self, v):
         self.set_aspect_ratio(v)
@@ -179,12 +210,9 @@ class PositioningAxes(Axes):
 
     def set_aspect_ratio(self, A, fix_height=False):
         """set the aspect ratio by adjusting width or height"""
-        axaspect = A / self.figaspect
-
-        if fix_height:
-            self.w = self.h * axaspect
-        else:
-            self.h = self.w / axaspect
+        box = self.box
+        box.set_aspect_ratio(A, fix_height=fix_height)
+        self.apply_box(box)
 
     def __repr__(self):
         return '<{} ({})>'.format(
@@ -198,25 +226,31 @@ class PositioningAxes(Axes):
         """
         # TODO: incorporate in __init__ using apply_anchor=True
         o = cls(fig, [x, y, w, h], anchor=anchor)
-        o.x, o.y, o.w, o.h = x, y, w, h
+        with o.batch():
+            o.x, o.y, o.w, o.h = x, y, w, h
         return o
 
+    @classmethod
+    def from_box(cls, fig, box, **kwargs):
+        """create axes from a LayoutBox"""
+        kwargs.setdefault('anchor', box.get_anchor())
+        kwargs.setdefault('lock_aspect', box.locked_aspect)
+        return cls(fig, box.bounds, **kwargs)
+
     def abs2rel(self, val, attr):
-        w, h = self.figure.get_size_inches()
-        dpi = self.figure.get_dpi()
-        if attr in ('w', 'x'):
-            return val / (w*dpi)
-        elif attr in ('h', 'y'):
-            return val / (h*dpi)
-        else:
-            return val
+        return self.metrics.abs2rel(val, attr)
 
     def rel2abs(self, val, attr):
-        w, h = self.figure.get_size_inches()
-        dpi = self.figure.get_dpi()
-        if attr in ('w', 'x'):
-            return val * w * dpi
-        elif attr in ('h', 'y'):
-            return val * h * dpi
-        else:
-            return val
+        return self.metrics.rel2abs(val, attr)
+
+
+@contextmanager
+def batch(axes):
+    """
+    batch the position changes of several PositioningAxes
+    each axes sets its position once at exit
+    """
+    with ExitStack() as stack:
+        for a in axes:
+            stack.enter_context(a.batch())
+        yield axes
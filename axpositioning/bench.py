@@ -0,0 +1,287 @@
+"""
+Microbenchmarks of the core geometry and subplot helpers
+
+run from the command line and optionally store the results as json
+to compare between releases
+
+python -m axpositioning.bench -o results.json
+python -m axpositioning.bench --quick -k hsubplots
+"""
+import argparse
+import datetime
+import itertools
+import json
+import platform
+import sys
+import timeit
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .axpositioning import PositioningAxes
+from .layout import LayoutBox, AxesLayout, split_bounds
+from .subplots import hsubplots, xyshared_plots
+from .template import LayoutTemplate
+
+
+# name: (factory, params, quick params)
+# the factory is called with the params and returns the function to time
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name, params=({},), quick=None):
+    """register a benchmark factory for a list of parameter sets"""
+    def decorator(fn):
+        BENCHMARKS[name] = (fn, list(params), list(params if quick is None else quick))
+        return fn
+    return decorator
+
+
+def random_bounds(n, seed=0):
+    rng = np.random.RandomState(seed)
+    return np.column_stack([rng.rand(n, 2) * .5, .1 + rng.rand(n, 2) * .4])
+
+
+def scatter_panel(ax, d):
+    r = ax.scatter(d['x'], d['y'], c=d['z'], lw=0)
+    ax.set_xlim(-.1, 1.1)
+    ax.set_ylim(-.1, 1.1)
+    return r
+
+
+def scatter_figure(axes, d):
+    for ax in axes:
+        scatter_panel(ax, d)
+
+
+# ---------------
+# PositioningAxes
+# ---------------
+
+@benchmark('PositioningAxes.__init__')
+def bench_axes_init():
+    fig = Figure(figsize=(6, 4))
+    return lambda: PositioningAxes(fig, (.1, .1, .8, .8), anchor='C')
+
+
+@benchmark('PositioningAxes.setters', params=[dict(anchor='C'), dict(anchor='SW')])
+def bench_axes_setters(anchor):
+    fig = Figure(figsize=(6, 4))
+    a = PositioningAxes(fig, (.1, .1, .8, .8), anchor=anchor)
+
+    def run():
+        a.x, a.y, a.w, a.h = .5, .5, .4, .4
+    return run
+
+
+@benchmark('PositioningAxes.batch')
+def bench_axes_batch():
+    fig = Figure(figsize=(6, 4))
+    a = PositioningAxes(fig, (.1, .1, .8, .8), anchor='C')
+
+    def run():
+        with a.batch():
+            a.x, a.y, a.w, a.h = .5, .5, .4, .4
+    return run
+
+
+@benchmark('PositioningAxes.split')
+def bench_axes_split():
+    fig = Figure(figsize=(6, 4))
+    a = PositioningAxes(fig, (.1, .1, .8, .8), anchor='C')
+
+    def run():
+        a.bounds = (.1, .1, .8, .8)
+        a.split(.5, .1)
+    return run
+
+
+@benchmark('PositioningAxes.rel2abs')
+def bench_axes_rel2abs():
+    fig = Figure(figsize=(6, 4))
+    a = PositioningAxes(fig, (.1, .1, .8, .8))
+
+    def run():
+        return a.rel2abs(.5, 'x'), a.rel2abs(.5, 'y'), a.absolute_bounds
+    return run
+
+
+# ------------------------
+# LayoutBox and AxesLayout
+# ------------------------
+
+@benchmark('LayoutBox.setters')
+def bench_box_setters():
+    b = LayoutBox((.1, .1, .8, .8), anchor='C')
+
+    def run():
+        b.x, b.y, b.w, b.h = .5, .5, .4, .4
+    return run
+
+
+@benchmark('AxesLayout.setters', params=[dict(n=10), dict(n=1000)], quick=[dict(n=10)])
+def bench_layout_setters(n):
+    layout = AxesLayout(random_bounds(n), anchor='C', lock_aspect=True)
+
+    def run():
+        layout.x, layout.y, layout.w, layout.h = .5, .5, .4, .4
+    return run
+
+
+@benchmark('split_bounds', params=[dict(n=1, parts=2), dict(n=100, parts=8)], quick=[dict(n=1, parts=2)])
+def bench_split_bounds(n, parts):
+    bounds = random_bounds(n)
+    ratios = np.ones(parts)
+    return lambda: split_bounds(bounds, ratios, .001)
+
+
+# -------------
+# subplot tools
+# -------------
+
+@benchmark('hsubplots',
+           params=[dict(shape=(1, 1)), dict(shape=(10, 10)), dict(shape=(100, 100))],
+           quick=[dict(shape=(1, 1)), dict(shape=(10, 10))])
+def bench_hsubplots(shape):
+    return lambda: hsubplots(10, shape, hpad=.001, vpad=.001, box=(.05, .05, .95, .95))
+
+
+@benchmark('xyshared_plots',
+           params=[dict(shape=(3, 3), points=1000), dict(shape=(6, 6), points=1000)],
+           quick=[dict(shape=(2, 2), points=100)])
+def bench_xyshared_plots(shape, points):
+    """includes creating the figure and axes"""
+    m, n = shape
+    figsize, positions = hsubplots(10, shape, hpad=.01, vpad=.01, box=(.08, .07, .9, .95))
+    rng = np.random.RandomState(0)
+    datasets = [dict(x=rng.rand(points), y=rng.rand(points), z=rng.rand(points))
+                for _ in range(m * n)]
+
+    def run():
+        fig = Figure(figsize=figsize)
+        axes = [fig.add_axes(pos) for pos in positions.reshape(-1, 4)]
+        xyshared_plots(shape, axes, datasets, scatter_panel, 'x', 'y')
+    return run
+
+
+# ----------------
+# figure templates
+# ----------------
+
+def _figure_datasets(points, count=4):
+    rng = np.random.RandomState(0)
+    return [dict(x=rng.rand(points), y=rng.rand(points), z=rng.rand(points))
+            for _ in range(count)]
+
+
+@benchmark('figures.rebuild',
+           params=[dict(shape=(2, 2), points=100), dict(shape=(6, 6), points=100)],
+           quick=[dict(shape=(2, 2), points=10)])
+def bench_figures_rebuild(shape, points):
+    """one figure per dataset by creating the figure and axes and drawing"""
+    figsize, positions = hsubplots(6, shape, hpad=.01, vpad=.01, box=(.08, .07, .95, .95))
+    datasets = itertools.cycle(_figure_datasets(points))
+
+    def run():
+        fig = Figure(figsize=figsize, dpi=50)
+        canvas = FigureCanvasAgg(fig)
+        scatter_figure([fig.add_axes(pos) for pos in positions.reshape(-1, 4)], next(datasets))
+        canvas.draw()
+    return run
+
+
+@benchmark('figures.template',
+           params=[dict(shape=(2, 2), points=100), dict(shape=(6, 6), points=100)],
+           quick=[dict(shape=(2, 2), points=10)])
+def bench_figures_template(shape, points):
+    """one figure per dataset by reusing a LayoutTemplate and drawing"""
+    figsize, positions = hsubplots(6, shape, hpad=.01, vpad=.01, box=(.08, .07, .95, .95))
+    datasets = itertools.cycle(_figure_datasets(points))
+    template = LayoutTemplate.from_hsubplots(figsize, positions, dpi=50)
+
+    def run():
+        template.plot(scatter_figure, next(datasets)).canvas.draw()
+    return run
+
+
+# ------
+# runner
+# ------
+
+def time_function(fn, repeat=5, number=None):
+    """
+    time a function with timeit
+    the number of calls per repeat is determined with Timer.autorange if not given
+    :return: number of calls per repeat, list of timings
+    """
+    timer = timeit.Timer(fn)
+    if number is None:
+        number, _ = timer.autorange()
+    times = timer.repeat(repeat=repeat, number=number)
+    return number, times
+
+
+def run(names=None, quick=False, repeat=5, verbose=False):
+    """
+    run the registered benchmarks
+    :param names: substrings of the benchmark names to run (all by default)
+    :param quick: use the small parameter sets and call each function once
+    :return: dict with environment info and a list of results
+    """
+    number = None
+    if quick:
+        repeat, number = 1, 1
+
+    results = []
+    for name, (factory, params, quick_params) in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        for p in (quick_params if quick else params):
+            calls, times = time_function(factory(**p), repeat=repeat, number=number)
+            per_call = [t / calls for t in times]
+            result = OrderedDict(
+                name=name,
+                params={k: list(v) if isinstance(v, tuple) else v for k, v in p.items()},
+                number=calls,
+                repeat=repeat,
+                best=min(per_call),
+                mean=sum(per_call) / len(per_call),
+                per_second=1 / min(per_call))
+            results.append(result)
+            if verbose:
+                print('{:<30} {:<30} {:>12.3f} us'.format(
+                    name, format_params(p), result['best'] * 1e6))
+
+    return OrderedDict(
+        created=datetime.datetime.now().isoformat(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        numpy=np.__version__,
+        matplotlib=matplotlib.__version__,
+        results=results)
+
+
+def format_params(p):
+    return ', '.join('{}={}'.format(k, v) for k, v in p.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m axpositioning.bench')
+    parser.add_argument('-o', '--output', help='json file to write the results to')
+    parser.add_argument('-k', dest='names', action='append', help='run benchmarks matching this name')
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='small sizes and a single repeat')
+    args = parser.parse_args(argv)
+
+    data = run(names=args.names, quick=args.quick, repeat=args.repeat, verbose=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+    return data
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,236 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+import numpy as np
+
+
+_missing = object()
+
+
+class LayoutCache(object):
+
+    """
+    Cache of pure layout computations
+
+    results are stored by a stable hash of the function name and parameters
+    in a bounded in-memory LRU and optionally in a directory of npz files,
+    which can be shared between processes. results are nested tuples or lists
+    of numbers and arrays (e.g. the figsize and positions of hsubplots), and
+    copies are returned so that callers can modify them.
+
+    >>>cache = LayoutCache(maxsize=256, directory='~/.cache/axpositioning')
+    >>>cached_hsubplots = cache.memoize(hsubplots)
+    >>>figsize, positions = cached_hsubplots(10, (3, 3), hpad=.01, vpad=.01)
+    >>>cache.stats()
+    {'hits': 0, 'misses': 1, 'disk_hits': 0, 'evictions': 0, 'disk_evictions': 0, 'size': 1}
+    """
+
+    def __init__(self, maxsize=128, directory=None, maxfiles=None):
+        """
+        :param maxsize: maximum number of results in memory
+        :param directory: directory to store results as npz files, no disk cache if None
+        :param maxfiles: maximum number of files in the directory, the least recently
+                         used files are removed (unbounded if None)
+        """
+        self.maxsize = maxsize
+        self.directory = None if directory is None else os.path.expanduser(directory)
+        self.maxfiles = maxfiles
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(name, *args, **kwargs):
+        """stable hash of a function name and its parameters"""
+        data = json.dumps([name, _canonical(args), _canonical(kwargs)], sort_keys=True)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data or (self.directory is not None and os.path.exists(self._path(key)))
+
+    def get(self, key, default=None):
+        """cached value of a key, default if not in the cache"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            value = self._load(key)
+            if value is None:
+                self.misses += 1
+                return default
+            self.disk_hits += 1
+            self._store(key, value)
+        else:
+            self._data.move_to_end(key)
+        self.hits += 1
+        return _copy(value)
+
+    def set(self, key, value):
+        """store a value in memory and on disk"""
+        value = _copy(value)
+        self._store(key, value)
+        if self.directory is not None:
+            self._dump(key, value)
+
+    def _store(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self, disk=False):
+        """clear the memory cache and optionally remove the files on disk"""
+        self._data.clear()
+        if disk and self.directory is not None:
+            for fname in self._files():
+                os.remove(fname)
+
+    def stats(self):
+        """hit (including disk hits) and miss counts and the number of results in memory"""
+        return dict(hits=self.hits,
+                    misses=self.misses,
+                    disk_hits=self.disk_hits,
+                    evictions=self.evictions,
+                    disk_evictions=self.disk_evictions,
+                    size=len(self._data))
+
+    def memoize(self, fn, name=None):
+        """
+        wrap a pure function to cache its results
+        the parameters must be numbers, strings, None, arrays or sequences of those
+        """
+        if name is None:
+            name = '{}.{}'.format(fn.__module__, fn.__qualname__)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = self.key(name, *args, **kwargs)
+            value = self.get(key, _missing)
+            if value is _missing:
+                value = fn(*args, **kwargs)
+                self.set(key, value)
+            return value
+        wrapper.cache = self
+        return wrapper
+
+    # ----
+    # disk
+    # ----
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _files(self):
+        return [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith('.npz')]
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                leaves = [f['leaf{}'.format(i)] for i in range(int(f['count']))]
+                structure = json.loads(str(f['structure']))
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            # missing, evicted or partially written by another process
+            return None
+        return _unflatten(structure, iter(leaves))
+
+    def _dump(self, key, value):
+        leaves = []
+        structure = _flatten(value, leaves)
+        arrays = {'leaf{}'.format(i): leaf for i, leaf in enumerate(leaves)}
+
+        # write to a temporary file first so that other processes never read partial files
+        fd, tmp = tempfile.mkstemp(suffix='.npz', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, structure=json.dumps(structure), count=len(leaves), **arrays)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._evict_files()
+
+    def _evict_files(self):
+        if self.maxfiles is None:
+            return
+        files = self._files()
+        if len(files) <= self.maxfiles:
+            return
+        mtimes = []
+        for fname in files:
+            try:
+                mtimes.append((os.path.getmtime(fname), fname))
+            except OSError:
+                pass
+        mtimes.sort()
+        for _, fname in mtimes[:len(mtimes) - self.maxfiles]:
+            try:
+                os.remove(fname)
+                self.disk_evictions += 1
+            except OSError:
+                pass
+
+    def __repr__(self):
+        return '<{} size={}/{} directory={!r}>'.format(
+            self.__class__.__qualname__, len(self._data), self.maxsize, self.directory)
+
+
+def _canonical(obj):
+    """json serializable representation of parameters"""
+    if isinstance(obj, np.ndarray):
+        return dict(dtype=obj.dtype.str, shape=obj.shape, data=obj.ravel().tolist())
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    elif isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    elif isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    elif obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    raise TypeError('cannot cache parameter of type {}'.format(type(obj).__name__))
+
+
+def _copy(value):
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    elif isinstance(value, (list, tuple)):
+        return type(value)(_copy(v) for v in value)
+    return value
+
+
+def _flatten(value, leaves):
+    """structure of a nested value, appending the arrays and numbers to leaves"""
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__, [_flatten(v, leaves) for v in value]]
+    elif isinstance(value, np.ndarray):
+        leaves.append(value)
+        return 'array'
+    elif isinstance(value, (bool, int, float, np.generic)):
+        leaves.append(np.asarray(value))
+        return 'scalar'
+    raise TypeError('cannot cache result of type {}'.format(type(value).__name__))
+
+
+def _unflatten(structure, leaves):
+    if structure == 'array':
+        return next(leaves)
+    elif structure == 'scalar':
+        return next(leaves).item()
+    kind, items = structure
+    values = [_unflatten(s, leaves) for s in items]
+    return tuple(values) if kind == 'tuple' else values
@@ -0,0 +1,281 @@
+from collections.abc import Mapping
+import numpy as np
+from matplotlib.axes import Axes
+from .layout import AxesLayout, anchor_array
+from .metrics import FigureMetrics
+
+
+# attribute: (position column, size coefficient); None means the anchor of the axes
+EDGES = dict(
+    left=(0, 0.),
+    right=(0, 1.),
+    center=(0, .5),
+    bottom=(1, 0.),
+    top=(1, 1.),
+    middle=(1, .5),
+    x=(0, None),
+    y=(1, None))
+
+SIZES = dict(w=2, h=3)
+
+
+class LayoutConstraints(object):
+
+    """
+    Declarative constraints on the positions of a set of axes
+
+    relations between axes are declared first and all bounds are solved at
+    once as the smallest change to the current bounds that satisfies the
+    relations (equality constrained least squares). containment in a box and
+    a minimum width and height are handled by an active set of box edges that
+    are treated as equalities.
+
+    axes can be a mapping of names to axes (e.g. an AxesSet), a sequence of
+    axes or bounds, or an AxesLayout. axes are referred to by name or index.
+
+    >>>c = LayoutConstraints(axes)
+    >>>c.align(['A', 'B'], 'left')
+    >>>c.equal(['A', 'B', 'C'], 'w')
+    >>>c.gap('A', 'C', .3)  # inches
+    >>>c.contain(['A', 'B', 'C'], (.05, .05, .95, .95))
+    >>>c.apply()
+    """
+
+    def __init__(self, axes, figsize=None, anchor='C'):
+        if isinstance(axes, Mapping):
+            self.names = list(axes.keys())
+            items = list(axes.values())
+        elif isinstance(axes, AxesLayout):
+            self.names = None
+            items = axes
+        else:
+            self.names = None
+            items = list(axes)
+        self.axes = items
+
+        if isinstance(items, AxesLayout):
+            bounds = items.bounds
+            anchors = items.anchors
+        else:
+            bounds = [a.get_position().bounds if isinstance(a, Axes) else a for a in items]
+            anchors = [a.get_anchor() if isinstance(a, Axes) else anchor for a in items]
+        self.bounds = np.array(bounds, dtype=float).reshape(-1, 4)
+        self.anchors = anchor_array(anchors, len(self.bounds)) if len(self.bounds) else np.empty((0, 2))
+
+        if figsize is None:
+            figsize = self._figsize(items)
+        self.figsize = figsize
+
+        # linear relations as lists of [(column, coefficient)], right hand sides
+        # and a description of the constraint each relation comes from
+        self._eq = []
+        self._eq_rhs = []
+        self._eq_labels = []
+        self._ineq = []
+        self._ineq_rhs = []
+        self._ineq_labels = []
+
+    @staticmethod
+    def _figsize(items):
+        for a in items:
+            if isinstance(a, Axes):
+                return FigureMetrics.of(a.figure).size
+        return None
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def index(self, item):
+        """row index of an axes name or index"""
+        if self.names is not None and not isinstance(item, (int, np.integer)):
+            return self.names.index(item)
+        return int(item)
+
+    def _label(self, i):
+        """name of the axes at row i, or the index"""
+        return i if self.names is None else self.names[i]
+
+    def _terms(self, item, attr):
+        """linear terms [(column, coefficient)] of an edge or size of an axes"""
+        i = self.index(item)
+        if attr in SIZES:
+            return [(4 * i + SIZES[attr], 1.)]
+        try:
+            dim, c = EDGES[attr]
+        except KeyError:
+            raise ValueError('unknown attribute {!r}'.format(attr))
+        if c is None:
+            c = self.anchors[i, dim]
+        return [(4 * i + dim, 1.), (4 * i + dim + 2, c)]
+
+    def _add(self, terms, rhs, label, inequality=False):
+        if inequality:
+            self._ineq.append(terms)
+            self._ineq_rhs.append(rhs)
+            self._ineq_labels.append(label)
+        else:
+            self._eq.append(terms)
+            self._eq_rhs.append(rhs)
+            self._eq_labels.append(label)
+        return self
+
+    def _scale(self, dim):
+        if self.figsize is None:
+            raise ValueError('figsize is required for absolute sizes')
+        return self.figsize[dim]
+
+    # -----------
+    # constraints
+    # -----------
+
+    def fix(self, item, attr, value):
+        """fix an edge (left, right, center, bottom, top, middle, x, y) or size (w, h)"""
+        return self._add(self._terms(item, attr), value, 'fix({!r}, {!r}, {!r})'.format(item, attr, value))
+
+    def equal(self, items, attr):
+        """make an edge or size equal for all items"""
+        items = list(items)
+        for a, b in zip(items[:-1], items[1:]):
+            terms = self._terms(a, attr) + [(col, -c) for col, c in self._terms(b, attr)]
+            self._add(terms, 0., 'equal([{!r}, {!r}], {!r})'.format(a, b, attr))
+        return self
+
+    def align(self, items, edge='left'):
+        """align the edges of all items"""
+        return self.equal(items, edge)
+
+    def equal_width(self, items):
+        return self.equal(items, 'w')
+
+    def equal_height(self, items):
+        return self.equal(items, 'h')
+
+    def gap(self, a, b, size, horizontal=True, relative=False):
+        """
+        fixed spacing between two axes
+        b is right of (horizontal) or above a
+        the size is in inches unless relative is True
+        """
+        if horizontal:
+            dim, start, end = 0, 'right', 'left'
+        else:
+            dim, start, end = 1, 'top', 'bottom'
+        label = 'gap({!r}, {!r}, {!r})'.format(a, b, size)
+        if not relative:
+            size = size / self._scale(dim)
+        terms = self._terms(b, end) + [(col, -c) for col, c in self._terms(a, start)]
+        return self._add(terms, size, label)
+
+    def aspect(self, items, A=None):
+        """
+        lock the real aspect ratio of items
+        the current aspect of each axes is kept if A is None
+        """
+        if isinstance(items, (str, int, np.integer)):
+            items = [items]
+        figaspect = self._scale(0) / self._scale(1)
+        for item in items:
+            i = self.index(item)
+            _, _, w, h = self.bounds[i]
+            A_i = figaspect * w / h if A is None else A
+            self._add([(4 * i + 2, figaspect), (4 * i + 3, -A_i)], 0.,
+                      'aspect({!r}, {!r})'.format(item, A))
+        return self
+
+    def contain(self, items, box=(0, 0, 1, 1)):
+        """keep items within a box of (xll, yll, xur, yur)"""
+        x0, y0, x1, y1 = box
+        for item in items:
+            label = 'contain({!r}, {!r})'.format(item, tuple(box))
+            self._add([(col, -c) for col, c in self._terms(item, 'left')], -x0, label, inequality=True)
+            self._add([(col, -c) for col, c in self._terms(item, 'bottom')], -y0, label, inequality=True)
+            self._add(self._terms(item, 'right'), x1, label, inequality=True)
+            self._add(self._terms(item, 'top'), y1, label, inequality=True)
+        return self
+
+    # -------
+    # solving
+    # -------
+
+    def _matrix(self, rows):
+        A = np.zeros((len(rows), 4 * len(self)))
+        for r, terms in enumerate(rows):
+            cols, coefs = zip(*terms)
+            np.add.at(A[r], list(cols), coefs)
+        return A
+
+    def solve(self, tol=1e-9, min_size=1e-3):
+        """
+        solve the constraints
+        :param min_size: minimum width and height of the axes (relative to the figure)
+        :return: (N, 4) array of bounds
+        :raises ValueError: if the constraints are contradictory or cannot be met within the box
+        """
+        x0 = self.bounds.ravel()
+        A = self._matrix(self._eq)
+        b = np.array(self._eq_rhs, dtype=float)
+
+        # implicit -w <= -min_size and -h <= -min_size for each axes
+        sizes = [[(4 * i + j, -1.)] for i in range(len(self)) for j in (2, 3)]
+        G = self._matrix(self._ineq + sizes)
+        g = np.concatenate([self._ineq_rhs, np.full(len(sizes), -min_size)])
+        labels = self._ineq_labels + ['positive size of {!r}'.format(self._label(i))
+                                      for i in range(len(self)) for _ in (2, 3)]
+
+        x = _project(x0, A, b, G, g, tol, batch=True)
+        if np.abs(A @ x - b).max(initial=0) > tol or (G @ x - g).max(initial=0) > tol:
+            # violated box edges added at once can end in a conflicting active set,
+            # which adding them one at a time avoids
+            x = _project(x0, A, b, G, g, tol, batch=False)
+
+        # a least squares compromise (or running out of iterations) leaves residuals
+        conflicts = [self._eq_labels[i] for i in np.flatnonzero(np.abs(A @ x - b) > tol)]
+        conflicts += [labels[i] for i in np.flatnonzero(G @ x - g > tol)]
+        if conflicts:
+            raise ValueError('constraints cannot be satisfied: {}'.format(
+                ', '.join(dict.fromkeys(conflicts))))
+        return x.reshape(-1, 4)
+
+    def apply(self, tol=1e-9, min_size=1e-3):
+        """solve the constraints and set the bounds of the axes"""
+        bounds = self.solve(tol=tol, min_size=min_size)
+        if isinstance(self.axes, AxesLayout):
+            self.axes.bounds[:] = bounds
+        else:
+            for a, bnd in zip(self.axes, bounds):
+                if isinstance(a, Axes):
+                    a.set_position(tuple(bnd))
+        self.bounds = bounds
+        return bounds
+
+
+def _project(x0, A, b, G, g, tol, batch=True):
+    """
+    projection of x0 onto A x = b and G x <= g with an active set of inequalities
+    all violated inequalities are added at once if batch is True, else the most violated
+    """
+    active = np.zeros(len(G), dtype=bool)
+    for _ in range(2 * len(G) + 1):
+        Aa = np.vstack([A, G[active]])
+        ba = np.concatenate([b, g[active]])
+
+        # projection of x0 onto Aa x = ba, which minimizes |x - x0|^2:
+        # x = x0 - Aa.T l with (Aa Aa.T) l = Aa x0 - ba
+        l = np.linalg.lstsq(Aa @ Aa.T, Aa @ x0 - ba, rcond=None)[0]
+        x = x0 - Aa.T @ l
+
+        # release the active box edge that pulls the solution inwards
+        multipliers = l[len(A):]
+        if len(multipliers) and multipliers.min() < -tol:
+            active[np.flatnonzero(active)[multipliers.argmin()]] = False
+            continue
+
+        # add the violated box edges
+        violation = np.where(active, 0, G @ x - g)
+        if violation.max(initial=0) <= tol:
+            break
+        if batch:
+            active |= violation > tol
+        else:
+            active[violation.argmax()] = True
+    return x
@@ -0,0 +1,168 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.patches import Rectangle
+
+
+def grab_edges(box, x, y, tol):
+    """
+    edges of a box that are grabbed at a point inside the box
+    :param box: (xll, yll, w, h) of the box
+    :param tol: distance from the edges within which they are grabbed
+    :return: string of the grabbed edges ('l', 'r', 'b', 't'), empty to move the box
+    """
+    x0, y0, w, h = box
+    x1, y1 = x0 + w, y0 + h
+    edges = ''
+    # the nearest edge is grabbed in boxes smaller than twice the tolerance
+    if x - x0 < tol and x - x0 <= x1 - x:
+        edges += 'l'
+    elif x1 - x < tol:
+        edges += 'r'
+    if y - y0 < tol and y - y0 <= y1 - y:
+        edges += 'b'
+    elif y1 - y < tol:
+        edges += 't'
+    return edges
+
+
+class AxesDrag(object):
+
+    """
+    Move or resize of a box by dragging it from a point
+
+    the new bounds are computed from the start bounds and the distance to
+    the start point, so the box follows the mouse without accumulating errors.
+    all coordinates are relative figure coordinates
+
+    >>>drag = AxesDrag('A', (.1, .1, .3, .3), .2, .2, edges='r')
+    >>>drag.bounds_at(.3, .25)
+    (0.1, 0.1, 0.4, 0.3)
+    """
+
+    def __init__(self, name, bounds, x, y, edges='', min_size=(0., 0.)):
+        """
+        :param name: name of the dragged axes
+        :param bounds: (xll, yll, w, h) at the start of the drag
+        :param x, y: start point
+        :param edges: edges to move (see grab_edges), the box is moved if empty
+        :param min_size: minimum width and height when resizing
+        """
+        self.name = name
+        self.start_bounds = tuple(map(float, bounds))
+        self.start = x, y
+        self.edges = edges
+        self.min_size = min_size
+
+    @property
+    def resizing(self):
+        return bool(self.edges)
+
+    def bounds_at(self, x, y, snapping=None, tol=(0., 0.)):
+        """
+        bounds of the box with the mouse at a point
+        :param snapping: SnapIndex with the edges and centers of the other axes
+        :param tol: snapping tolerance in the x and y direction
+        """
+        x0, y0, w, h = self.start_bounds
+        dx, dy = x - self.start[0], y - self.start[1]
+
+        if not self.resizing:
+            x0, y0 = x0 + dx, y0 + dy
+            if snapping is not None:
+                x0 += snapping.snap_offset((x0, x0 + w / 2, x0 + w), 'x', tol[0], exclude=self.name)
+                y0 += snapping.snap_offset((y0, y0 + h / 2, y0 + h), 'y', tol[1], exclude=self.name)
+            return x0, y0, w, h
+
+        x1, y1 = x0 + w, y0 + h
+        mw, mh = self.min_size
+        if 'l' in self.edges:
+            x0 = self._snap(min(x0 + dx, x1 - mw), 'x', snapping, tol[0], hi=x1 - mw)
+        elif 'r' in self.edges:
+            x1 = self._snap(max(x1 + dx, x0 + mw), 'x', snapping, tol[0], lo=x0 + mw)
+        if 'b' in self.edges:
+            y0 = self._snap(min(y0 + dy, y1 - mh), 'y', snapping, tol[1], hi=y1 - mh)
+        elif 't' in self.edges:
+            y1 = self._snap(max(y1 + dy, y0 + mh), 'y', snapping, tol[1], lo=y0 + mh)
+        return x0, y0, x1 - x0, y1 - y0
+
+    def _snap(self, v, dim, snapping, tol, lo=-np.inf, hi=np.inf):
+        """snap a moving edge within the limits of the minimum size"""
+        if snapping is None:
+            return v
+        t = snapping.nearest(v, dim, tol, exclude=self.name)
+        if t is None or not lo <= t <= hi:
+            return v
+        return t
+
+
+class DragPreview(object):
+
+    """
+    Blitted preview of a dragged box and its guide lines
+
+    the canvas is rendered once without the dragged axes and stored as
+    background. on each update only the background is restored and the
+    box and guide lines are drawn on top of it
+    """
+
+    def __init__(self, canvas, color=(.2, .2, .8), gcolor='g'):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.color = color
+        self.gcolor = gcolor
+        self.background = None
+        self.box = None
+        self.lines = None
+        self.hidden = []
+
+    def start(self, hidden=()):
+        """
+        render the background and add the animated artists
+        :param hidden: artists that are hidden during the drag
+        """
+        fig = self.figure
+        self.hidden = [a for a in hidden if a.get_visible()]
+        for a in self.hidden:
+            a.set_visible(False)
+
+        self.box = Rectangle((0, 0), 0, 0,
+                             transform=fig.transFigure,
+                             facecolor='none',
+                             edgecolor=self.color,
+                             linewidth=2,
+                             animated=True)
+        self.lines = LineCollection([], colors=self.gcolor, linewidths=1, linestyles='--',
+                                    transform=fig.transFigure, clip_on=False, animated=True)
+        fig.add_artist(self.box)
+        fig.add_artist(self.lines)
+
+        # animated artists are excluded from the full draw
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(fig.bbox)
+
+    def update(self, bounds):
+        """redraw the box and guides at new bounds"""
+        if self.background is None:
+            return
+        x0, y0, w, h = bounds
+        self.box.set_bounds(x0, y0, w, h)
+        self.lines.set_segments([
+            [(x0, 0), (x0, 1)],
+            [(x0 + w, 0), (x0 + w, 1)],
+            [(0, y0), (1, y0)],
+            [(0, y0 + h), (1, y0 + h)]])
+
+        self.canvas.restore_region(self.background)
+        self.figure.draw_artist(self.lines)
+        self.figure.draw_artist(self.box)
+        self.canvas.blit(self.figure.bbox)
+
+    def stop(self):
+        """remove the preview and show the hidden artists again"""
+        for artist in (self.box, self.lines):
+            if artist is not None:
+                artist.remove()
+        for a in self.hidden:
+            a.set_visible(True)
+        self.box = self.lines = self.background = None
+        self.hidden = []
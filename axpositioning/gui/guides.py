@@ -0,0 +1,110 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.text import Text
+
+
+def merge_close(values, tol=1e-6):
+    """sorted unique values, merging values within tol of the previous value"""
+    values = np.sort(np.asarray(values, dtype=float).ravel())
+    if len(values) < 2:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    # chains of close values are merged to their first value
+    keep[1:] = np.diff(values) > tol
+    return values[keep]
+
+
+def guide_positions(bounds, tol=1e-6):
+    """
+    edges and centers of boxes as guide positions
+    :param bounds: (N, 4) array of (x, y, w, h)
+    :return: sorted arrays of x edges, y edges, x centers and y centers
+    """
+    bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+    x0, y0, w, h = bounds.T
+    return (merge_close(np.concatenate([x0, x0 + w]), tol),
+            merge_close(np.concatenate([y0, y0 + h]), tol),
+            merge_close(x0 + w / 2, tol),
+            merge_close(y0 + h / 2, tol))
+
+
+class GuideLayer(object):
+
+    """
+    Guide lines and labels drawn on a figure
+
+    all lines are drawn as a single LineCollection in figure coordinates.
+    the label texts are cached and reused by the next draw, labels that
+    are not used by a draw are dropped from the cache
+    """
+
+    def __init__(self, figure, color='g', ccolor='y', lw=1, size=9):
+        self.figure = figure
+        self.color = color
+        self.ccolor = ccolor
+        self.lw = lw
+        self.size = size
+        self.lines = None
+        self._labels = dict()
+
+    @property
+    def texts(self):
+        return list(self._labels.values())
+
+    def _detach(self, artist):
+        """remove an artist from the figure if it is still part of it"""
+        try:
+            artist.remove()
+        except (ValueError, NotImplementedError):
+            # the figure was cleared in the meantime
+            pass
+
+    def remove(self):
+        """remove the guides from the figure, keeping the cached labels"""
+        if self.lines is not None:
+            self._detach(self.lines)
+        for t in self._labels.values():
+            self._detach(t)
+
+    def draw(self, x, y, xc, yc, t):
+        """
+        draw vertical guides at x and xc and horizontal guides at y and yc
+        :param t: UnitTransform from relative figure coordinates to the units of the labels
+        """
+        self.remove()
+        fig = self.figure
+
+        vx = np.concatenate([x, xc])
+        hy = np.concatenate([y, yc])
+        segments = np.empty((len(vx) + len(hy), 2, 2))
+        segments[:len(vx), :, 0] = vx[:, np.newaxis]
+        segments[:len(vx), :, 1] = (0, 1)
+        segments[len(vx):, :, 0] = (0, 1)
+        segments[len(vx):, :, 1] = hy[:, np.newaxis]
+        colors = [self.color] * len(x) + [self.ccolor] * len(xc) + [self.color] * len(y) + [self.ccolor] * len(yc)
+
+        if self.lines is None:
+            self.lines = LineCollection(segments, colors=colors, linewidths=self.lw,
+                                        transform=fig.transFigure, clip_on=False)
+        else:
+            self.lines.set_segments(segments)
+            self.lines.set_color(colors)
+        fig.add_artist(self.lines)
+
+        labels = dict()
+        for attr, values, sides in (
+                ('x', vx, ((.01, 'center', 'bottom'), (.99, 'center', 'top'))),
+                ('y', hy, ((.01, 'left', 'center'), (.99, 'right', 'center')))):
+            for v in values:
+                label = t.format(t.transform(v, attr))
+                for pos, ha, va in sides:
+                    key = attr, pos, label, v
+                    xy = (v, pos) if attr == 'x' else (pos, v)
+                    text = self._labels.get(key)
+                    if text is None:
+                        text = Text(xy[0], xy[1], label, ha=ha, va=va, size=self.size,
+                                    transform=fig.transFigure, clip_on=False)
+                    labels[key] = text
+                    fig.add_artist(text)
+        self._labels = labels
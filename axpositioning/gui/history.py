@@ -0,0 +1,177 @@
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+from ..axpositioning import batch
+
+
+class AxesDelta(object):
+
+    """
+    Difference between two states of an AxesSet
+
+    only the changed bounds are stored as arrays with the old and new values,
+    together with the removed and added axes and the order of the remaining
+    axes if it changed
+    """
+
+    __slots__ = ('names', 'old_bounds', 'new_bounds', 'removed', 'added', 'old_order', 'new_order')
+
+    def __init__(self, names=(), old_bounds=None, new_bounds=None, removed=(), added=(),
+                 old_order=None, new_order=None):
+        self.names = tuple(names)
+        self.old_bounds = old_bounds
+        self.new_bounds = new_bounds
+        # (row, name, bounds, anchor, lock_aspect, selected)
+        self.removed = tuple(removed)
+        self.added = tuple(added)
+        # order of the axes that are present in both states, None if not changed
+        self.old_order = old_order
+        self.new_order = new_order
+
+    def __bool__(self):
+        return bool(self.names or self.removed or self.added or self.old_order)
+
+    def __repr__(self):
+        return '<{} changed={} removed={} added={} reordered={}>'.format(
+            self.__class__.__qualname__, len(self.names), len(self.removed),
+            len(self.added), self.old_order is not None)
+
+
+def snapshot(axes):
+    """
+    names, bounds, (anchor, lock_aspect, selected) and objects of the axes
+    the states are needed to restore removed axes
+    """
+    names = axes.names
+    objects = [axes[n] for n in names]
+    bounds = np.array([a.bounds for a in objects], dtype=float).reshape(-1, 4)
+    states = [(a.get_anchor(), a._locked_aspect, a._selected) for a in objects]
+    return names, bounds, states, objects
+
+
+def diff(before, after):
+    """
+    AxesDelta between two snapshots of an AxesSet
+    an axes that is replaced by another axes with the same name is removed and added
+    """
+    names0, bounds0, states0, objects0 = before
+    names1, bounds1, states1, objects1 = after
+    rows0 = {n: i for i, n in enumerate(names0)}
+    rows1 = {n: i for i, n in enumerate(names1)}
+    kept = set(n for n, i in rows1.items() if n in rows0 and objects0[rows0[n]] is objects1[i])
+
+    kept0 = [n for n in names0 if n in kept]
+    kept1 = [n for n in names1 if n in kept]
+
+    # bounds of the remaining axes that changed
+    idx0 = [rows0[n] for n in kept1]
+    idx1 = [rows1[n] for n in kept1]
+    changed = np.flatnonzero((bounds0[idx0] != bounds1[idx1]).any(axis=1)) if kept1 else []
+
+    removed = [(i, n, tuple(bounds0[i])) + states0[i] for i, n in enumerate(names0) if n not in kept]
+    added = [(i, n, tuple(bounds1[i])) + states1[i] for i, n in enumerate(names1) if n not in kept]
+
+    return AxesDelta(
+        names=[kept1[i] for i in changed],
+        old_bounds=bounds0[[idx0[i] for i in changed]],
+        new_bounds=bounds1[[idx1[i] for i in changed]],
+        removed=removed,
+        added=added,
+        old_order=tuple(kept0) if kept0 != kept1 else None,
+        new_order=tuple(kept1) if kept0 != kept1 else None)
+
+
+class History(object):
+
+    """
+    Undo and redo stacks of changes to an AxesSet
+
+    changes are recorded as AxesDelta by wrapping the edits in record().
+    the number of stored deltas is bounded by maxlen
+
+    >>>history = History(axes)
+    >>>with history.record():
+    >>>    axes['A'].x = .5
+    >>>history.undo()
+    """
+
+    def __init__(self, axes, maxlen=100):
+        self.axes = axes
+        self.undo_stack = deque(maxlen=maxlen)
+        self.redo_stack = deque(maxlen=maxlen)
+        self._recording = False
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    @contextmanager
+    def record(self):
+        """
+        record the changes made within the block as a single undo step
+        nested records are part of the outer record
+        """
+        if self._recording:
+            yield
+            return
+
+        before = snapshot(self.axes)
+        self._recording = True
+        try:
+            yield
+        finally:
+            self._recording = False
+            delta = diff(before, snapshot(self.axes))
+            if delta:
+                self.undo_stack.append(delta)
+                self.redo_stack.clear()
+
+    def undo(self):
+        """revert the last recorded change, returns False if there is nothing to undo"""
+        if not self.undo_stack:
+            return False
+        delta = self.undo_stack.pop()
+        self.apply(delta, reverse=True)
+        self.redo_stack.append(delta)
+        return True
+
+    def redo(self):
+        """apply the last reverted change again, returns False if there is nothing to redo"""
+        if not self.redo_stack:
+            return False
+        delta = self.redo_stack.pop()
+        self.apply(delta, reverse=False)
+        self.undo_stack.append(delta)
+        return True
+
+    def apply(self, delta, reverse=False):
+        """apply a delta to the axes, or revert it"""
+        axes = self.axes
+        if reverse:
+            remove, insert = delta.added, delta.removed
+            order, bounds = delta.old_order, delta.old_bounds
+        else:
+            remove, insert = delta.removed, delta.added
+            order, bounds = delta.new_order, delta.new_bounds
+
+        for item in remove:
+            axes.pop(item[1])
+
+        names = list(order) if order is not None else axes.names
+        for row, name, bnd, anchor, locked, selected in sorted(insert, key=lambda item: item[0]):
+            axes.add(*bnd, anchor=anchor, name=name, lock_aspect=locked)
+            axes.select(name, selected)
+            names.insert(row, name)
+        if insert or order is not None:
+            axes.change_order(names)
+
+        if len(delta.names):
+            with batch([axes[n] for n in delta.names]) as changed:
+                for a, bnd in zip(changed, bounds):
+                    a.bounds = tuple(bnd)
@@ -0,0 +1,234 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+
+class GridIndex(object):
+
+    """
+    Spatial index of boxes on a uniform grid of cells
+
+    each box is registered in the cells it overlaps, so that hit tests only
+    check the boxes in the cells of the query. boxes outside the extent are
+    registered in the cells at the edge of the grid.
+
+    >>>index = GridIndex(size=16)
+    >>>index.insert('A', (.1, .1, .3, .3))
+    >>>index.query_point(.2, .2)
+    ['A']
+    >>>index.query_box(0, 0, .5, .5, contain=True)
+    ['A']
+    """
+
+    def __init__(self, size=16, extent=(0, 0, 1, 1)):
+        """
+        :param size: number of cells in each direction
+        :param extent: (xll, yll, xur, yur) of the grid
+        """
+        self.size = size
+        self.extent = tuple(extent)
+        self._cells = defaultdict(set)
+        # key: ((xll, yll, xur, yur), (i0, j0, i1, j1))
+        self._items = dict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def _cell(self, v, dim):
+        lo, hi = self.extent[dim], self.extent[dim + 2]
+        i = int((v - lo) / (hi - lo) * self.size)
+        return min(max(i, 0), self.size - 1)
+
+    def _cell_range(self, box):
+        x0, y0, x1, y1 = box
+        return self._cell(x0, 0), self._cell(y0, 1), self._cell(x1, 0), self._cell(y1, 1)
+
+    @staticmethod
+    def _box(bounds):
+        """(xll, yll, xur, yur) of (x, y, w, h) bounds, allowing negative sizes"""
+        x, y, w, h = map(float, bounds)
+        return min(x, x + w), min(y, y + h), max(x, x + w), max(y, y + h)
+
+    def insert(self, key, bounds):
+        """add a box with (x, y, w, h) bounds"""
+        if key in self._items:
+            self.remove(key)
+        box = self._box(bounds)
+        cells = self._cell_range(box)
+        self._items[key] = box, cells
+        i0, j0, i1, j1 = cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                self._cells[i, j].add(key)
+
+    def remove(self, key):
+        """remove a box, ignoring unknown keys"""
+        try:
+            _, (i0, j0, i1, j1) = self._items.pop(key)
+        except KeyError:
+            return
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = self._cells[i, j]
+                cell.discard(key)
+                if not cell:
+                    del self._cells[i, j]
+
+    def update(self, key, bounds):
+        """update the bounds of a box, only changing the cells if required"""
+        box = self._box(bounds)
+        try:
+            _, cells = self._items[key]
+        except KeyError:
+            cells = None
+        if cells is not None and self._cell_range(box) == cells:
+            self._items[key] = box, cells
+        else:
+            self.insert(key, bounds)
+
+    def clear(self):
+        self._cells.clear()
+        self._items.clear()
+
+    def bounds(self, key):
+        """(xll, yll, xur, yur) of a box"""
+        return self._items[key][0]
+
+    def query_point(self, x, y):
+        """keys of the boxes containing a point"""
+        hits = []
+        for key in self._cells.get((self._cell(x, 0), self._cell(y, 1)), ()):
+            x0, y0, x1, y1 = self._items[key][0]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                hits.append(key)
+        return hits
+
+    def query_box(self, x0, y0, x1, y1, contain=False):
+        """
+        keys of the boxes intersecting a box of (xll, yll, xur, yur)
+        or only of the boxes completely within it if contain is True
+        """
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        i0, j0, i1, j1 = self._cell_range((x0, y0, x1, y1))
+
+        candidates = set()
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                candidates.update(self._cells.get((i, j), ()))
+
+        hits = []
+        for key in candidates:
+            bx0, by0, bx1, by1 = self._items[key][0]
+            if contain:
+                hit = x0 <= bx0 and bx1 <= x1 and y0 <= by0 and by1 <= y1
+            else:
+                hit = bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1
+            if hit:
+                hits.append(key)
+        return hits
+
+
+class SnapIndex(object):
+
+    """
+    Sorted edges and centers of boxes for snapping positions
+
+    the left, center and right coordinates of all boxes are kept in one
+    sorted list and the bottom, middle and top in another. candidates near
+    a position are found by bisection and the lists are updated in place
+    when a box changes
+
+    >>>index = SnapIndex()
+    >>>index.insert('A', (.1, .1, .3, .3))
+    >>>index.nearest(.398, 'x', tol=.005)
+    0.4
+    >>>index.snap_offset([.2, .3, .402], 'x', tol=.005)
+    -0.002
+    """
+
+    DIMS = ('x', 'y')
+
+    def __init__(self):
+        self._values = dict(x=[], y=[])
+        self._keys = dict(x=[], y=[])
+        # key: {dim: (lo, center, hi)}
+        self._items = dict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    @staticmethod
+    def features(bounds):
+        """edges and centers per dimension of (x, y, w, h) bounds"""
+        x, y, w, h = map(float, bounds)
+        return dict(x=(x, x + w / 2, x + w), y=(y, y + h / 2, y + h))
+
+    def values(self, dim):
+        """sorted coordinates of a dimension"""
+        return list(self._values[dim])
+
+    def insert(self, key, bounds):
+        if key in self._items:
+            self.remove(key)
+        features = self._items[key] = self.features(bounds)
+        for dim, coords in features.items():
+            values, keys = self._values[dim], self._keys[dim]
+            for v in coords:
+                i = bisect_right(values, v)
+                values.insert(i, v)
+                keys.insert(i, key)
+
+    def remove(self, key):
+        """remove a box, ignoring unknown keys"""
+        try:
+            features = self._items.pop(key)
+        except KeyError:
+            return
+        for dim, coords in features.items():
+            values, keys = self._values[dim], self._keys[dim]
+            for v in coords:
+                i = bisect_left(values, v)
+                while keys[i] != key:
+                    i += 1
+                del values[i]
+                del keys[i]
+
+    def update(self, key, bounds):
+        if key in self._items and self._items[key] == self.features(bounds):
+            return
+        self.insert(key, bounds)
+
+    def clear(self):
+        for dim in self.DIMS:
+            del self._values[dim][:]
+            del self._keys[dim][:]
+        self._items.clear()
+
+    def nearest(self, v, dim, tol, exclude=None):
+        """nearest coordinate within tol of v, None if there is none"""
+        values, keys = self._values[dim], self._keys[dim]
+        best = None
+        for i in range(bisect_left(values, v - tol), bisect_right(values, v + tol)):
+            if keys[i] == exclude:
+                continue
+            if best is None or abs(values[i] - v) < abs(best - v):
+                best = values[i]
+        return best
+
+    def snap_offset(self, coords, dim, tol, exclude=None):
+        """
+        smallest offset that moves one of the coordinates onto an indexed coordinate
+        0 if no coordinate is within tol
+        """
+        offset = None
+        for v in coords:
+            t = self.nearest(v, dim, tol, exclude=exclude)
+            if t is not None and (offset is None or abs(t - v) < abs(offset)):
+                offset = t - v
+        return 0. if offset is None else offset
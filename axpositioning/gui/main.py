@@ -1,11 +1,17 @@
 from collections import OrderedDict
 from functools import partial
 from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
 
 from PyQt5 import QtWidgets, QtCore, QtGui
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
+from .drag import AxesDrag, DragPreview, grab_edges
+from .history import History
+from .scheduler import RedrawScheduler
 from .model import AxesSet
+from ..layout import split_bounds, anchor_coefs
+from ..units import UNITS
 from .widgets import *
 
 
@@ -35,7 +41,14 @@ class AxPositioningEditor(QtWidgets.QWidget):
 
     click_axes_data = dict(w=.3, h=.3)
 
-    def __init__(self, figsize, bounds=(), anchor='C', dpi=150):
+    # distance in pixels within which positions snap to other axes
+    snap_tolerance = 5
+
+    def __init__(self, figsize, bounds=(), anchor='C', dpi=150, overlay=False):
+        """
+        :param overlay: draw the placeholders as a single overlay instead of an axes each,
+                        for layouts with many axes
+        """
 
         super().__init__()
         self.figsize = figsize
@@ -45,13 +58,26 @@ class AxPositioningEditor(QtWidgets.QWidget):
 
         self.settings = dict(guides=False,
                              guides_selected=False,
-                             relative=True)
+                             units='relative',
+                             snap=False,
+                             overlay=overlay)
         self.guides_subsetting_fields = []
 
         self.axes = AxesSet(self.figure, bounds, anchor)
+        self.history = History(self.axes)
+        self.redraw = RedrawScheduler(self.draw_canvas, self.draw_table)
         self.build()
-        self.canvas.mpl_connect('button_release_event', self.draw_axes)
+        self.canvas.mpl_connect('button_press_event', self.canvas_press)
+        self.canvas.mpl_connect('motion_notify_event', self.canvas_motion)
+        self.canvas.mpl_connect('button_release_event', self.canvas_release)
         self.pointing_axes = False
+        # figure position of the mouse press and rubber band rectangle when selecting
+        self._press = None
+        self._rubber_band = None
+        # axes drag started by the press and its preview once the mouse moved
+        self._drag = None
+        self._preview = None
+        self._cursor_edges = None
 
     def build(self):
         """build the widget"""
@@ -73,6 +99,10 @@ class AxPositioningEditor(QtWidgets.QWidget):
 
         self.set_message(None)
 
+        QtWidgets.QShortcut(QtGui.QKeySequence.Undo, self, activated=self.undo)
+        QtWidgets.QShortcut(QtGui.QKeySequence.Redo, self, activated=self.redo)
+        QtWidgets.QShortcut(QtGui.QKeySequence('Ctrl+Y'), self, activated=self.redo)
+
     def build_figure(self, layout):
         """build the figure area"""
         figure_scroll_area = QtWidgets.QScrollArea()
@@ -150,11 +180,27 @@ class AxPositioningEditor(QtWidgets.QWidget):
 
         settings_layout.addWidget(f)
 
-        cb3 = QtWidgets.QCheckBox('absolute positions (dots)')
-        cb3.setChecked(not self.settings['relative'])
-        cb3.stateChanged.connect(self.set_absolute)
+        cb3 = QtWidgets.QCheckBox('snap to other axes')
+        cb3.setToolTip('snap edited and placed axes to the edges and centers of other axes')
+        cb3.setChecked(self.settings['snap'])
+        cb3.stateChanged.connect(self.set_snap)
         settings_layout.addWidget(cb3)
 
+        cb4 = QtWidgets.QCheckBox('draw axes as overlay')
+        cb4.setToolTip('draw all axes placeholders as a single overlay, faster for many axes')
+        cb4.setChecked(self.settings['overlay'])
+        cb4.stateChanged.connect(self.set_overlay)
+        settings_layout.addWidget(cb4)
+
+        settings_layout.addWidget(hline())
+
+        settings_layout.addWidget(QtWidgets.QLabel('Position units'))
+        units_dropdown = QtWidgets.QComboBox()
+        units_dropdown.addItems(UNITS)
+        units_dropdown.setCurrentIndex(UNITS.index(self.settings['units']))
+        units_dropdown.currentIndexChanged.connect(lambda x: self.set_units(UNITS[x]))
+        settings_layout.addWidget(units_dropdown)
+
         settings_layout.addItem(QtWidgets.QSpacerItem(
             0, 0,
             QtWidgets.QSizePolicy.Maximum,
@@ -211,7 +257,7 @@ class AxPositioningEditor(QtWidgets.QWidget):
         self.figure.set_size_inches(w, h)
         self.figure.set_dpi(self.dpi)
         screenwidth, screenheight = w * self.dpi, h * self.dpi
-        self.canvas.resize(.5*screenwidth, .5*screenheight)
+        self.canvas.resize(int(.5*screenwidth), int(.5*screenheight))
 
     def set_figsize(self):
         w = self.figure_fields['w'].text()
@@ -227,13 +273,12 @@ class AxPositioningEditor(QtWidgets.QWidget):
             self.figsize = w, h
             self.figure.set_size_inches(*self.figsize)
             self.update_canvas_size()
+            self.axes.mark_dirty(views=['table'])
             self.draw(posfields=True)
 
     def reset_value(self, row, col, attr):
-        ax = self.axes.names[row]
-        self.axtable.blockSignals(True)
-        self.axtable.item(row, col).setText('{:.3f}'.format(getattr(ax, attr)))
-        self.axtable.blockSignals(False)
+        """show the current value again after an invalid value was entered"""
+        self.axtable.update_rows(self.axes, [self.axes.name_at(row)], units=self.settings['units'])
 
     def get_bounds(self):
         """returns a list of axes bounds as [(x, y, w, h)]"""
@@ -258,6 +303,156 @@ class AxPositioningEditor(QtWidgets.QWidget):
             # clear the message widget
             self.set_message(None)
 
+    # -------------------------------------
+    # select, move and resize axes in the canvas
+    # -------------------------------------
+
+    # minimum mouse movement in pixels for a rubber band selection or a drag
+    rubber_band_threshold = 5
+
+    # distance in pixels from the edges of an axes within which they are dragged to resize
+    handle_size = 6
+
+    EDGE_CURSORS = {
+        '': QtCore.Qt.SizeAllCursor,
+        'l': QtCore.Qt.SizeHorCursor,
+        'r': QtCore.Qt.SizeHorCursor,
+        'b': QtCore.Qt.SizeVerCursor,
+        't': QtCore.Qt.SizeVerCursor,
+        'lt': QtCore.Qt.SizeFDiagCursor,
+        'rb': QtCore.Qt.SizeFDiagCursor,
+        'lb': QtCore.Qt.SizeBDiagCursor,
+        'rt': QtCore.Qt.SizeBDiagCursor,
+    }
+
+    def grab_axes(self, px, py):
+        """name and grabbed edges of the axes at a position in pixels, None if there is no axes"""
+        x, y = self.figure.transFigure.inverted().transform((px, py))
+        name = self.axes.hit(x, y)
+        if name is None:
+            return None, None
+        a = self.axes[name]
+        edges = grab_edges(a.absolute_bounds, px, py, self.handle_size)
+        if a._locked_aspect:
+            # resizing would change the locked aspect
+            edges = ''
+        return name, edges
+
+    def update_cursor(self, edges):
+        """show the move or resize cursor over axes"""
+        if edges == self._cursor_edges:
+            return
+        self._cursor_edges = edges
+        if edges is None:
+            self.canvas.unsetCursor()
+        else:
+            self.canvas.setCursor(QtGui.QCursor(self.EDGE_CURSORS[edges]))
+
+    def canvas_press(self, event):
+        """start a click, drag or rubber band selection"""
+        if self.pointing_axes or event.button != 1:
+            return
+        self._press = event.x, event.y
+        if event.key is None:
+            name, edges = self.grab_axes(event.x, event.y)
+            if name is not None:
+                scale = self.axes.metrics.scale
+                x, y = self.figure.transFigure.inverted().transform(self._press)
+                self._drag = AxesDrag(name, self.axes[name].bounds, x, y, edges=edges,
+                                      min_size=(2 * self.handle_size / scale[0], 2 * self.handle_size / scale[1]))
+
+    def canvas_motion(self, event):
+        """update the drag preview or rubber band rectangle while dragging"""
+        if self._press is None:
+            if event.x is not None and not self.pointing_axes:
+                self.update_cursor(self.grab_axes(event.x, event.y)[1])
+            return
+        if event.x is None:
+            return
+        x0, y0 = self._press
+        moved = max(abs(event.x - x0), abs(event.y - y0)) >= self.rubber_band_threshold
+
+        if self._drag is not None:
+            if self._preview is None:
+                if not moved:
+                    return
+                # the background is rendered from the current state
+                self.redraw.flush()
+                self._preview = DragPreview(self.canvas)
+                if self.settings['overlay']:
+                    self.axes.plot_overlay(exclude=self._drag.name)
+                self._preview.start(hidden=[self.axes[self._drag.name]])
+            self._preview.update(self.drag_bounds(self._drag, event))
+            return
+
+        if self._rubber_band is None:
+            if not moved:
+                return
+            self._rubber_band = Rectangle((0, 0), 0, 0,
+                                          transform=self.figure.transFigure,
+                                          facecolor=(.2, .2, .8, .1),
+                                          edgecolor=(.2, .2, .8),
+                                          linestyle='--')
+            self.figure.add_artist(self._rubber_band)
+        (fx0, fy0), (fx1, fy1) = self.figure.transFigure.inverted().transform([(x0, y0), (event.x, event.y)])
+        self._rubber_band.set_bounds(min(fx0, fx1), min(fy0, fy1), abs(fx1 - fx0), abs(fy1 - fy0))
+        self.canvas.draw_idle()
+
+    def drag_bounds(self, drag, event):
+        """bounds of a dragged axes with the mouse at an event"""
+        x, y = self.figure.transFigure.inverted().transform((event.x, event.y))
+        if self.snap:
+            scale = self.axes.metrics.scale
+            return drag.bounds_at(x, y, snapping=self.axes.snapping,
+                                  tol=(self.snap / scale[0], self.snap / scale[1]))
+        return drag.bounds_at(x, y)
+
+    def canvas_release(self, event):
+        """place a new axes, finish a drag or select the axes under the click or within the rubber band"""
+        if self.pointing_axes:
+            self.draw_axes(event)
+            return
+        if self._press is None:
+            return
+
+        press, self._press = self._press, None
+        drag, self._drag = self._drag, None
+        preview, self._preview = self._preview, None
+        if preview is not None:
+            # commit the dragged bounds to the axes
+            bounds = preview.box.get_bbox().bounds if event.x is None else self.drag_bounds(drag, event)
+            preview.stop()
+            with self.history.record():
+                self.axes[drag.name].bounds = bounds
+            self.draw(posfields=True)
+            return
+
+        rubber_band, self._rubber_band = self._rubber_band, None
+        add = event.key is not None and ('shift' in event.key or 'control' in event.key or 'ctrl' in event.key)
+        inv = self.figure.transFigure.inverted()
+
+        if rubber_band is not None:
+            rubber_band.remove()
+            x = event.x if event.x is not None else press[0]
+            y = event.y if event.y is not None else press[1]
+            (x0, y0), (x1, y1) = inv.transform([press, (x, y)])
+            names = self.axes.names_in(x0, y0, x1, y1, contain=True)
+            if not add:
+                self.axes.select_none()
+            for name in names:
+                self.axes.select(name)
+        else:
+            x, y = inv.transform(press)
+            name = self.axes.hit(x, y)
+            if add:
+                if name is not None:
+                    self.axes.select(name, not self.axes.is_selected(name))
+            else:
+                self.axes.select_none()
+                if name is not None:
+                    self.axes.select(name)
+        self.draw(posfields=True)
+
     def set_show_guides(self, b):
         self.settings['guides'] = bool(b)
         for item in self.guides_subsetting_fields:
@@ -268,10 +463,38 @@ class AxPositioningEditor(QtWidgets.QWidget):
         self.settings['guides_selected'] = bool(b)
         self.draw(posfields=False)
 
-    def set_absolute(self, b):
-        self.settings['relative'] = not bool(b)
+    def set_snap(self, b):
+        """snap positions to the edges and centers of other axes"""
+        self.settings['snap'] = bool(b)
+
+    def set_overlay(self, b):
+        """draw the placeholders as a single overlay or as an axes each"""
+        self.settings['overlay'] = bool(b)
+        if b:
+            self.sync_figure_axes()
+            self.axes.plot_overlay()
+        else:
+            self.axes.overlay.remove()
+            # the placeholders were not updated while drawing the overlay
+            self.axes.mark_dirty(views=['canvas'])
+            self.sync_figure_axes()
+        self.draw()
+
+    @property
+    def snap(self):
+        """snapping tolerance in pixels or None if snapping is disabled"""
+        return self.snap_tolerance if self.settings['snap'] else None
+
+    def set_units(self, units):
+        """set the units of the positions in the table and guides"""
+        self.settings['units'] = units
+        self.axes.mark_dirty(views=['table'])
         self.draw(posfields=True)
 
+    def set_absolute(self, b):
+        """show positions in pixels (dots) or relative to the figure"""
+        self.set_units('pixels' if b else 'relative')
+
     def click_new_axes(self, data):
         self.pointing_axes = True
         self.set_message('Click in the figure to place a new axes at that position')
@@ -280,13 +503,19 @@ class AxPositioningEditor(QtWidgets.QWidget):
     def add_axes_at_position(self, x, y, w=.4, h=.4, n=None, draw=True):
         """add axes at specified location in Figure coordinates"""
 
-        self.axes.add(x, y, w, h, apply_anchor=True)
+        if self.snap:
+            ax, ay = anchor_coefs(self.axes.anchor)
+            x = self.axes.snap_position(x, w, 'x', ax, self.snap)
+            y = self.axes.snap_position(y, h, 'y', ay, self.snap)
+        with self.history.record():
+            self.axes.add(x, y, w, h, apply_anchor=True)
 
         if draw:
             self.draw(posfields=True)
 
     def add_axes(self, bounds, draw=True):
-        self.axes.add(*bounds)
+        with self.history.record():
+            self.axes.add(*bounds)
 
         if draw:
             self.draw(posfields=True)
@@ -294,8 +523,9 @@ class AxPositioningEditor(QtWidgets.QWidget):
     def set_axes(self, bounds, draw=True):
         """set several axes from a list of bounds"""
 
-        for bnd in bounds:
-            self.axes.add(*bnd)
+        with self.history.record():
+            for bnd in bounds:
+                self.axes.add(*bnd)
 
         if draw:
             self.draw(posfields=True)
@@ -307,13 +537,15 @@ class AxPositioningEditor(QtWidgets.QWidget):
         :param attr: name of the position attribute
         :param value: value of the position attribute
         """
-        axname = self.axes.names[row]
-        self.axes.set_property(str(axname), attr, value, relative=self.settings['relative'])
+        axname = self.axes.name_at(row)
+        with self.history.record():
+            self.axes.set_property(str(axname), attr, value, units=self.settings['units'], snap=self.snap)
         self.draw(posfields=True)
 
     def delete_axes(self, name, redraw=True):
         """delete an axes from the editor"""
-        self.axes.pop(str(name))
+        with self.history.record():
+            self.axes.pop(str(name))
         if redraw:
             self.draw(posfields=True)
 
@@ -331,7 +563,8 @@ class AxPositioningEditor(QtWidgets.QWidget):
                 return 2
 
         indices = sorted(list(range(len(names))), key=keyfn)
-        self.axes.change_order([names[i] for i in indices])
+        with self.history.record():
+            self.axes.change_order([names[i] for i in indices])
         self.draw(posfields=True)
 
 
@@ -367,19 +600,64 @@ class AxPositioningEditor(QtWidgets.QWidget):
         self.msg_label.setText(txt+'\n'+msg)
 
     def draw(self, posfields=False):
-        """redraw the contents"""
-        self.figure.clear()
-        for name, a in self.axes.items():
-            a.format_placeholder(name)
-            self.figure.add_axes(a)
+        """
+        schedule a redraw of the contents
+        all redraws requested within one event loop turn are done at once and
+        only the axes that changed since the last redraw are updated
+        :param posfields: also update the table of positions
+        """
+        self.redraw.request(canvas=True, table=posfields)
+
+    def draw_canvas(self):
+        """update the placeholders of the changed axes and the guides"""
+        names, restructured = self.axes.take_changes('canvas')
+        if restructured:
+            self.sync_figure_axes()
+        if self.settings['overlay']:
+            if names or restructured:
+                self.axes.plot_overlay()
+        else:
+            for name in names:
+                self.axes[name].update_placeholder(name)
+
         if self.settings['guides']:
             self.axes.plot_guides(selected=self.settings['guides_selected'],
-                                  relative=self.settings['relative'])
+                                  units=self.settings['units'])
+        else:
+            self.axes.guides.remove()
         self.canvas.draw_idle()
 
-        if posfields:
-            self.axtable.clear()
-            self.axtable.fill(self.axes, relative=self.settings['relative'])
+    def sync_figure_axes(self):
+        """
+        add, remove and reorder the axes of the figure to match the axes set
+        the figure has no axes when drawing the overlay
+        """
+        target = [] if self.settings['overlay'] else list(self.axes.values())
+        keep = set(map(id, target))
+        current = []
+        for a in list(self.figure.axes):
+            if id(a) in keep:
+                current.append(a)
+            else:
+                self.figure.delaxes(a)
+
+        # axes after the first difference in order are added again
+        i = 0
+        while i < min(len(current), len(target)) and current[i] is target[i]:
+            i += 1
+        for a in current[i:]:
+            self.figure.delaxes(a)
+        for name, a in zip(self.axes.names[i:], target[i:]):
+            self.figure.add_axes(a)
+            a.update_placeholder(name)
+
+    def draw_table(self):
+        """update the rows of the changed axes or refill the table if axes were added, removed or reordered"""
+        names, restructured = self.axes.take_changes('table')
+        if restructured:
+            self.axtable.fill(self.axes, units=self.settings['units'])
+        elif names:
+            self.axtable.update_rows(self.axes, names, units=self.settings['units'])
 
     def update_anchor(self, pos, redraw=True):
         """set the position reference anchor of the axes to a new location"""
@@ -398,7 +676,8 @@ class AxPositioningEditor(QtWidgets.QWidget):
             return
         action = self.actions_dropdown.currentText()
         fn = getattr(self, self.axes_actions[str(action)])
-        fn(self.axes.selected_names, self.axes.selected)
+        with self.history.record():
+            fn(self.axes.selected_names, self.axes.selected)
 
     def select_axes(self, key, b=True):
         self.axes.select(str(key), b)
@@ -406,10 +685,21 @@ class AxPositioningEditor(QtWidgets.QWidget):
 
     def clear_figure(self):
         self.figure.clear()
-        for k in list(self.axes.keys()):
-            self.delete_axes(k, redraw=False)
+        with self.history.record():
+            for k in list(self.axes.keys()):
+                self.delete_axes(k, redraw=False)
         self.draw(posfields=True)
 
+    def undo(self):
+        """revert the last change of the axes"""
+        if self.history.undo():
+            self.draw(posfields=True)
+
+    def redo(self):
+        """apply the last reverted change again"""
+        if self.history.redo():
+            self.draw(posfields=True)
+
     def select_all_axes(self):
         self.axes.select_all()
         self.draw(posfields=True)
@@ -440,36 +730,41 @@ class AxPositioningEditor(QtWidgets.QWidget):
 
     def axes_equal_x(self, names, axes, redraw=True):
         x = axes.pop(0).x
-        for a in axes:
-            a.x = x
+        with self.axes.batch(names[1:]):
+            for a in axes:
+                a.x = x
         if redraw:
             self.draw(posfields=True)
 
     def axes_equal_y(self, names, axes, redraw=True):
         y = axes.pop(0).y
-        for a in axes:
-            a.y = y
+        with self.axes.batch(names[1:]):
+            for a in axes:
+                a.y = y
         if redraw:
             self.draw(posfields=True)
 
     def axes_equal_w(self, names, axes, redraw=True):
         w = axes.pop(0).w
-        for a in axes:
-            a.w = w
+        with self.axes.batch(names[1:]):
+            for a in axes:
+                a.w = w
         if redraw:
             self.draw(posfields=True)
 
     def axes_equal_h(self, names, axes, redraw=True):
         h = axes.pop(0).h
-        for a in axes:
-            a.h = h
+        with self.axes.batch(names[1:]):
+            for a in axes:
+                a.h = h
         if redraw:
             self.draw(posfields=True)
 
     def axes_equal_aspect(self, names, axes, redraw=True):
         A = axes.pop(0).aspect
-        for a in axes:
-            a.aspect = A
+        with self.axes.batch(names[1:]):
+            for a in axes:
+                a.aspect = A
         if redraw:
             self.draw(posfields=True)
 
@@ -480,7 +775,7 @@ class AxPositioningEditor(QtWidgets.QWidget):
         anchor = self.axes.anchor
 
         # update anchor to lower left during processing
-        self.update_anchor('SW', True, redraw=False)
+        self.update_anchor('SW', redraw=False)
 
         # determine bounding box
         xll = min(a.x for a in axes)
@@ -495,11 +790,11 @@ class AxPositioningEditor(QtWidgets.QWidget):
         self.delete_axes_objects(names[1:], axes[1:], redraw=False)
 
         # update the anchor to the original
-        self.update_anchor(anchor, True, redraw=redraw)
+        self.update_anchor(anchor, redraw=redraw)
 
     def axes_split(self, names, axes, redraw=True):
         """
-        split axes in two parts based on a given ratio
+        split axes in parts based on the given ratios
         """
         def show_error(msg):
             m = QtWidgets.QMessageBox()
@@ -510,24 +805,29 @@ class AxPositioningEditor(QtWidgets.QWidget):
         dialog = SplitDialog()
         if dialog.exec() != QtWidgets.QDialog.Accepted:
             return
-        ratio, spacing, horizontal = dialog.get_data()
+        try:
+            ratio, spacing, horizontal = dialog.get_data()
+        except ValueError as e:
+            show_error(str(e))
+            return
 
-        if ratio < 0 or ratio > 1:
-            show_error('ratio must be between 0 and 1')
+        # bounds of the parts of all selected axes as (axes, parts, 4) array
+        try:
+            parts = split_bounds([a.bounds for a in axes], ratio, spacing, wsplit=horizontal)
+        except ValueError as e:
+            show_error(str(e))
             return
 
-        for a in axes:
-            try:
-                new_bounds = a.split(ratio, spacing, wsplit=horizontal)
-            except ValueError as e:
-                show_error(str(e))
-                return
-            else:
-                # create 2nd axes and copy selected state
-                new_ax = self.axes.add(*new_bounds, anchor=a.get_anchor())
+        # resize the axes to the first part
+        with self.axes.batch(names):
+            for a, bounds in zip(axes, parts):
+                a.bounds = bounds[0]
+
+        # create new axes for the other parts and copy selected state
+        for a, bounds in zip(axes, parts):
+            for bnd in bounds[1:]:
+                new_ax = self.axes.add(*bnd, anchor=a.get_anchor())
                 new_ax._selected = a._selected
 
         if redraw:
             self.draw(posfields=True)
-
-
@@ -1,43 +1,71 @@
 from collections import OrderedDict
-from ..axpositioning import PositioningAxes
+from ..axpositioning import PositioningAxes, batch
+from ..metrics import FigureMetrics
+from ..units import position_units
+from .guides import GuideLayer, guide_positions
+from .index import GridIndex, SnapIndex
+from .overlay import PlaceholderOverlay
 import numpy as np
 
 
 class GuiPositioningAxes(PositioningAxes):
 
+    # the AxesSet keeps the selection state and spatial indices once the axes is added to it
+    owner = None
+    axname = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._selected = False
+        self._selected_flag = False
+        # label, anchor marker and anchor circle of the placeholder
+        self._placeholder = None
+
+    @property
+    def _selected(self):
+        if self.owner is None:
+            return self._selected_flag
+        return self.owner.is_selected(self.axname)
+    @_selected.setter
+    def _selected(self, b):
+        if self.owner is None:
+            self._selected_flag = bool(b)
+        else:
+            self.owner.select(self.axname, b)
+
+    def set_position(self, pos, which='both'):
+        """set the position and update the spatial indices of the owner"""
+        super().set_position(pos, which=which)
+        if self.owner is not None and self._pending_bounds is None:
+            self.owner.axes_moved(self)
+
+    def set_anchor(self, a):
+        super().set_anchor(a)
+        if self.owner is not None:
+            self.owner.mark_dirty([self.axname])
 
     def format_placeholder(self, label=''):
         """
         format the axes with no ticks and a simple label in the center
         the anchor point is shown as a blue circle
         """
+        self.remove_placeholder()
         self.set_xticks([])
         self.set_yticks([])
         self.set_xlim(-1, 1)
         self.set_ylim(-1, 1)
         self.set_facecolor('none')
-        self.text(.05, .95, label, ha='left', va='top', transform=self.transAxes, zorder=2)
-
-        for v in self.spines.values():
-            if self._selected:
-                v.set_color((.2, .2, .8))
-                v.set_linewidth(2)
-            else:
-                v.set_color('k')
-                v.set_linewidth(1)
+        text = self.text(.05, .95, label, ha='left', va='top', transform=self.transAxes, zorder=2)
+        self.format_spines()
 
         ax, ay = self.get_anchor()
-        self.scatter([ax], [ay],
+        marker = self.scatter([ax], [ay],
                      marker='+',
                      transform=self.transAxes,
                      color=(.9, .1, .1),
                      s=50,
                      clip_on=False,
                      zorder=10)
-        self.scatter([ax], [ay],
+        circle = self.scatter([ax], [ay],
                      marker='o',
                      transform=self.transAxes,
                      facecolors='none',
@@ -46,152 +74,416 @@ class GuiPositioningAxes(PositioningAxes):
                      s=50,
                      clip_on=False,
                      zorder=10)
+        self._placeholder = text, marker, circle
 
-    def get_guides(self):
-        pnts = list(map(float, self.get_position().get_points().flatten()))
-        x = pnts[::2]
-        y = pnts[1::2]
-
-        xc = sum(x)/2
-        yc = sum(y)/2
-        return set(x), set(y), set([xc]), set([yc])
-
-    def plot_guides(self, x, y, xc, yc, color='g', ccolor='y', lw=1, relative=True):
-        kw = dict(transform=self.figure.transFigure, clip_on=False)
-        labelkw = kw.copy()
-        labelkw['size'] = 9
-        if relative:
-            labelfmt = '{:.3f}'
-        else:
-            labelfmt = '{:.0f}'
-
-        w, h = self.figure.get_size_inches()
-        dpi = self.figure.get_dpi()
-
-        lx = list(x) + list(xc)
-        xcolors = [color]*len(x)+[ccolor]*len(xc)
-        for vx, c in zip(lx, xcolors):
-            if relative:
-                label = labelfmt.format(vx).lstrip('0')
-            else:
-                label = labelfmt.format(vx * w * dpi)
-            self.plot([vx, vx], [0, 1], color=c, lw=lw, **kw)
-            self.text(vx, 0.01, label, ha='center', va='bottom', **labelkw)
-            self.text(vx, 0.99, label, ha='center', va='top', **labelkw)
-
-        ly = list(y) + list(yc)
-        ycolors = [color] * len(y) + [ccolor] * len(yc)
-        for vy, c in zip(ly, ycolors):
-            if relative:
-                label = labelfmt.format(vy).lstrip('0')
+    def format_spines(self):
+        """highlight the spines of a selected axes"""
+        for v in self.spines.values():
+            if self._selected:
+                v.set_color((.2, .2, .8))
+                v.set_linewidth(2)
             else:
-                label = labelfmt.format(vy * h * dpi)
-            self.plot([0, 1], [vy, vy], color=c, lw=lw, **kw)
-            self.text(0.01, vy, label, ha='left', va='center', **labelkw)
-            self.text(0.99, vy, label, ha='right', va='center', **labelkw)
+                v.set_color('k')
+                v.set_linewidth(1)
+
+    def update_placeholder(self, label=''):
+        """
+        update the label, selection and anchor of the placeholder in place
+        the placeholder is created if the axes has none
+        """
+        if self._placeholder is None or self._placeholder[0].axes is not self:
+            # new axes or cleared with the figure
+            self.format_placeholder(label)
+            return
+        text, marker, circle = self._placeholder
+        if text.get_text() != label:
+            text.set_text(label)
+        self.format_spines()
+        offsets = [self.get_anchor()]
+        marker.set_offsets(offsets)
+        circle.set_offsets(offsets)
+
+    def remove_placeholder(self):
+        """remove the placeholder artists if they are still part of the axes"""
+        if self._placeholder is None:
+            return
+        for artist in self._placeholder:
+            if artist.axes is self:
+                artist.remove()
+        self._placeholder = None
+
+
+def axes_name(i):
+    """name of the i-th axes as A..Z, AA..AZ, BA.. (spreadsheet columns)"""
+    name = ''
+    i += 1
+    while i > 0:
+        i, r = divmod(i - 1, 26)
+        name = chr(65 + r) + name
+    return name
+
+
+def axes_name_index(name):
+    """index of a generated axes name, None for other names"""
+    if not name or not all('A' <= c <= 'Z' for c in name):
+        return None
+    i = 0
+    for c in name:
+        i = i * 26 + ord(c) - 64
+    return i - 1
 
 
 class AxesSet(OrderedDict):
 
+    """
+    ordered mapping of names to GuiPositioningAxes
+
+    the row of each name is kept in an index that is rebuilt after the
+    axes are added, removed or reordered. the names of the selected axes
+    are kept in an ordered set, the bounds in a spatial index for hit tests
+    and the edges and centers in a sorted index for snapping
+
+    each view of the axes (see VIEWS) keeps the names of the axes whose
+    bounds, anchor or selection changed since it was last updated, and
+    whether axes were added, removed or reordered
+    """
+
+    VIEWS = ('canvas', 'table')
+
     def __init__(self, fig, bounds, anchor='C'):
         self.figure = fig
         self.anchor = anchor
+        self._names = None
+        self._rows = None
+        # lowest index of a generated name that may be free
+        self._free_name_index = 0
+        self._selection = OrderedDict()
+        self.spatial = GridIndex()
+        self.snapping = SnapIndex()
+        self.guides = GuideLayer(fig)
+        self.overlay = PlaceholderOverlay(fig)
+        self._dirty = {view: set() for view in self.VIEWS}
+        self._restructured = {view: True for view in self.VIEWS}
         super().__init__()
         for bnd in bounds:
             self.add(*bnd)
 
-    def add(self, x, y, w, h, anchor=None, apply_anchor=False):
+    # -----------------------------
+    # keep the name and row indices
+    # -----------------------------
+
+    def _invalidate(self):
+        self._names = None
+        self._rows = None
+        for view in self.VIEWS:
+            self._restructured[view] = True
+
+    def _released(self, name, a):
+        i = axes_name_index(name)
+        if i is not None and i < self._free_name_index:
+            self._free_name_index = i
+        self._selection.pop(name, None)
+        self.spatial.remove(name)
+        self.snapping.remove(name)
+        if isinstance(a, GuiPositioningAxes) and a.owner is self:
+            a._selected_flag = False
+            a.owner = None
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._invalidate()
+        elif self[key] is not value:
+            self._released(key, self[key])
+            self._invalidate()
+        super().__setitem__(key, value)
+        if isinstance(value, GuiPositioningAxes):
+            selected = value._selected
+            value.owner = self
+            value.axname = key
+            if selected:
+                self._selection[key] = None
+        self.spatial.insert(key, value.bounds)
+        self.snapping.insert(key, value.bounds)
+        self.mark_dirty([key])
+
+    def __delitem__(self, key):
+        a = self[key]
+        super().__delitem__(key)
+        self._invalidate()
+        self._released(key, a)
+
+    def pop(self, key, *args):
+        missing = key not in self
+        v = super().pop(key, *args)
+        if not missing:
+            self._invalidate()
+            self._released(key, v)
+        return v
+
+    def popitem(self, last=True):
+        key, v = super().popitem(last=last)
+        self._invalidate()
+        self._released(key, v)
+        return key, v
+
+    def clear(self):
+        for k, a in self.items():
+            self._released(k, a)
+        super().clear()
+        self._invalidate()
+        self._free_name_index = 0
+        self.spatial.clear()
+        self.snapping.clear()
+
+    def axes_moved(self, a):
+        """update the indices after the position of an axes has changed"""
+        self.spatial.update(a.axname, a.bounds)
+        self.snapping.update(a.axname, a.bounds)
+        self.mark_dirty([a.axname])
+
+    # --------------
+    # dirty tracking
+    # --------------
+
+    def mark_dirty(self, names=None, views=None):
+        """
+        mark axes to be updated by views
+        :param names: names of the changed axes, all axes if None
+        :param views: names of the views to update, all views if None
+        """
+        if names is None:
+            names = self.keys()
+        for view in (self.VIEWS if views is None else views):
+            self._dirty[view].update(names)
+
+    def take_changes(self, view):
+        """
+        names in row order of the axes that changed since the last call for a view
+        and whether axes were added, removed or reordered since then
+        """
+        dirty, self._dirty[view] = self._dirty[view], set()
+        restructured, self._restructured[view] = self._restructured[view], False
+        return sorted((n for n in dirty if n in self), key=self.index), restructured
+
+    def move_to_end(self, key, last=True):
+        super().move_to_end(key, last=last)
+        self._invalidate()
+
+    def add(self, x, y, w, h, anchor=None, apply_anchor=False, name=None, lock_aspect=False):
         if anchor is None:
             anchor = self.anchor
 
-        n = self.next_axes_name()
+        n = self.next_axes_name() if name is None else name
 
         if apply_anchor:
             a = GuiPositioningAxes.from_position(self.figure, x, y, w, h, anchor=anchor)
         else:
             a = GuiPositioningAxes(self.figure, (x, y, w, h), anchor=anchor)
+        a.lock_aspect(lock_aspect)
         self[n] = a
 
         return a
 
-    def plot_guides(self, selected=True, relative=True):
-        x = set()
-        y = set()
-        xc = set()
-        yc = set()
-        a = None
-        for a in self.values():
-            if selected and not a._selected:
-                continue
-            ax, ay, axc, ayc = a.get_guides()
-            x |= ax
-            y |= ay
-            xc |= axc
-            yc |= ayc
-        if a is not None:
-            a.plot_guides(x, y, xc, yc, relative=relative)
+    def plot_guides(self, selected=True, relative=True, units=None, tol=1e-6):
+        """
+        draw guides at the edges and centers of all or the selected axes
+        positions within tol of each other are merged into one guide
+        """
+        axes = self.selected if selected else list(self.values())
+        self.guides.remove()
+        if not axes:
+            return
+        x, y, xc, yc = guide_positions([a.bounds for a in axes], tol=tol)
+        self.guides.draw(x, y, xc, yc, self.transform('relative', position_units(relative, units)))
+
+    def plot_overlay(self, exclude=None):
+        """
+        draw the placeholders of all axes as a single overlay
+        :param exclude: name of an axes that is not drawn
+        """
+        names = [n for n in self.keys() if n != exclude]
+        axes = [self[n] for n in names]
+        self.overlay.update(names,
+                            [a.bounds for a in axes],
+                            [a.get_anchor() for a in axes],
+                            [n in self._selection for n in names])
 
     def bounds(self):
         return [a.bounds for a in self.values()]
 
-    def set_property(self, axname, attr, value, relative=True):
+    def batch(self, names=None, selected=False):
+        """
+        batch the position changes of the named axes (all axes by default)
+        each axes sets its position once at the end of the with block
+        """
+        if names is None:
+            axes = self.selected if selected else list(self.values())
+        else:
+            axes = [self[n] for n in names]
+        return batch(axes)
+
+    def absolute_bounds(self):
+        """(N, 4) array of the bounds of all axes in dots"""
+        return self.metrics.bounds_rel2abs(np.reshape(self.bounds(), (-1, 4)))
+
+    @property
+    def metrics(self):
+        """cached size and dpi metrics of the figure"""
+        return FigureMetrics.of(self.figure)
+
+    def transform(self, src='relative', dst='pixels'):
+        """cached UnitTransform between two units of the figure"""
+        return self.metrics.transform(src, dst)
+
+    def set_property(self, axname, attr, value, relative=True, units=None, snap=None):
+        """
+        set a position attribute of an axes from a value in the given units
+        :param snap: snap the edges or center to those of other axes within this number of pixels
+        """
         a = self[axname]
-        if not relative:
-            value = a.abs2rel(value, attr=attr)
+        value = self.transform(position_units(relative, units), 'relative').transform(value, attr)
+        if snap and attr in ('x', 'y', 'w', 'h'):
+            value = self.snap_value(axname, attr, value, snap)
         setattr(a, attr, value)
 
+    # --------
+    # snapping
+    # --------
+
+    def _snap_tol(self, tol, dim):
+        """tolerance in pixels as relative figure coordinates"""
+        return tol / self.metrics.scale[0 if dim == 'x' else 1]
+
+    def snap_position(self, v, size, dim, anchor, tol, exclude=None):
+        """
+        snap the anchor position of a box so that one of its edges or its center
+        aligns with those of the axes within tol pixels
+        :param v: x or y position of the anchor
+        :param size: width or height of the box
+        :param dim: 'x' or 'y'
+        :param anchor: relative anchor coordinate in the dimension
+        """
+        xll = v - anchor * size
+        return v + self.snapping.snap_offset((xll, xll + size / 2, xll + size), dim,
+                                             self._snap_tol(tol, dim), exclude=exclude)
+
+    def snap_size(self, v, size, dim, anchor, tol, exclude=None):
+        """
+        snap the size of a box with a fixed anchor position so that one of
+        its moving edges or its center aligns with those of the axes within tol pixels
+        """
+        rtol = self._snap_tol(tol, dim)
+        best = None
+        for c in (0., .5, 1.):
+            # the coordinate of the feature is v + k * size
+            k = c - anchor
+            if k == 0:
+                continue
+            t = self.snapping.nearest(v + k * size, dim, rtol, exclude=exclude)
+            if t is None or (t - v) / k <= 0:
+                continue
+            d = abs(t - v - k * size)
+            if best is None or d < best[0]:
+                best = d, (t - v) / k
+        return size if best is None else best[1]
+
+    def snap_value(self, axname, attr, value, tol):
+        """snap a new relative x, y, w or h value of an axes to the other axes"""
+        a = self[axname]
+        dim = 'x' if attr in ('x', 'w') else 'y'
+        anchor = a.get_anchor()[0 if dim == 'x' else 1]
+        if attr in ('x', 'y'):
+            size = a.w if dim == 'x' else a.h
+            return self.snap_position(value, size, dim, anchor, tol, exclude=axname)
+        v = a.x if dim == 'x' else a.y
+        return self.snap_size(v, value, dim, anchor, tol, exclude=axname)
+
     def next_axes_name(self):
-        """generate a new unique axes name"""
-        axnames = list(self.keys())
-        for i in range(50):
-            n = chr(65 + i)
-            if n not in axnames:
-                return n
-        raise ValueError('could not find unique axis name')
+        """generate a new unique axes name (A..Z, AA..)"""
+        i = self._free_name_index
+        while axes_name(i) in self:
+            i += 1
+        self._free_name_index = i
+        return axes_name(i)
 
     def select(self, name, b=True):
-        self[name]._selected = bool(b)
+        if name not in self:
+            raise KeyError(name)
+        if bool(b) == (name in self._selection):
+            return
+        if b:
+            self._selection[name] = None
+        else:
+            del self._selection[name]
+        self.mark_dirty([name])
+
+    def is_selected(self, name):
+        return name in self._selection
 
     def select_all(self):
-        for k in self.keys():
-            self.select(k, True)
+        self.mark_dirty([n for n in self.keys() if n not in self._selection])
+        self._selection = OrderedDict.fromkeys(self.keys())
 
     def select_none(self):
-        for k in self.keys():
-            self.select(k, False)
+        self.mark_dirty(self._selection)
+        self._selection.clear()
 
     def map(self, fn, selected=False):
-        for a in self.values():
-            if selected and not a._selected:
-                continue
+        for a in (self.selected if selected else self.values()):
             fn(a)
 
     @property
     def names(self):
-        return list(self.keys())
+        """list of the axes names in row order"""
+        return list(self._name_list())
+
+    def _name_list(self):
+        if self._names is None:
+            self._names = list(self.keys())
+        return self._names
+
+    def name_at(self, row):
+        """name of the axes in a row"""
+        return self._name_list()[row]
+
+    def index(self, name):
+        """row of an axes name"""
+        if self._rows is None:
+            self._rows = {k: i for i, k in enumerate(self._name_list())}
+        return self._rows[name]
 
     def change_order(self, newnames):
-        if set(self.names) ^ set(newnames):
+        newnames = list(newnames)
+        if len(newnames) != len(self) or set(self.keys()) ^ set(newnames):
             raise ValueError('moved names do not match current axes names')
 
-        data = dict()
-        for k in self.names:
-            data[k] = self.pop(k)
-        assert not self
         for name in newnames:
-            self[name] = data.pop(name)
-        assert not data
+            super().move_to_end(name)
+        self._invalidate()
 
     @property
     def selected(self):
-        return [a for a in self.values() if a._selected]
+        """selected axes in row order"""
+        return [self[k] for k in self.selected_names]
 
     @property
     def selected_names(self):
-        return [k for k, a in self.items() if a._selected]
+        """names of the selected axes in row order"""
+        return sorted(self._selection, key=self.index)
 
     def any_selected(self):
-        for v in self.values():
-            if v._selected:
-                return True
-        return False
+        return bool(self._selection)
+
+    def hit(self, x, y):
+        """name of the top axes at a position in figure coordinates, None if there is no axes"""
+        names = self.spatial.query_point(x, y)
+        if not names:
+            return None
+        return max(names, key=self.index)
+
+    def names_in(self, x0, y0, x1, y1, contain=False):
+        """
+        names in row order of the axes intersecting a box of (xll, yll, xur, yur)
+        or only of the axes completely within it if contain is True
+        """
+        return sorted(self.spatial.query_box(x0, y0, x1, y1, contain=contain), key=self.index)
@@ -0,0 +1,122 @@
+import numpy as np
+from matplotlib.collections import PolyCollection, PathCollection
+from matplotlib.markers import MarkerStyle
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import IdentityTransform
+
+
+def box_vertices(bounds):
+    """(N, 4, 2) array of the corners of (N, 4) bounds"""
+    bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+    x0, y0, w, h = bounds.T
+    verts = np.empty((len(bounds), 4, 2))
+    verts[:, :, 0] = np.column_stack([x0, x0 + w, x0 + w, x0])
+    verts[:, :, 1] = np.column_stack([y0, y0, y0 + h, y0 + h])
+    return verts
+
+
+def marker_path(marker):
+    """path of a marker scaled like the markers of a scatter"""
+    m = MarkerStyle(marker)
+    return m.get_path().transformed(m.get_transform())
+
+
+class PlaceholderOverlay(object):
+
+    """
+    Placeholders of all axes drawn by three figure artists
+
+    the boxes are drawn as one PolyCollection, the anchor markers as one
+    PathCollection and the labels as one PathCollection of text paths.
+    the artists are rebuilt from the bounds array on each update, the
+    text paths of the labels are cached
+    """
+
+    color = 'k'
+    scolor = (.2, .2, .8)
+    acolor = (.9, .1, .1)
+
+    def __init__(self, figure, size=10, msize=50):
+        """
+        :param size: font size of the labels in points
+        :param msize: size of the anchor markers in points^2
+        """
+        self.figure = figure
+        self.size = size
+        self.msize = msize
+        self.boxes = None
+        self.anchors = None
+        self.labels = None
+        self._paths = dict()
+        self._markers = [marker_path('+'), marker_path('o')]
+
+    @property
+    def artists(self):
+        return [a for a in (self.boxes, self.labels, self.anchors) if a is not None]
+
+    def label_path(self, label):
+        """cached text path of a label with its top left corner at the origin"""
+        try:
+            return self._paths[label]
+        except KeyError:
+            pass
+        path = TextPath((0, 0), label, size=self.size)
+        if len(path.vertices):
+            path = Path(path.vertices - (0, path.get_extents().y1), path.codes)
+        self._paths[label] = path
+        return path
+
+    def remove(self):
+        """remove the overlay from the figure"""
+        for artist in self.artists:
+            try:
+                artist.remove()
+            except (ValueError, NotImplementedError):
+                # the figure was cleared in the meantime
+                pass
+
+    def update(self, names, bounds, anchors, selected):
+        """
+        rebuild the overlay
+        :param names: labels of the boxes
+        :param bounds: (N, 4) array of the bounds in figure coordinates
+        :param anchors: (N, 2) array of the relative anchor positions in the boxes
+        :param selected: (N,) boolean array of the selected boxes
+        """
+        self.remove()
+        fig = self.figure
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        anchors = np.asarray(anchors, dtype=float).reshape(-1, 2)
+        selected = np.asarray(selected, dtype=bool).reshape(-1)
+        if not len(bounds):
+            # the collections would draw their paths at the origin without offsets
+            return
+        x0, y0, w, h = bounds.T
+
+        colors = [self.scolor if s else self.color for s in selected]
+        widths = np.where(selected, 2., 1.)
+        points = np.column_stack([x0 + anchors[:, 0] * w, y0 + anchors[:, 1] * h])
+        offsets = np.column_stack([x0 + .05 * w, y0 + .95 * h])
+
+        if self.boxes is None:
+            self.boxes = PolyCollection([], facecolors='none', transform=fig.transFigure, zorder=1)
+            # the marker paths are cycled over the offsets, each anchor is drawn twice.
+            # the paths are in points, scaled to pixels by the sizes
+            self.anchors = PathCollection(self._markers, sizes=[self.msize],
+                                          facecolors='none', edgecolors=[self.acolor], linewidths=1,
+                                          transform=IdentityTransform(), offset_transform=fig.transFigure,
+                                          clip_on=False, zorder=3)
+            self.labels = PathCollection([], sizes=[1], facecolors=self.color, edgecolors='none',
+                                         transform=IdentityTransform(), offset_transform=fig.transFigure,
+                                         zorder=2)
+
+        self.boxes.set_verts(box_vertices(bounds))
+        self.boxes.set_edgecolors(colors)
+        self.boxes.set_linewidths(widths)
+        self.anchors.set_offsets(np.repeat(points, 2, axis=0))
+        self.labels.set_paths([self.label_path(n) for n in names])
+        self.labels.set_offsets(offsets)
+
+        for artist in self.artists:
+            fig.add_artist(artist)
@@ -0,0 +1,74 @@
+from PyQt5 import QtCore
+
+
+class RedrawScheduler(object):
+
+    """
+    Coalesce redraw requests into one redraw per event loop turn
+
+    requests mark the canvas and table as invalid and start a zero-timeout
+    timer, all requests until the timer fires are handled by a single flush.
+    the counters show how many requests were coalesced
+
+    >>>scheduler = RedrawScheduler(editor.draw_canvas, editor.draw_table)
+    >>>scheduler.request(table=True)
+    >>>scheduler.request()
+    >>>scheduler.flush()
+    >>>scheduler.stats()
+    {'requests': 2, 'flushes': 1, 'coalesced': 1}
+    """
+
+    def __init__(self, draw_canvas, draw_table):
+        """
+        :param draw_canvas: function to redraw the canvas
+        :param draw_table: function to update the table
+        """
+        self.draw_canvas = draw_canvas
+        self.draw_table = draw_table
+        self.canvas = False
+        self.table = False
+        self.requests = 0
+        self.flushes = 0
+        self._timer = QtCore.QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def pending(self):
+        return self.canvas or self.table
+
+    @property
+    def coalesced(self):
+        """number of requests that did not need a redraw of their own"""
+        return self.requests - self.flushes
+
+    def request(self, canvas=True, table=False):
+        """mark the canvas and/or the table to be redrawn in the next event loop turn"""
+        self.requests += 1
+        self.canvas = self.canvas or canvas
+        self.table = self.table or table
+        if self.pending and not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """redraw the invalidated parts now"""
+        self._timer.stop()
+        if not self.pending:
+            return
+        canvas, table = self.canvas, self.table
+        self.canvas = self.table = False
+        self.flushes += 1
+        if canvas:
+            self.draw_canvas()
+        if table:
+            self.draw_table()
+
+    def stats(self):
+        return dict(requests=self.requests,
+                    flushes=self.flushes,
+                    coalesced=self.coalesced)
+
+    def reset_stats(self):
+        self.requests = 0
+        self.flushes = 0
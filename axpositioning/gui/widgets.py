@@ -1,8 +1,13 @@
 from PyQt5 import QtWidgets, QtCore, QtGui
-from matplotlib.gridspec import GridSpec
+from ..cache import LayoutCache
+from ..layout import gridspec_bounds
+from ..units import position_units, UNIT_FORMATS
 
 
-__all__ = ['hline', 'AxesPositionsWidget', 'NumField', 'IntField', 'MultiIntField', 'FloatField', 'AddAxesWidget', 'SplitDialog']
+__all__ = ['hline', 'AxesTableModel', 'AxesPositionsWidget', 'NumField', 'IntField', 'MultiIntField', 'FloatField', 'AddAxesWidget', 'SplitDialog']
+
+cached_gridspec_bounds = LayoutCache(maxsize=32).memoize(gridspec_bounds)
+
 
 def hline():
     f = QtWidgets.QFrame()
@@ -11,103 +16,197 @@ def hline():
     return f
 
 
-class AxesPositionsWidget(QtWidgets.QTableWidget):
+class AxesTableModel(QtCore.QAbstractTableModel):
 
     """
-    table of axes positions
+    table model of the positions of an AxesSet
+
+    the values are formatted in the current units when the view requests
+    them, so only the visible cells are formatted. edits are not applied to
+    the axes but emitted, the owner updates the axes and calls update_rows
 
     signals:
-    - changed(axes_name, attr_name, value)
-    - deleted(axes_name)
+    - changed(row, attr_name, value)
+    - invalid_value(row, col, attr_name)
     """
 
     changed = QtCore.pyqtSignal(int, str, object)
-    selected = QtCore.pyqtSignal(str, bool)
-    moved = QtCore.pyqtSignal(list, int)  # row indices, new row index
     invalid_value = QtCore.pyqtSignal(int, int, str)
 
     COLUMN_ATTRS = ('_selected', 'x', 'y', 'w', 'h', 'aspect')
     COLUMN_TYPES = (bool, float, float, float, float, float)
     COLUMN_NAMES = ('', 'X', 'Y', 'Width', 'Height', 'Aspect')
 
+    def __init__(self, axes, relative=True, units=None):
+        super().__init__()
+        self.axes = axes
+        self.units = position_units(relative, units)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.axes)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMN_ATTRS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.COLUMN_NAMES[section]
+        return self.axes.name_at(section)
+
+    def flags(self, index):
+        if not index.isValid():
+            # rows are dropped between the rows of the table
+            return QtCore.Qt.ItemIsDropEnabled
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsDragEnabled
+        if self.COLUMN_TYPES[index.column()] is bool:
+            return flags | QtCore.Qt.ItemIsUserCheckable
+        return flags | QtCore.Qt.ItemIsEditable
+
+    def supportedDropActions(self):
+        return QtCore.Qt.MoveAction
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        attr = self.COLUMN_ATTRS[index.column()]
+        coltype = self.COLUMN_TYPES[index.column()]
+        if coltype is bool:
+            if role == QtCore.Qt.CheckStateRole:
+                value = getattr(self.axes[self.axes.name_at(index.row())], attr)
+                return QtCore.Qt.Checked if value else QtCore.Qt.Unchecked
+            return None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return self.format(getattr(self.axes[self.axes.name_at(index.row())], attr), attr)
+        return None
+
+    def format(self, value, attr):
+        """format a value of an attribute in the current units"""
+        if attr in ('x', 'y', 'w', 'h'):
+            t = self.axes.transform('relative', self.units)
+            return UNIT_FORMATS[self.units].format(t.transform(value, attr))
+        return '{:.3f}'.format(value)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid():
+            return False
+        row, col = index.row(), index.column()
+        attr = self.COLUMN_ATTRS[col]
+        valtype = self.COLUMN_TYPES[col]
+        if valtype is bool:
+            if role != QtCore.Qt.CheckStateRole:
+                return False
+            value = value == QtCore.Qt.Checked
+        elif role == QtCore.Qt.EditRole:
+            try:
+                value = float(value)
+            except ValueError:
+                self.invalid_value.emit(row, col, attr)
+                return False
+        else:
+            return False
+        self.changed.emit(row, attr, value)
+        return True
+
+    def set_units(self, relative=True, units=None):
+        """show the positions in other units"""
+        units = position_units(relative, units)
+        if units != self.units:
+            self.units = units
+            self.update_all()
+
+    def reset(self):
+        """update the table after axes were added, removed or reordered"""
+        self.beginResetModel()
+        self.endResetModel()
+
+    def update_all(self):
+        if len(self.axes):
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.axes) - 1, self.columnCount() - 1))
+
+    def update_rows(self, names):
+        """notify the views of the changed values of the named axes"""
+        rows = sorted(self.axes.index(n) for n in names)
+        # one notification per range of consecutive rows
+        i = 0
+        while i < len(rows):
+            j = i
+            while j + 1 < len(rows) and rows[j + 1] == rows[j] + 1:
+                j += 1
+            self.dataChanged.emit(self.index(rows[i], 0), self.index(rows[j], self.columnCount() - 1))
+            i = j + 1
+
+
+class AxesPositionsWidget(QtWidgets.QTableView):
+
+    """
+    table of axes positions
+
+    signals:
+    - changed(row, attr_name, value)
+    - selected(axes_name, selected)
+    - moved(rows, row)
+    - invalid_value(row, col, attr_name)
+    """
+
+    changed = QtCore.pyqtSignal(int, str, object)
+    selected = QtCore.pyqtSignal(str, bool)
+    moved = QtCore.pyqtSignal(list, int)  # row indices, new row index
+    invalid_value = QtCore.pyqtSignal(int, int, str)
+
+    COLUMN_WIDTHS = (30, 50, 50, 50, 50, 50)
+
     def __init__(self, axes, **kw):
         super().__init__()
+        self.axes_model = AxesTableModel(axes, **kw)
+        self.axes_model.changed.connect(self.changed)
+        self.axes_model.invalid_value.connect(self.invalid_value)
+        self.setModel(self.axes_model)
         self.build()
-        self.fill(axes, **kw)
-        self.last_drop_row = None
-        self.cellChanged.connect(self.changed_item)
 
     def build(self):
         self.setDragEnabled(True)
         self.setAcceptDrops(True)
+        self.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
         self.setDragDropOverwriteMode(False)
         self.horizontalHeader().setSectionsMovable(True)
+        self.verticalHeader().setDefaultSectionSize(25)
         self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-
-    def fill(self, axes, relative=True):
-        """fill the table based on the given axes position objects"""
-
-        widths = [30, 50, 50, 50, 50, 50]
-        self.setColumnCount(len(self.COLUMN_NAMES))
         self.setShowGrid(False)
-        for i, w in enumerate(widths):
+        for i, w in enumerate(self.COLUMN_WIDTHS):
             self.setColumnWidth(i, w)
-        self.setHorizontalHeaderLabels(self.COLUMN_NAMES)
-
-        self.setRowCount(len(axes))
-        names = []
-        self.blockSignals(True)
-        for i, (k, v) in enumerate(axes.items()):
-            for j, attr in enumerate(self.COLUMN_ATTRS):
-                coltype = self.COLUMN_TYPES[j]
-                flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsDragEnabled
-                value = getattr(v, attr)
-                if coltype is bool:
-                    f = QtWidgets.QTableWidgetItem()
-                    f.setFlags(flags | QtCore.Qt.ItemIsUserCheckable)
-                    f.setCheckState(QtCore.Qt.Checked if value else QtCore.Qt.Unchecked)
-                elif coltype is float:
-                    if not relative and attr in ('x', 'y', 'w', 'h'):
-                        f = QtWidgets.QTableWidgetItem('{:.0f}'.format(v.rel2abs(value, attr)))
-                    else:
-                        f = QtWidgets.QTableWidgetItem('{:.3f}'.format(value))
-                    f.setFlags(flags | QtCore.Qt.ItemIsEditable)
-                self.setItem(i, j, f)
-            self.setRowHeight(i, 25)
-
-            names.append(k)
-        self.setVerticalHeaderLabels(names)
-        self.blockSignals(False)
-
-    def changed_item(self, row, col):
-        item = self.item(row, col)
-        valtype = self.COLUMN_TYPES[col]
-        if valtype is bool:
-            value = item.checkState() == QtCore.Qt.Checked
-        elif valtype is float:
-            try:
-                value = float(item.text())
-            except ValueError as e:
-                print(e)
-                self.invalid_value.emit(row, col, self.COLUMN_ATTRS[col])
-        else:
-            raise ValueError('unknown value type')
-        self.changed.emit(row, self.COLUMN_ATTRS[col], value)
-
 
-    def dropMimeData(self, row, col, mimeData, action):
-        self.last_drop_row = row
-        return True
+    def fill(self, axes, relative=True, units=None):
+        """show the positions of all axes after axes were added, removed or reordered"""
+        self.axes_model.axes = axes
+        self.axes_model.units = position_units(relative, units)
+        self.axes_model.reset()
+
+    def update_rows(self, axes, names, relative=True, units=None):
+        """update the rows of the named axes, or all rows if the units changed"""
+        units = position_units(relative, units)
+        if units != self.axes_model.units:
+            self.axes_model.set_units(units=units)
+        else:
+            self.axes_model.update_rows(names)
 
     def dropEvent(self, event):
-        sender = event.source()
-        super().dropEvent(event)
-        if sender is self:
-            if self.last_drop_row is None:
-                return
-            event.accept()
-            rows = sorted(set([int(ind.row()) for ind in self.selectedIndexes()]))
-            self.moved.emit(rows, int(self.last_drop_row))
+        if event.source() is not self:
+            event.ignore()
+            return
+        # the rows are moved by the owner of the axes, not by the model
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            row = self.axes_model.rowCount()
+        elif self.dropIndicatorPosition() == QtWidgets.QAbstractItemView.BelowItem:
+            row = index.row() + 1
+        else:
+            row = index.row()
+        event.setDropAction(QtCore.Qt.IgnoreAction)
+        event.accept()
+        rows = sorted(set(int(ind.row()) for ind in self.selectionModel().selectedRows()))
+        self.moved.emit(rows, row)
 
 
 class NumField(QtWidgets.QLineEdit):
@@ -379,7 +478,7 @@ class AddAxesWidget(QtWidgets.QWidget):
             if k in ('nrows', 'ncols', 'left', 'right', 'top', 'bottom', 'wspace', 'hspace'):
                 data[k] = v
 
-        gs = GridSpec(**data)
+        grid = cached_gridspec_bounds(**data)
         bounds = []
 
         if self.all_checkbox.isChecked():
@@ -392,7 +491,7 @@ class AddAxesWidget(QtWidgets.QWidget):
         if isinstance(I, tuple):
             for i in I:
                 try:
-                    bnd = gs[i].get_position(self.figure).bounds
+                    bnd = tuple(map(float, grid[i]))
                 except IndexError as e:
                     msg = QtWidgets.QMessageBox()
                     msg.setText('Invalid grid index: {}'.format(e))
@@ -415,9 +514,8 @@ class SplitDialog(QtWidgets.QDialog):
         self.fields = dict()
 
         f = QtWidgets.QLineEdit()
-        f.setText('{:.3f}'.format(self.data['ratio']))
-        v = QtGui.QDoubleValidator(0, 1, 3)
-        f.setValidator(v)
+        f.setText(self.format_ratio(self.data['ratio']))
+        f.setToolTip('ratio of the first part or comma separated ratios of all parts')
         self.fields['ratio'] = f
         layout.addRow('Ratio', f)
 
@@ -437,8 +535,25 @@ class SplitDialog(QtWidgets.QDialog):
         b.clicked.connect(self.accept)
         layout.addRow('', b)
 
+    @staticmethod
+    def format_ratio(ratio):
+        if isinstance(ratio, tuple):
+            return ', '.join('{:g}'.format(r) for r in ratio)
+        return '{:.3f}'.format(ratio)
+
+    @staticmethod
+    def parse_ratio(text):
+        """parse a single ratio or comma separated ratios of the parts"""
+        try:
+            ratios = tuple(float(v) for v in text.split(','))
+        except ValueError:
+            raise ValueError('invalid ratio: {!r}'.format(text))
+        if len(ratios) == 1:
+            return ratios[0]
+        return ratios
+
     def get_data(self):
-        ratio = float(self.fields['ratio'].text())
+        ratio = self.parse_ratio(self.fields['ratio'].text())
         spacing = float(self.fields['spacing'].text())
         horizontal = bool(self.fields['horizontal'].isChecked())
 
@@ -0,0 +1,576 @@
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.transforms import Bbox
+from .metrics import FigureMetrics
+
+
+def anchor_coefs(a):
+    """convert an anchor code to a tuple of relative anchor coordinates"""
+    if isinstance(a, str):
+        return Bbox.coefs[a]
+    return tuple(a)
+
+
+def anchor_array(a, n):
+    """
+    convert an anchor code, tuple or sequence of those
+    to an (n, 2) array of relative anchor coordinates
+    """
+    if isinstance(a, str):
+        a = anchor_coefs(a)
+    try:
+        arr = np.asarray(a, dtype=float)
+    except ValueError:
+        arr = np.array([anchor_coefs(v) for v in a], dtype=float)
+    return np.array(np.broadcast_to(arr, (n, 2)))
+
+
+def split_ratios(ratio):
+    """
+    normalized ratios of the parts of a split
+    a scalar ratio between 0 and 1 describes a split in two parts
+    """
+    if np.ndim(ratio) == 0:
+        r = float(ratio)
+        if r < 0 or r > 1:
+            raise ValueError('ratio must be between 0 and 1')
+        ratios = np.array([r, 1 - r])
+    else:
+        ratios = np.asarray(ratio, dtype=float)
+    if (ratios < 0).any() or not ratios.sum() > 0:
+        raise ValueError('ratios must be positive')
+    return ratios / ratios.sum()
+
+
+def split_bounds(bounds, ratio=0.5, spacing=0.1, wsplit=True):
+    """
+    split boxes in parts along the horizontal (wsplit) or vertical direction
+
+    :param bounds: (xll, yll, w, h) or (M, 4) array of bounds
+    :param ratio: sizes of the parts relative to each other or a single ratio for two parts
+    :param spacing: spacing between the parts, a single value or one per gap
+    :param wsplit: split horizontally
+    :return: (N, 4) or (M, N, 4) array of bounds of the parts
+             ordered from left to right or bottom to top
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    ratios = split_ratios(ratio)
+    n = len(ratios)
+
+    spacing = np.broadcast_to(np.asarray(spacing, dtype=float), (n - 1,))
+    dim = 0 if wsplit else 1
+    pos = bounds[..., dim, np.newaxis]
+    size = bounds[..., dim + 2, np.newaxis]
+
+    if (spacing.sum() >= size).any():
+        raise ValueError('spacing too large, cannot split axes')
+
+    sizes = (size - spacing.sum()) * ratios
+    offsets = np.concatenate([[0], np.cumsum(spacing)])
+    starts = pos + np.cumsum(sizes, axis=-1) - sizes + offsets
+
+    parts = np.repeat(bounds[..., np.newaxis, :], n, axis=-2)
+    parts[..., dim] = starts
+    parts[..., dim + 2] = sizes
+    return parts
+
+
+def grid_bounds(bounds, shape, hspacing=0., vspacing=0., width_ratios=None, height_ratios=None):
+    """
+    split boxes in a grid of rows x cols parts
+
+    :param bounds: (xll, yll, w, h) or (M, 4) array of bounds
+    :param shape: (rows, cols)
+    :param hspacing: horizontal spacing between columns, a single value or one per gap
+    :param vspacing: vertical spacing between rows, a single value or one per gap
+    :param width_ratios: relative widths of the columns
+    :param height_ratios: relative heights of the rows (from top to bottom)
+    :return: (rows, cols, 4) or (M, rows, cols, 4) array of bounds
+             the rows are ordered from top to bottom as in hsubplots
+    """
+    m, n = shape
+    if width_ratios is None:
+        width_ratios = np.ones(n)
+    if height_ratios is None:
+        height_ratios = np.ones(m)
+
+    # reverse the rows to split from bottom to top
+    cols = split_bounds(bounds, width_ratios, hspacing, wsplit=True)
+    rows = split_bounds(bounds, np.asarray(height_ratios)[::-1],
+                        np.broadcast_to(vspacing, (m - 1,))[::-1], wsplit=False)[..., ::-1, :]
+
+    grid = np.empty(rows.shape[:-1] + (n, 4))
+    grid[..., [0, 2]] = cols[..., np.newaxis, :, :][..., [0, 2]]
+    grid[..., [1, 3]] = rows[..., :, np.newaxis, :][..., [1, 3]]
+    return grid
+
+
+def gridspec_bounds(nrows, ncols, left=None, bottom=None, right=None, top=None,
+                    wspace=None, hspace=None):
+    """
+    bounds of the cells of a matplotlib GridSpec without creating a figure
+    parameters that are None are taken from the figure.subplot rcParams
+
+    :param wspace: spacing between columns as fraction of the average column width
+    :param hspace: spacing between rows as fraction of the average row height
+    :return: (nrows * ncols, 4) array of bounds in GridSpec index order (rows from the top)
+    """
+    params = dict(left=left, bottom=bottom, right=right, top=top, wspace=wspace, hspace=hspace)
+    for k, v in params.items():
+        if v is None:
+            params[k] = rcParams['figure.subplot.' + k]
+    w = params['right'] - params['left']
+    h = params['top'] - params['bottom']
+
+    # GridSpec spacings are relative to the cell size
+    cellw = w / (ncols + params['wspace'] * (ncols - 1))
+    cellh = h / (nrows + params['hspace'] * (nrows - 1))
+    bounds = (params['left'], params['bottom'], w, h)
+    grid = grid_bounds(bounds, (nrows, ncols), params['wspace'] * cellw, params['hspace'] * cellh)
+    return grid.reshape(-1, 4)
+
+
+class LayoutBox(object):
+
+    """
+    Lightweight axes geometry without a matplotlib Axes
+
+    implements the same anchor aware x, y, w, h and aspect semantics as
+    PositioningAxes, but only stores the bounds, anchor and the aspect
+    ratio of the figure
+
+    >>>b = LayoutBox((.1, .1, .8, .8), anchor='C', figaspect=1.5)
+    >>>b.x, b.y
+    (0.5, 0.5)
+    >>>b.w = .4
+    >>>b.bounds
+    (0.3, 0.1, 0.4, 0.8)
+    """
+
+    __slots__ = ('_xll', '_yll', '_w', '_h', '_anchor', '_locked_aspect', 'figaspect')
+
+    def __init__(self, bounds, anchor='C', lock_aspect=False, figaspect=1.):
+        self._xll, self._yll, self._w, self._h = map(float, bounds)
+        self._locked_aspect = lock_aspect
+        self.figaspect = float(figaspect)
+        self.set_anchor(anchor)
+
+    @classmethod
+    def from_axes(cls, a, anchor=None, lock_aspect=None):
+        """
+        create a box from the current position of an axes
+        the anchor and locked aspect are taken from the axes if not given
+        """
+        if anchor is None:
+            anchor = a.get_anchor()
+        if lock_aspect is None:
+            lock_aspect = getattr(a, '_locked_aspect', False)
+        return cls(a.get_position().bounds,
+                   anchor=anchor,
+                   lock_aspect=lock_aspect,
+                   figaspect=FigureMetrics.of(a.figure).aspect)
+
+    @classmethod
+    def from_position(cls, x, y, w, h, anchor='C', **kwargs):
+        """
+        accounts for anchor when setting the bounds from the position
+        """
+        o = cls((x, y, w, h), anchor=anchor, **kwargs)
+        o.x, o.y = x, y
+        return o
+
+    def apply_to(self, a):
+        """set the bounds of the box as position of an axes"""
+        a.set_position(self.bounds)
+        return a
+
+    def copy(self):
+        return self.__class__(self.bounds,
+                              anchor=self._anchor,
+                              lock_aspect=self._locked_aspect,
+                              figaspect=self.figaspect)
+
+    def set_anchor(self, a):
+        """set the anchor from a code or a tuple of relative coordinates"""
+        self._anchor = anchor_coefs(a)
+
+    def get_anchor(self):
+        return self._anchor
+
+    def split(self, ratio=0.5, spacing=0.1, wsplit=True):
+        """
+        split the box in two parts
+        the box is resized to the first part and the bounds of the second part are returned
+
+        for a sequence of ratios the box is split in multiple parts and
+        an array of the bounds of all parts except the first is returned
+        """
+        if np.ndim(ratio) > 0:
+            parts = split_bounds(self.bounds, ratio, spacing, wsplit=wsplit)
+            self.bounds = parts[0]
+            return parts[1:]
+
+        anchor = self.get_anchor()
+        self.set_anchor('SW')
+
+        try:
+            if wsplit:
+                pos, size = self.x, self.w
+            else:
+                pos, size = self.y, self.h
+
+            if spacing >= size:
+                raise ValueError('spacing too large, cannot split axes')
+
+            size1 = (size - spacing) * ratio
+            size2 = (size - spacing) * (1 - ratio)
+
+            pos2 = pos + size1 + spacing
+
+            if wsplit:
+                newbounds = (pos2, self.y, size2, self.h)
+                self.w = size1
+            else:
+                newbounds = (self.x, pos2, self.w, size2)
+                self.h = size1
+        finally:
+            self.set_anchor(anchor)
+
+        return newbounds
+
+    def split_bounds(self, ratio=0.5, spacing=0.1, wsplit=True):
+        """(N, 4) array with the bounds of the box split in N parts (see split_bounds)"""
+        return split_bounds(self.bounds, ratio, spacing, wsplit=wsplit)
+
+    def grid_bounds(self, shape, hspacing=0., vspacing=0., width_ratios=None, height_ratios=None):
+        """(rows, cols, 4) array with the bounds of the box split in a grid (see grid_bounds)"""
+        return grid_bounds(self.bounds, shape, hspacing, vspacing,
+                           width_ratios=width_ratios, height_ratios=height_ratios)
+
+    @property
+    def bounds(self):
+        """returns (xll, yll, w, h)"""
+        return self._xll, self._yll, self._w, self._h
+    @bounds.setter
+    def bounds(self, v):
+        """set new bounds"""
+        self._xll, self._yll, self._w, self._h = map(float, v)
+
+    def x2xll(self, x):
+        """convert x position to xll based on anchor"""
+        return x - self._w * self._anchor[0]
+
+    def xll2x(self, xll):
+        """convert xll to x position based on anchor"""
+        return xll + self._w * self._anchor[0]
+
+    def y2yll(self, y):
+        """convert y position to yll based on anchor"""
+        return y - self._h * self._anchor[1]
+
+    def yll2y(self, yll):
+        """convert yll to y position based on anchor"""
+        return yll + self._h * self._anchor[1]
+
+    @property
+    def x(self):
+        """x position as xll corrected for the anchor"""
+        return self.xll2x(self._xll)
+    @x.setter
+    def x(self, x):
+        """reset the bounds with a new x value"""
+        self._xll = self.x2xll(x)
+
+    @property
+    def y(self):
+        """y position as yll corrected for the anchor"""
+        return self.yll2y(self._yll)
+    @y.setter
+    def y(self, y):
+        """reset the bounds with a new y value"""
+        self._yll = self.y2yll(y)
+
+    @property
+    def w(self):
+        """width of the box"""
+        return self._w
+    @w.setter
+    def w(self, w):
+        """
+        reset the bounds with a new width value
+        the xll is corrected based on the anchor
+        if the aspect ratio is locked, the height and yll are also adjusted
+        """
+        xll, yll, w0, h = self.bounds
+
+        # adjust horizontal position based on anchor
+        xll += self._anchor[0] * (w0 - w)
+
+        # adjust height if aspect is locked
+        if self._locked_aspect:
+            h0, h = h, w * h / w0
+            # adjust vertical position based on anchor
+            yll += self._anchor[1] * (h0 - h)
+        self.bounds = xll, yll, w, h
+
+    @property
+    def h(self):
+        """height of the box"""
+        return self._h
+    @h.setter
+    def h(self, h):
+        """
+        reset the bounds with a new height value
+        the yll is corrected based on the anchor
+        if the aspect ratio is locked, the width and xll are also adjusted
+        """
+        xll, yll, w, h0 = self.bounds
+
+        # adjust vertical position based on anchor
+        yll += self._anchor[1] * (h0 - h)
+
+        # adjust width if aspect is locked
+        if self._locked_aspect:
+            w0, w = w, h * w / h0
+            # adjust horizontal position based on anchor
+            xll += self._anchor[0] * (w0 - w)
+        self.bounds = xll, yll, w, h
+
+    @property
+    def axaspect(self):
+        """aspect ratio of the box"""
+        return self.figaspect / self.aspect
+
+    @property
+    def aspect(self):
+        """real aspect ratio of figure and box together"""
+        return self.figaspect * (self._w/self._h)
+    @aspect.setter
+    def aspect(self, v):
+        self.set_aspect_ratio(v)
+
+    def lock_aspect(self, b):
+        """keep the aspect fixed"""
+        self._locked_aspect = b
+
+    @property
+    def locked_aspect(self):
+        return self._locked_aspect
+
+    def set_aspect_ratio(self, A, fix_height=False):
+        """set the aspect ratio by adjusting width or height"""
+        axaspect = A / self.figaspect
+
+        # the new aspect should not be corrected by the locked aspect
+        locked, self._locked_aspect = self._locked_aspect, False
+        try:
+            if fix_height:
+                self.w = self.h * axaspect
+            else:
+                self.h = self.w / axaspect
+        finally:
+            self._locked_aspect = locked
+
+    def __repr__(self):
+        return '<{} ({})>'.format(
+            self.__class__.__qualname__,
+            ', '.join('{:.2f}'.format(b) for b in self.bounds))
+
+
+class AxesLayout(object):
+
+    """
+    Array backed collection of axes geometries
+
+    the bounds of N boxes are stored as an (N, 4) array of (xll, yll, w, h)
+    and the anchors as an (N, 2) array of relative coordinates.
+    the anchor aware operations of LayoutBox are applied to all boxes
+    (or a subset selected with index) in a single array expression
+
+    >>>layout = AxesLayout([(.1, .1, .3, .3), (.5, .1, .4, .3)], anchor='C')
+    >>>layout.x
+    array([0.25, 0.7 ])
+    >>>layout.w = .2
+    >>>layout.bounds
+    array([[0.15, 0.1 , 0.2 , 0.3 ],
+           [0.6 , 0.1 , 0.2 , 0.3 ]])
+    """
+
+    def __init__(self, bounds=(), anchor='C', lock_aspect=False, figaspect=1.):
+        self.bounds = np.array(bounds, dtype=float).reshape(-1, 4)
+        n = len(self.bounds)
+        self.anchors = anchor_array(anchor, n)
+        self.locked_aspect = np.array(np.broadcast_to(lock_aspect, (n,)), dtype=bool)
+        self.figaspect = float(figaspect)
+
+    @classmethod
+    def from_boxes(cls, boxes, figaspect=None):
+        """create a layout from a sequence of LayoutBox objects"""
+        boxes = list(boxes)
+        if figaspect is None:
+            figaspect = boxes[0].figaspect if boxes else 1.
+        return cls([b.bounds for b in boxes],
+                   anchor=[b.get_anchor() for b in boxes],
+                   lock_aspect=[b.locked_aspect for b in boxes],
+                   figaspect=figaspect)
+
+    @classmethod
+    def from_axes(cls, axes, anchor=None):
+        """
+        create a layout from the positions of a sequence of axes
+        the anchors are taken from the axes if not given
+        """
+        return cls.from_boxes(LayoutBox.from_axes(a, anchor=anchor) for a in axes)
+
+    def apply_to(self, axes):
+        """set the bounds as positions of a sequence of axes"""
+        for a, bnd in zip(axes, self.bounds):
+            a.set_position(bnd)
+        return axes
+
+    def box(self, i):
+        """LayoutBox with the geometry of box i"""
+        return LayoutBox(self.bounds[i],
+                         anchor=self.anchors[i],
+                         lock_aspect=bool(self.locked_aspect[i]),
+                         figaspect=self.figaspect)
+
+    def boxes(self):
+        return [self.box(i) for i in range(len(self))]
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __repr__(self):
+        return '<{} ({} boxes)>'.format(self.__class__.__qualname__, len(self))
+
+    @staticmethod
+    def _index(index):
+        return slice(None) if index is None else index
+
+    def set_anchor(self, a, index=None):
+        """set the anchor of all boxes or a subset"""
+        index = self._index(index)
+        n = len(self.anchors[index])
+        self.anchors[index] = anchor_array(a, n)
+
+    def lock_aspect(self, b, index=None):
+        """keep the aspect fixed for all boxes or a subset"""
+        self.locked_aspect[self._index(index)] = b
+
+    def x2xll(self, x, index=None):
+        """convert x positions to xll based on anchor"""
+        index = self._index(index)
+        return x - self.bounds[index, 2] * self.anchors[index, 0]
+
+    def xll2x(self, xll, index=None):
+        """convert xll to x positions based on anchor"""
+        index = self._index(index)
+        return xll + self.bounds[index, 2] * self.anchors[index, 0]
+
+    def y2yll(self, y, index=None):
+        """convert y positions to yll based on anchor"""
+        index = self._index(index)
+        return y - self.bounds[index, 3] * self.anchors[index, 1]
+
+    def yll2y(self, yll, index=None):
+        """convert yll to y positions based on anchor"""
+        index = self._index(index)
+        return yll + self.bounds[index, 3] * self.anchors[index, 1]
+
+    @property
+    def x(self):
+        """x positions as xll corrected for the anchor"""
+        return self.xll2x(self.bounds[:, 0])
+    @x.setter
+    def x(self, x):
+        self.set_x(x)
+
+    def set_x(self, x, index=None):
+        """reset the bounds with new x values"""
+        index = self._index(index)
+        self.bounds[index, 0] = self.x2xll(x, index=index)
+
+    @property
+    def y(self):
+        """y positions as yll corrected for the anchor"""
+        return self.yll2y(self.bounds[:, 1])
+    @y.setter
+    def y(self, y):
+        self.set_y(y)
+
+    def set_y(self, y, index=None):
+        """reset the bounds with new y values"""
+        index = self._index(index)
+        self.bounds[index, 1] = self.y2yll(y, index=index)
+
+    @property
+    def w(self):
+        """widths of the boxes"""
+        return self.bounds[:, 2].copy()
+    @w.setter
+    def w(self, w):
+        self.set_w(w)
+
+    def set_w(self, w, index=None):
+        """
+        reset the bounds with new width values
+        the xll is corrected based on the anchor
+        if the aspect ratio is locked, the height and yll are also adjusted
+        """
+        self._resize(w=w, index=index)
+
+    @property
+    def h(self):
+        """heights of the boxes"""
+        return self.bounds[:, 3].copy()
+    @h.setter
+    def h(self, h):
+        self.set_h(h)
+
+    def set_h(self, h, index=None):
+        """
+        reset the bounds with new height values
+        the yll is corrected based on the anchor
+        if the aspect ratio is locked, the width and xll are also adjusted
+        """
+        self._resize(h=h, index=index)
+
+    def _resize(self, w=None, h=None, index=None, lock=True):
+        """resize boxes around their anchor with a new width or height"""
+        index = self._index(index)
+        xll, yll, w0, h0 = self.bounds[index].T
+        ax, ay = self.anchors[index].T
+        locked = self.locked_aspect[index] if lock else False
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if w is not None:
+                w = np.broadcast_to(np.asarray(w, dtype=float), w0.shape)
+                h = np.where(locked, w * h0 / w0, h0)
+            else:
+                h = np.broadcast_to(np.asarray(h, dtype=float), h0.shape)
+                w = np.where(locked, h * w0 / h0, w0)
+
+        self.bounds[index] = np.stack([xll + ax * (w0 - w),
+                                       yll + ay * (h0 - h),
+                                       w, h], axis=-1)
+
+    @property
+    def axaspect(self):
+        """aspect ratios of the boxes"""
+        return self.figaspect / self.aspect
+
+    @property
+    def aspect(self):
+        """real aspect ratios of figure and boxes together"""
+        return self.figaspect * (self.bounds[:, 2] / self.bounds[:, 3])
+
+    def set_aspect_ratio(self, A, fix_height=False, index=None):
+        """set the aspect ratios by adjusting widths or heights"""
+        index = self._index(index)
+        axaspect = np.asarray(A, dtype=float) / self.figaspect
+
+        if fix_height:
+            self._resize(w=self.bounds[index, 3] * axaspect, index=index, lock=False)
+        else:
+            self._resize(h=self.bounds[index, 2] / axaspect, index=index, lock=False)
@@ -0,0 +1,94 @@
+import weakref
+from matplotlib.transforms import TransformNode
+from .units import UnitTransform
+
+
+class FigureMetrics(object):
+
+    """
+    Cached size, dpi and derived scales of a figure
+
+    one instance is shared by all users of a figure (see FigureMetrics.of).
+    the cached values are only recomputed after the figure is resized or
+    its dpi is changed, which is detected through the invalidation of the
+    figure's bbox_inches and dpi_scale_trans transforms
+
+    >>>m = FigureMetrics.of(fig)
+    >>>m.size, m.dpi, m.aspect, m.scale
+    ((6.0, 4.0), 100.0, 1.5, (600.0, 400.0))
+    >>>m.rel2abs(np.array([.1, .5]), 'x')
+    array([ 60., 300.])
+    >>>m.transform('relative', 'inches').transform_bounds([.1, .1, .5, .5])
+    array([0.6, 0.4, 3. , 2. ])
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def of(cls, fig):
+        """return the up-to-date metrics of a figure"""
+        try:
+            m = cls._instances[fig]
+        except KeyError:
+            m = cls._instances[fig] = cls(fig)
+        if m._node._invalid:
+            m.refresh()
+        return m
+
+    def __init__(self, fig):
+        self._figure = weakref.ref(fig)
+
+        # the node is invalidated as parent of the size and dpi transforms
+        self._node = TransformNode()
+        self._node.set_children(fig.bbox_inches, fig.dpi_scale_trans)
+        self.refresh()
+
+    @property
+    def figure(self):
+        return self._figure()
+
+    def refresh(self):
+        """recompute the metrics from the figure"""
+        fig = self.figure
+        # reading the points and matrix also resets the invalid state of the
+        # transforms, so that the next change propagates to the node
+        w, h = map(float, fig.bbox_inches.get_points()[1])
+        dpi = float(fig.dpi_scale_trans.get_matrix()[0, 0])
+
+        self.size = w, h
+        self.dpi = dpi
+        self.aspect = w/h
+        self.scale = w * dpi, h * dpi
+        self._transforms = dict()
+        self._node._invalid = 0
+
+    def transform(self, src='relative', dst='pixels'):
+        """
+        UnitTransform between two units (relative, inches, cm, points, pixels)
+        the transforms are cached until the figure is resized or its dpi changes
+        """
+        try:
+            return self._transforms[src, dst]
+        except KeyError:
+            t = self._transforms[src, dst] = UnitTransform.between(self.size, self.dpi, src, dst)
+            return t
+
+    def abs2rel(self, val, attr):
+        """convert dots to relative figure coordinates"""
+        return self.transform('pixels', 'relative').transform(val, attr)
+
+    def rel2abs(self, val, attr):
+        """convert relative figure coordinates to dots"""
+        return self.transform('relative', 'pixels').transform(val, attr)
+
+    def bounds_abs2rel(self, bounds):
+        """convert an array of (x, y, w, h) bounds in dots to relative figure coordinates"""
+        return self.transform('pixels', 'relative').transform_bounds(bounds)
+
+    def bounds_rel2abs(self, bounds):
+        """convert an array of (x, y, w, h) bounds in relative figure coordinates to dots"""
+        return self.transform('relative', 'pixels').transform_bounds(bounds)
+
+    def __repr__(self):
+        return '<{} size=({:.2f}, {:.2f}) dpi={:.0f}>'.format(
+            self.__class__.__qualname__, self.size[0], self.size[1], self.dpi)
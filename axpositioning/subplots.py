@@ -1,18 +1,31 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.figure import Figure
+from matplotlib.ticker import FixedLocator, NullFormatter
+from .layout import grid_bounds
+from .metrics import FigureMetrics
 
 
-def hsubplots(figwidth, shape, hpad=0, vpad=0, box=(0, 0, 1, 1), ax_aspect=1):
+def hsubplots(figwidth, shape, hpad=0, vpad=0, box=(0, 0, 1, 1), ax_aspect=1,
+              width_ratios=None, height_ratios=None):
     """
     calculate axes positions for a fixed width
     figure height is dependent on the subplot axes and spacings
 
     :param figwidth: width in inches of figure to build
     :param shape: (rows, cols)
-    :param hpad: horizontal padding
-    :param vpad: vertical padding
+    :param hpad: horizontal padding, a single value or one per gap between columns
+    :param vpad: vertical padding, a single value or one per gap between rows (top to bottom)
     :param box: (xll, yll, xur, yur)
     :param ax_aspect: aspect of individual axes
+                      for axes with an average width and height when using ratios
+    :param width_ratios: relative widths of the columns
+    :param height_ratios: relative heights of the rows (top to bottom)
     :return: figsize (w, h), axpositions (3D array)
              positions are returned as a 3D array of row, col, subplot box
 
@@ -26,24 +39,57 @@ def hsubplots(figwidth, shape, hpad=0, vpad=0, box=(0, 0, 1, 1), ax_aspect=1):
     """
     m, n = shape
 
-    box = np.array(box)
+    box = np.array(box, dtype=float)
+    bounds = np.concatenate([box[:2], box[2:] - box[:2]])
+    hpad = np.broadcast_to(np.asarray(hpad, dtype=float), (n - 1,))
+    vpad = np.broadcast_to(np.asarray(vpad, dtype=float), (m - 1,))
 
-    axwidth = (box[2] - box[0] - hpad * (n - 1)) / n
-    axheight = (box[3] - box[1] - vpad * (m - 1)) / m
+    # average axes size
+    axwidth = (bounds[2] - hpad.sum()) / n
+    axheight = (bounds[3] - vpad.sum()) / m
     figheight = figwidth * (axwidth / axheight) * ax_aspect
 
-    axpos = []
-    for i in range(m):  # rows
-        axpos.append([])
-        for j in range(n):  # cols
-            x = box[0] + j * axwidth + j * hpad
-            y = box[1] + i * axheight + i * vpad
-            axpos[-1].append([x, y, axwidth, axheight])
+    axpos = grid_bounds(bounds, shape, hpad, vpad,
+                        width_ratios=width_ratios,
+                        height_ratios=height_ratios)
 
-    return (figwidth, figheight), np.array(axpos[::-1])
+    return (figwidth, figheight), axpos
 
 
-def xyshared_plots(shape, axes, datasets, plotfn, xlabel, ylabel, labels=False, labeldict=None):
+def xyshared_plots(shape, axes, datasets, plotfn, xlabel, ylabel, labels=False, labeldict=None,
+                   processes=None, dpi=None, share=False):
+    """
+    plot a dataset on each axes of a grid with x labels on the bottom row
+    and y labels on the left column
+
+    :param shape: (rows, cols)
+    :param axes: flat list of axes in row order
+    :param datasets: datasets in row order as a sequence, an iterable or a function
+                     load(i) returning the dataset of panel i. datasets are loaded
+                     right before plotting and no reference is kept afterwards
+    :param plotfn: function plotting a dataset on an axes as plotfn(ax, dataset)
+    :param xlabel: label of the x axis
+    :param ylabel: label of the y axis
+    :param labels: panel labels as list or generated as '1A', 'A1' or 'A'
+    :param labeldict: text properties of the panel labels and boxsize of the marker
+    :param processes: render the panel contents in this number of worker processes
+                      (True for the number of cpus). plotfn draws in an offscreen Agg
+                      figure of the panel size and the result is added to the axes as
+                      image, while the axes decorations remain vector. limits, scales,
+                      fixed ticks, axis labels and titles set by plotfn are copied.
+                      plotfn must be importable and the datasets picklable
+    :param dpi: resolution of the rendered panels, the figure dpi by default
+    :param share: share the x and y axis of all panels with the first axes
+                  (including locator and formatter), so limits set by any plotfn apply to all
+                  panels. in parallel mode the panel images are placed in data coordinates
+                  and the limits are the union of the panel limits (linear scales only).
+                  interior panels hide their tick labels. without sharing they also get a
+                  NullFormatter so no label text is formatted; shared panels share the
+                  formatter of the first axes, so their hidden labels are still formatted
+    :return: return value of plotfn for the last panel
+             in parallel mode a ScalarMappable with the cmap and norm of the returned
+             mappable (e.g. for a colorbar) or None
+    """
     m, n = shape
 
     if labels == '1A':
@@ -53,41 +99,208 @@ def xyshared_plots(shape, axes, datasets, plotfn, xlabel, ylabel, labels=False,
     elif labels == 'A':
         labels = [chr(65 + i * n + j) for i in range(m) for j in range(n)]
 
-    for mi in range(m):
-        for ni in range(n):
-            # calculate flat index
-            i = mi * n + ni
-
-            # get axes and dataset for this index
-            ax = axes[i]
-            d = datasets[i]
-
-            # plot dataset on axes
-            r = plotfn(ax, d)
-
-            # apply label annotation
-            if isinstance(labels, list):
-                ax.plot([.1], [.9], 'ko',
-                        markersize=labeldict.pop('boxsize', 17),
-                        markerfacecolor='w',
-                        transform=ax.transAxes)
-                ax.text(.1, .9, labels[i],
-                        ha='center', va='center', transform=ax.transAxes,
-                        **(labeldict or {}))
-
-            # apply ticks and axlabels
-            if mi == (m - 1):
-                ax.set_xlabel(xlabel)
-            else:
-                ax.set_xticklabels([])
-
-            if ni == 0:
-                ax.set_ylabel(ylabel)
-            else:
-                ax.set_yticklabels([])
+    labeldict = dict(labeldict or {})
+    boxsize = labeldict.pop('boxsize', 17)
+
+    if share:
+        for ax in axes[1:m * n]:
+            ax.sharex(axes[0])
+            ax.sharey(axes[0])
+
+    datasets = iter_datasets(datasets, m * n)
+    if processes:
+        results = render_panels(axes[:m * n], datasets, plotfn, processes=processes, dpi=dpi,
+                                data_extent=share)
+    else:
+        results = plot_panels(axes[:m * n], datasets, plotfn)
+
+    for i, r in enumerate(results):
+        mi, ni = divmod(i, n)
+        ax = axes[i]
+
+        # apply label annotation
+        if isinstance(labels, list):
+            ax.plot([.1], [.9], 'ko',
+                    markersize=boxsize,
+                    markerfacecolor='w',
+                    transform=ax.transAxes)
+            ax.text(.1, .9, labels[i],
+                    ha='center', va='center', transform=ax.transAxes,
+                    **labeldict)
+
+        # apply axlabels and hide the tick labels of interior panels
+        # without fixing the tick labels
+        if mi == (m - 1):
+            ax.set_xlabel(xlabel)
+        else:
+            _hide_tick_labels(ax.xaxis, share, labelbottom=False)
+
+        if ni == 0:
+            ax.set_ylabel(ylabel)
+        else:
+            _hide_tick_labels(ax.yaxis, share, labelleft=False)
     return r
 
 
+def _hide_tick_labels(axis, shared, **kw):
+    """
+    hide the tick labels of an axis
+    matplotlib creates the label texts of each tick regardless, but unless the
+    formatter is shared with the outer panels the labels are not formatted either
+    """
+    axis.set_tick_params(which='both', **kw)
+    if not shared:
+        axis.set_major_formatter(NullFormatter())
+        axis.set_minor_formatter(NullFormatter())
+
+
+def iter_datasets(datasets, count):
+    """
+    iterate over datasets given as a sequence, an iterable or a function load(i)
+    a function is called lazily for the panels 0 to count - 1
+    """
+    if callable(datasets):
+        return (datasets(i) for i in range(count))
+    return iter(datasets)
+
+
+def plot_panels(axes, datasets, plotfn):
+    """
+    plot each dataset on its axes as plotfn(ax, dataset)
+    the reference to a dataset is dropped before the next one is loaded
+
+    :param datasets: iterable of datasets, see iter_datasets
+    :return: generator of the plotfn results per axes
+    """
+    datasets = iter(datasets)
+    for ax in axes:
+        try:
+            dataset = next(datasets)
+        except StopIteration:
+            break
+        r = plotfn(ax, dataset)
+        del dataset
+        yield r
+
+
+def render_panels(axes, datasets, plotfn, processes=True, dpi=None, data_extent=False,
+                  max_pending=None):
+    """
+    render plotfn(ax, dataset) for each axes in worker processes and add the results as images
+
+    :param datasets: iterable of datasets, see iter_datasets
+    :param processes: number of worker processes, True for the number of cpus
+    :param dpi: resolution of the rendered panels, the figure dpi by default
+    :param data_extent: place the images at their limits in data coordinates and set the
+                        union of the limits after the last panel (for shared axes)
+    :param max_pending: maximum number of submitted panels that are not yet added,
+                        which bounds the number of datasets in memory (2 per process by default)
+    :return: generator of the plotfn results per axes (see xyshared_plots)
+    """
+    if processes is True:
+        processes = os.cpu_count()
+    if max_pending is None:
+        max_pending = 2 * processes
+    datasets = iter(datasets)
+
+    limits = []
+
+    def add(ax, future):
+        image, state, mappable = future.result()
+        limits.append((state['xlim'], state['ylim']))
+        return _add_panel_image(ax, image, state, mappable, data_extent=data_extent)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for ax in axes:
+            try:
+                dataset = next(datasets)
+            except StopIteration:
+                break
+            metrics = FigureMetrics.of(ax.figure)
+            _, _, w, h = ax.get_position().bounds
+            size = w * metrics.size[0], h * metrics.size[1]
+            pending.append((ax, executor.submit(_render_panel, plotfn, dataset, size, dpi or metrics.dpi)))
+            del dataset
+
+            if len(pending) >= max_pending:
+                yield add(*pending.popleft())
+
+        while pending:
+            yield add(*pending.popleft())
+
+    if data_extent and limits:
+        xlim, ylim = zip(*limits)
+        axes[0].set_xlim(_union_limits(xlim))
+        axes[0].set_ylim(_union_limits(ylim))
+
+
+def _union_limits(limits):
+    """union of (start, end) limits, keeping the direction of the first"""
+    limits = np.asarray(limits, dtype=float)
+    lo, hi = limits.min(), limits.max()
+    if limits[0, 0] > limits[0, 1]:
+        return hi, lo
+    return lo, hi
+
+
+def _render_panel(plotfn, dataset, size, dpi):
+    """draw the panel content offscreen and return the image, axes state and mappable"""
+    fig = Figure(figsize=size, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes((0, 0, 1, 1))
+    r = plotfn(ax, dataset)
+
+    state = dict(
+        xscale=ax.get_xscale(),
+        yscale=ax.get_yscale(),
+        xlim=ax.get_xlim(),
+        ylim=ax.get_ylim(),
+        xlabel=ax.get_xlabel(),
+        ylabel=ax.get_ylabel(),
+        title=ax.get_title())
+    for k, axis in (('xticks', ax.xaxis), ('yticks', ax.yaxis)):
+        if isinstance(axis.get_major_locator(), FixedLocator):
+            state[k] = axis.get_majorticklocs()
+
+    # only draw the content on a transparent background
+    ax.set_axis_off()
+    fig.patch.set_alpha(0)
+    canvas.draw()
+    image = np.asarray(canvas.buffer_rgba()).copy()
+
+    mappable = None
+    if isinstance(r, ScalarMappable):
+        mappable = r.get_cmap(), r.norm
+    return image, state, mappable
+
+
+def _add_panel_image(ax, image, state, mappable, data_extent=False):
+    """add a rendered panel to an axes and apply the axes state"""
+    if data_extent:
+        ax.imshow(image, extent=state['xlim'] + state['ylim'], origin='upper',
+                  aspect='auto', interpolation='nearest', zorder=0)
+    else:
+        ax.imshow(image, extent=(0, 1, 0, 1), transform=ax.transAxes,
+                  aspect='auto', interpolation='nearest', zorder=0)
+
+    ax.set_xscale(state['xscale'])
+    ax.set_yscale(state['yscale'])
+    ax.set_xlim(state['xlim'])
+    ax.set_ylim(state['ylim'])
+    if 'xticks' in state:
+        ax.set_xticks(state['xticks'])
+    if 'yticks' in state:
+        ax.set_yticks(state['yticks'])
+    for k in ('xlabel', 'ylabel', 'title'):
+        if state[k]:
+            getattr(ax, 'set_' + k)(state[k])
+
+    if mappable is not None:
+        cmap, norm = mappable
+        return ScalarMappable(norm=norm, cmap=cmap)
+
+
 if __name__ == '__main__':
     from matplotlib import pyplot as plt
     figsize, positions = hsubplots(10, (3, 3), hpad=.05, vpad=.05, box=(.08, .07, .9, .95))
@@ -0,0 +1,178 @@
+import copy
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from .layout import AxesLayout
+from .metrics import FigureMetrics
+
+
+class LayoutTemplate(object):
+
+    """
+    Figure with a fixed set of axes that is reused for many datasets
+
+    the figure, axes, spines and tick machinery are created once.
+    for each dataset the artists added by the previous plot are removed,
+    the axes state (scales, limits, locators, labels, property cycle) is restored and
+    the dataset is plotted with plotfn(axes, dataset)
+
+    >>>figsize, positions = hsubplots(10, (2, 3), hpad=.02, vpad=.02, box=(.05, .05, .95, .95))
+    >>>template = LayoutTemplate.from_hsubplots(figsize, positions)
+    >>>template.save_all(datasets, plotfn, ['fig{}.png'.format(i) for i in range(len(datasets))])
+    """
+
+    def __init__(self, figsize, bounds, dpi=None, decorate=None, **figure_kw):
+        """
+        :param figsize: figure size in inches
+        :param bounds: sequence or (N, 4) array of axes bounds
+        :param dpi: figure dpi
+        :param decorate: function decorate(fig, axes) for decorations shared by all figures
+                         (e.g. fixed labels or reference lines), these are kept between plots
+        :param figure_kw: keyword arguments of the Figure
+        """
+        self.figsize = tuple(figsize)
+        self.bounds = np.array(bounds, dtype=float).reshape(-1, 4)
+        self.dpi = dpi
+        self.decorate = decorate
+        self.figure_kw = figure_kw
+        self._figure = None
+        self._axes = None
+        self._baseline = None
+
+    @classmethod
+    def from_hsubplots(cls, figsize, positions, **kwargs):
+        """template from the figsize and positions returned by hsubplots"""
+        return cls(figsize, positions, **kwargs)
+
+    @classmethod
+    def from_axes(cls, axes, **kwargs):
+        """template from a set of axes (e.g. PositioningAxes) of the same figure"""
+        if hasattr(axes, 'values'):
+            axes = list(axes.values())
+        axes = list(axes)
+        if not axes:
+            raise ValueError('no axes to build a template from')
+        metrics = FigureMetrics.of(axes[0].figure)
+        kwargs.setdefault('dpi', metrics.dpi)
+        return cls(metrics.size, [a.get_position().bounds for a in axes], **kwargs)
+
+    @classmethod
+    def from_layout(cls, figsize, layout, **kwargs):
+        """template from an AxesLayout"""
+        if not isinstance(layout, AxesLayout):
+            raise TypeError('expected an AxesLayout')
+        return cls(figsize, layout.bounds, **kwargs)
+
+    def __len__(self):
+        return len(self.bounds)
+
+    @property
+    def figure(self):
+        if self._figure is None:
+            self.create()
+        return self._figure
+
+    @property
+    def axes(self):
+        if self._figure is None:
+            self.create()
+        return self._axes
+
+    def create(self):
+        """create the figure and axes and store the baseline state"""
+        fig = Figure(figsize=self.figsize, dpi=self.dpi, **self.figure_kw)
+        FigureCanvasAgg(fig)
+        axes = [fig.add_axes(tuple(b)) for b in self.bounds]
+        if self.decorate is not None:
+            self.decorate(fig, axes)
+
+        self._figure = fig
+        self._axes = axes
+        self._baseline = (set(fig.get_children()),
+                          [(set(ax.get_children()), _axes_state(ax)) for ax in axes])
+        return fig
+
+    def clear(self):
+        """remove the artists added since the baseline and restore the axes state"""
+        if self._figure is None:
+            return
+        fig_children, axes_baseline = self._baseline
+        for artist in self._figure.get_children():
+            if artist not in fig_children:
+                artist.remove()
+        for ax, (children, state) in zip(self._axes, axes_baseline):
+            for artist in ax.get_children():
+                if artist not in children:
+                    artist.remove()
+            _restore_axes_state(ax, state)
+
+    def plot(self, plotfn, dataset):
+        """clear the figure and plot a dataset as plotfn(axes, dataset)"""
+        fig = self.figure
+        self.clear()
+        plotfn(self._axes, dataset)
+        return fig
+
+    def render(self, datasets, plotfn):
+        """generator plotting each dataset and yielding the (reused) figure"""
+        for dataset in datasets:
+            yield self.plot(plotfn, dataset)
+
+    def save_all(self, datasets, plotfn, filenames, **kwargs):
+        """
+        plot each dataset and save the figure to the corresponding filename
+        :param kwargs: keyword arguments of Figure.savefig
+        """
+        for fig, fname in zip(self.render(datasets, plotfn), filenames):
+            fig.savefig(fname, **kwargs)
+
+    def __repr__(self):
+        return '<{} figsize=({:.2f}, {:.2f}) axes={}>'.format(
+            self.__class__.__qualname__, self.figsize[0], self.figsize[1], len(self))
+
+
+def _axes_state(ax):
+    """state of an axes that may be changed by plotting"""
+    state = dict(
+        xscale=ax.get_xscale(),
+        yscale=ax.get_yscale(),
+        xlim=ax.get_xlim(),
+        ylim=ax.get_ylim(),
+        autoscalex=ax.get_autoscalex_on(),
+        autoscaley=ax.get_autoscaley_on(),
+        xlabel=ax.get_xlabel(),
+        ylabel=ax.get_ylabel(),
+        title=ax.get_title(),
+        # property cycles of lines and of patches (fill, bar), including their position
+        prop_cycle=[copy.copy(ax._get_lines._prop_cycle),
+                    copy.copy(ax._get_patches_for_fill._prop_cycle)])
+    for k, axis in (('x', ax.xaxis), ('y', ax.yaxis)):
+        state[k + 'ticker'] = (axis.get_major_locator(), axis.get_major_formatter(),
+                               axis.get_minor_locator(), axis.get_minor_formatter())
+    return state
+
+
+def _restore_axes_state(ax, state):
+    # setting a scale resets the tickers, so the scale is restored first
+    if ax.get_xscale() != state['xscale']:
+        ax.set_xscale(state['xscale'])
+    if ax.get_yscale() != state['yscale']:
+        ax.set_yscale(state['yscale'])
+    for k, axis in (('x', ax.xaxis), ('y', ax.yaxis)):
+        major_loc, major_fmt, minor_loc, minor_fmt = state[k + 'ticker']
+        axis.set_major_locator(major_loc)
+        axis.set_major_formatter(major_fmt)
+        axis.set_minor_locator(minor_loc)
+        axis.set_minor_formatter(minor_fmt)
+
+    # plotting advances the property cycles, restore the cycles (and their position)
+    # left by decorate
+    lines_cycle, patches_cycle = state['prop_cycle']
+    ax._get_lines._prop_cycle = copy.copy(lines_cycle)
+    ax._get_patches_for_fill._prop_cycle = copy.copy(patches_cycle)
+    ax.relim()
+    ax.set_xlim(state['xlim'], auto=state['autoscalex'])
+    ax.set_ylim(state['ylim'], auto=state['autoscaley'])
+    ax.set_xlabel(state['xlabel'])
+    ax.set_ylabel(state['ylabel'])
+    ax.set_title(state['title'])
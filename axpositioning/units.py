@@ -0,0 +1,108 @@
+import numpy as np
+from matplotlib.transforms import Affine2D
+
+
+UNITS = ('relative', 'inches', 'cm', 'points', 'pixels')
+
+# label formats of values in each unit
+UNIT_FORMATS = dict(
+    relative='{:.3f}',
+    inches='{:.2f}',
+    cm='{:.2f}',
+    points='{:.0f}',
+    pixels='{:.0f}')
+
+
+def position_units(relative=True, units=None):
+    """units of positions given as unit name or by the relative flag (relative or pixels)"""
+    if units is None:
+        units = 'relative' if relative else 'pixels'
+    return units
+
+
+def unit_scale(size, dpi, unit):
+    """
+    scale factors (sx, sy) from relative figure coordinates to a unit
+    :param size: figure size in inches
+    :param dpi: figure dpi
+    :param unit: one of UNITS
+    """
+    w, h = size
+    if unit == 'relative':
+        return 1., 1.
+    elif unit == 'inches':
+        f = 1.
+    elif unit == 'cm':
+        f = 2.54
+    elif unit == 'points':
+        f = 72.
+    elif unit == 'pixels':
+        f = dpi
+    else:
+        raise ValueError('unknown unit {!r}, use one of {}'.format(unit, ', '.join(UNITS)))
+    return w * f, h * f
+
+
+class UnitTransform(object):
+
+    """
+    Conversion of figure coordinates between two units
+
+    all units share the lower left corner of the figure as origin,
+    so the affine transform reduces to a scale factor per direction.
+    transforms are cached per figure, see FigureMetrics.transform
+
+    >>>t = FigureMetrics.of(Figure(figsize=(6, 4))).transform('relative', 'cm')
+    >>>t.transform(.5, 'w')
+    7.62
+    >>>t.transform_bounds(np.array([[.1, .1, .5, .5]]))
+    array([[1.524, 1.016, 7.62 , 5.08 ]])
+    """
+
+    def __init__(self, sx, sy, src='relative', dst='relative'):
+        self.src = src
+        self.dst = dst
+        self.scale = np.array([sx, sy], dtype=float)
+        self.bounds_scale = np.tile(self.scale, 2)
+
+    @classmethod
+    def between(cls, size, dpi, src, dst):
+        """transform from src to dst units for a figure size and dpi"""
+        sx0, sy0 = unit_scale(size, dpi, src)
+        sx1, sy1 = unit_scale(size, dpi, dst)
+        return cls(sx1 / sx0, sy1 / sy0, src=src, dst=dst)
+
+    def inverted(self):
+        return self.__class__(1 / self.scale[0], 1 / self.scale[1], src=self.dst, dst=self.src)
+
+    def transform(self, val, attr):
+        """convert a value or array of values of a position attribute (x, y, w, h)"""
+        if attr in ('w', 'x'):
+            return val * self.scale[0]
+        elif attr in ('h', 'y'):
+            return val * self.scale[1]
+        else:
+            return val
+
+    def transform_points(self, xy):
+        """convert an (..., 2) array of points"""
+        return np.asarray(xy, dtype=float) * self.scale
+
+    def transform_bounds(self, bounds):
+        """convert an (..., 4) array of (x, y, w, h) bounds"""
+        return np.asarray(bounds, dtype=float) * self.bounds_scale
+
+    def format(self, val):
+        """format a value in the destination unit"""
+        label = UNIT_FORMATS[self.dst].format(val)
+        if self.dst == 'relative':
+            label = label.lstrip('0')
+        return label
+
+    def affine(self):
+        """matplotlib Affine2D of the conversion"""
+        return Affine2D().scale(*self.scale)
+
+    def __repr__(self):
+        return '<{} {} -> {} ({:g}, {:g})>'.format(
+            self.__class__.__qualname__, self.src, self.dst, *self.scale)
@@ -1,10 +1,40 @@
 import unittest
 from . import axpositioning
 from . import examples
+from . import layout
+from . import metrics
+from . import constraints
+from . import bench
+from . import subplots
+from . import template
+from . import cache
+from . import model
+from . import index
+from . import guides
+from . import history
+from . import drag
+from . import overlay
+from . import widgets
+from . import scheduler
 
 
 if __name__ == '__main__':
     suite = unittest.TestSuite()
     suite.addTest(unittest.TestLoader().loadTestsFromModule(axpositioning))
     suite.addTest(unittest.TestLoader().loadTestsFromModule(examples))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(layout))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(metrics))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(constraints))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(bench))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(subplots))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(template))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(cache))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(model))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(index))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(guides))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(history))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(drag))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(overlay))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(widgets))
+    suite.addTest(unittest.TestLoader().loadTestsFromModule(scheduler))
     unittest.TextTestRunner(verbosity=1).run(suite)
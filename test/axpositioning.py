@@ -1,6 +1,8 @@
 import unittest
+import numpy as np
 from matplotlib import axes, figure
 from axpositioning import PositioningAxes
+from axpositioning.axpositioning import batch
 
 
 class TestPositioningAxes(unittest.TestCase):
@@ -56,3 +58,33 @@ class TestPositioningAxes(unittest.TestCase):
 
         p.set_anchor('SE')
         self.assertEqual((p.x, p.y, p.w, p.h), (.9, .1, .8, .8))
+
+    def test_batch(self):
+        fig = figure.Figure(figsize=(6, 6))
+        p = PositioningAxes(fig, (.1, .1, .8, .8), anchor='C')
+        with p.batch():
+            p.x, p.y, p.w, p.h = .5, .5, .4, .4
+            self.assertEqual(p.get_position().bounds, (.1, .1, .8, .8))
+            np.testing.assert_allclose(p.bounds, (.3, .3, .4, .4))
+        np.testing.assert_allclose(p.get_position().bounds, (.3, .3, .4, .4))
+
+    def test_batch_error(self):
+        fig = figure.Figure(figsize=(6, 6))
+        p = PositioningAxes(fig, (.1, .1, .8, .8), anchor='C')
+        with self.assertRaises(ValueError):
+            with p.batch():
+                p.set_anchor('SW')
+                p.x = .2
+                raise ValueError()
+        self.assertEqual(p.bounds, (.1, .1, .8, .8))
+        self.assertEqual(p.get_anchor(), (.5, .5))
+
+    def test_batch_set_position(self):
+        fig = figure.Figure(figsize=(6, 6))
+        axes = [PositioningAxes(fig, (.1, .1, .2, .2)) for _ in range(3)]
+        with batch(axes):
+            for i, a in enumerate(axes):
+                a.set_position((.1 * i, .1, .2, .2))
+                a.w = .1
+        np.testing.assert_allclose([a.bounds for a in axes],
+                                   [(.1 * i + .05, .1, .1, .2) for i in range(3)])
@@ -0,0 +1,18 @@
+import unittest
+import json
+from axpositioning import bench
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_quick_run(self):
+        data = bench.run(quick=True)
+        names = set(r['name'] for r in data['results'])
+        self.assertEqual(names, set(bench.BENCHMARKS))
+        for r in data['results']:
+            self.assertGreater(r['best'], 0)
+        json.loads(json.dumps(data))
+
+    def test_filter(self):
+        data = bench.run(names=['hsubplots'], quick=True)
+        self.assertEqual([r['params']['shape'] for r in data['results']], [[1, 1], [10, 10]])
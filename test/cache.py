@@ -0,0 +1,77 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.gridspec import GridSpec
+from axpositioning import hsubplots
+from axpositioning.cache import LayoutCache
+from axpositioning.layout import gridspec_bounds
+
+
+class TestLayoutCache(unittest.TestCase):
+
+    def test_key(self):
+        k = LayoutCache.key('f', 10, (2, 3), box=np.array([0, 0, 1, 1.]), hpad=.1)
+        self.assertEqual(k, LayoutCache.key('f', 10, [2, 3], hpad=.1, box=np.array([0, 0, 1, 1.])))
+        self.assertNotEqual(k, LayoutCache.key('f', 10, (2, 3), box=np.array([0, 0, 1, .9]), hpad=.1))
+        self.assertNotEqual(k, LayoutCache.key('g', 10, (2, 3), box=np.array([0, 0, 1, 1.]), hpad=.1))
+        with self.assertRaises(TypeError):
+            LayoutCache.key('f', object())
+
+    def test_memoize(self):
+        cache = LayoutCache(maxsize=2)
+        f = cache.memoize(hsubplots)
+        figsize, positions = f(10, (2, 3), hpad=.01)
+        positions[:] = 0
+        figsize2, positions2 = f(10, (2, 3), hpad=.01)
+        ref = hsubplots(10, (2, 3), hpad=.01)
+        self.assertEqual(figsize2, ref[0])
+        np.testing.assert_allclose(positions2, ref[1])
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+        # least recently used results are evicted
+        f(10, (1, 1))
+        f(10, (2, 3), hpad=.01)
+        f(10, (3, 3))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(len(cache), 2)
+        f(10, (2, 3), hpad=.01)
+        self.assertEqual(cache.hits, 3)
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as d:
+            f = LayoutCache(directory=d).memoize(hsubplots)
+            ref = f(10, (2, 3), hpad=.01)
+
+            # a new cache, e.g. in another process, reads the stored result
+            cache = LayoutCache(directory=d, maxfiles=2)
+            f = cache.memoize(hsubplots)
+            figsize, positions = f(10, (2, 3), hpad=.01)
+            self.assertEqual(figsize, ref[0])
+            self.assertIsInstance(figsize, tuple)
+            np.testing.assert_allclose(positions, ref[1])
+            self.assertEqual(cache.disk_hits, 1)
+            self.assertEqual(cache.misses, 0)
+
+            f(10, (1, 1))
+            f(10, (3, 3))
+            self.assertEqual(len(os.listdir(d)), 2)
+            self.assertEqual(cache.disk_evictions, 1)
+
+            cache.clear(disk=True)
+            self.assertEqual(os.listdir(d), [])
+            self.assertEqual(len(cache), 0)
+
+
+class TestGridSpecBounds(unittest.TestCase):
+
+    def test_gridspec(self):
+        fig = Figure()
+        for kw in [dict(nrows=3, ncols=2, left=.1, right=.9, top=.9, bottom=.1, wspace=.2, hspace=.3),
+                   dict(nrows=1, ncols=4),
+                   dict(nrows=2, ncols=1, wspace=0, hspace=0)]:
+            gs = GridSpec(**kw)
+            ref = [gs[i].get_position(fig).bounds for i in range(kw['nrows'] * kw['ncols'])]
+            np.testing.assert_allclose(gridspec_bounds(**kw), ref, atol=1e-12)
@@ -0,0 +1,111 @@
+import unittest
+from collections import OrderedDict
+import numpy as np
+from matplotlib import figure
+from axpositioning import PositioningAxes, AxesLayout, LayoutConstraints
+
+
+class TestLayoutConstraints(unittest.TestCase):
+
+    def create_axes(self):
+        fig = figure.Figure(figsize=(8, 4))
+        return OrderedDict([
+            ('A', PositioningAxes(fig, (.1, .1, .3, .3), anchor='SW')),
+            ('B', PositioningAxes(fig, (.5, .15, .2, .4), anchor='SW')),
+            ('C', PositioningAxes(fig, (.12, .6, .25, .3), anchor='SW'))])
+
+    def test_no_constraints(self):
+        axes = self.create_axes()
+        bounds = LayoutConstraints(axes).solve()
+        np.testing.assert_allclose(bounds, [a.bounds for a in axes.values()])
+
+    def test_align_equal(self):
+        axes = self.create_axes()
+        c = LayoutConstraints(axes)
+        c.align(['A', 'C'], 'left')
+        c.align(['A', 'B'], 'bottom')
+        c.equal_width(['A', 'B', 'C'])
+        c.equal_height(['A', 'B'])
+        c.apply()
+        A, B, C = axes.values()
+        self.assertAlmostEqual(A.x, C.x)
+        self.assertAlmostEqual(A.y, B.y)
+        self.assertAlmostEqual(A.w, B.w)
+        self.assertAlmostEqual(A.w, C.w)
+        self.assertAlmostEqual(A.h, B.h)
+
+    def test_gap_aspect(self):
+        axes = self.create_axes()
+        c = LayoutConstraints(axes)
+        c.gap('A', 'B', .4)
+        c.gap('A', 'C', .2, horizontal=False, relative=True)
+        c.aspect(['A', 'B'], 1)
+        bounds = c.solve()
+        self.assertAlmostEqual(bounds[1, 0] - bounds[0, 0] - bounds[0, 2], .4 / 8)
+        self.assertAlmostEqual(bounds[2, 1] - bounds[0, 1] - bounds[0, 3], .2)
+        np.testing.assert_allclose(2 * bounds[:2, 2] / bounds[:2, 3], 1)
+
+    def test_contain(self):
+        axes = self.create_axes()
+        c = LayoutConstraints(axes)
+        c.fix('B', 'w', .6)
+        c.contain(['A', 'B', 'C'], (.05, .05, .95, .95))
+        bounds = c.solve()
+        self.assertAlmostEqual(bounds[1, 2], .6)
+        self.assertTrue((bounds[:, 0] >= .05 - 1e-9).all())
+        self.assertTrue((bounds[:, 0] + bounds[:, 2] <= .95 + 1e-9).all())
+        self.assertAlmostEqual(bounds[1, 0] + bounds[1, 2], .95)
+
+    def test_layout(self):
+        layout = AxesLayout(np.tile([.1, .1, .2, .2], (50, 1)), anchor='C')
+        c = LayoutConstraints(layout, figsize=(5, 5))
+        for i in range(49):
+            c.gap(i, i + 1, 0, relative=True)
+        c.fix(0, 'x', .1)
+        c.equal_width(range(50))
+        c.contain(range(50), (0, 0, 1, 1))
+        c.apply()
+        xll, _, w, _ = layout.bounds.T
+        np.testing.assert_allclose(xll[1:], xll[:-1] + w[:-1], atol=1e-9)
+        np.testing.assert_allclose(w, w[0])
+        np.testing.assert_allclose(layout.x[0], .1)
+        self.assertTrue(xll[0] >= -1e-9 and xll[-1] + w[-1] <= 1 + 1e-9)
+
+    def test_contradictory(self):
+        c = LayoutConstraints(self.create_axes())
+        c.fix('A', 'w', .5)
+        c.fix('A', 'w', .2)
+        with self.assertRaisesRegex(ValueError, r"fix\('A', 'w', 0\.5\).*fix\('A', 'w', 0\.2\)"):
+            c.solve()
+
+    def test_infeasible_contain(self):
+        layout = AxesLayout([(.1, .1, .2, .2)], anchor='C')
+        c = LayoutConstraints(layout, figsize=(5, 5))
+        c.fix(0, 'w', .5)
+        c.contain([0], (0, 0, .3, 1))
+        with self.assertRaisesRegex(ValueError, r"fix\(0, 'w', 0\.5\).*contain\(0, "):
+            c.apply()
+        np.testing.assert_allclose(layout.bounds, [(.1, .1, .2, .2)])
+
+    def test_positive_size(self):
+        layout = AxesLayout([(.1, .1, .2, .2), (.4, .1, .2, .2), (.7, .1, .2, .2)], anchor='SW')
+        c = LayoutConstraints(layout, figsize=(5, 5))
+        c.gap(0, 1, .3, relative=True)
+        c.gap(1, 2, .3, relative=True)
+        c.contain(range(3), (0, 0, .6, 1))
+        with self.assertRaisesRegex(ValueError, 'positive size of'):
+            c.solve()
+        bounds = c.solve(min_size=0)
+        np.testing.assert_allclose(bounds[:, 2], 0, atol=1e-9)
+
+    def test_many_contain(self):
+        rng = np.random.RandomState(0)
+        bounds = np.column_stack([rng.rand(200) * 1.2 - .1, rng.rand(200) * 1.2 - .1,
+                                  rng.rand(200) * .3 + .01, rng.rand(200) * .3 + .01])
+        c = LayoutConstraints(AxesLayout(bounds), figsize=(5, 5))
+        c.equal_width(range(200))
+        c.contain(range(200), (0, 0, 1, 1))
+        solved = c.solve()
+        self.assertTrue((solved[:, :2] >= -1e-9).all())
+        self.assertTrue((solved[:, :2] + solved[:, 2:] <= 1 + 1e-9).all())
+        np.testing.assert_allclose(solved[:, 2], solved[0, 2])
@@ -0,0 +1,57 @@
+import unittest
+from axpositioning.gui.drag import grab_edges, AxesDrag
+from axpositioning.gui.index import SnapIndex
+
+
+class TestGrabEdges(unittest.TestCase):
+
+    def test_grab_edges(self):
+        box = (100, 100, 200, 100)
+        self.assertEqual(grab_edges(box, 200, 150, 5), '')
+        self.assertEqual(grab_edges(box, 102, 150, 5), 'l')
+        self.assertEqual(grab_edges(box, 298, 150, 5), 'r')
+        self.assertEqual(grab_edges(box, 200, 197, 5), 't')
+        self.assertEqual(grab_edges(box, 102, 103, 5), 'lb')
+        self.assertEqual(grab_edges(box, 299, 199, 5), 'rt')
+
+        # the nearest edge in small boxes
+        self.assertEqual(grab_edges((100, 100, 6, 6), 101, 105, 5), 'lt')
+
+
+class TestAxesDrag(unittest.TestCase):
+
+    def assertBounds(self, b1, b2):
+        for v1, v2 in zip(b1, b2):
+            self.assertAlmostEqual(v1, v2)
+
+    def test_move(self):
+        drag = AxesDrag('A', (.1, .1, .3, .3), .2, .2)
+        self.assertFalse(drag.resizing)
+        self.assertBounds(drag.bounds_at(.3, .1), (.2, 0, .3, .3))
+        self.assertBounds(drag.bounds_at(.2, .2), (.1, .1, .3, .3))
+
+    def test_resize(self):
+        drag = AxesDrag('A', (.1, .1, .3, .3), .4, .4, edges='rt', min_size=(.05, .05))
+        self.assertBounds(drag.bounds_at(.5, .3), (.1, .1, .4, .2))
+        # the size is limited to the minimum size
+        self.assertBounds(drag.bounds_at(0, 0), (.1, .1, .05, .05))
+
+        drag = AxesDrag('A', (.1, .1, .3, .3), .1, .2, edges='l')
+        self.assertBounds(drag.bounds_at(0, .5), (0, .1, .4, .3))
+
+    def test_snap(self):
+        index = SnapIndex()
+        index.insert('A', (.1, .1, .3, .3))
+        index.insert('B', (.5, .5, .2, .2))
+        tol = (.01, .01)
+
+        # the box snaps to the other axes, not to itself
+        drag = AxesDrag('A', (.1, .1, .3, .3), .2, .2)
+        self.assertBounds(drag.bounds_at(.205, .2, snapping=index, tol=tol), (.105, .1, .3, .3))
+        self.assertBounds(drag.bounds_at(.295, .2, snapping=index, tol=tol), (.2, .1, .3, .3))
+        self.assertBounds(drag.bounds_at(.275, .2, snapping=index, tol=tol), (.175, .1, .3, .3))
+
+        # only the moving edge snaps when resizing
+        drag = AxesDrag('A', (.1, .1, .3, .3), .4, .2, edges='r')
+        self.assertBounds(drag.bounds_at(.495, .2, snapping=index, tol=tol), (.1, .1, .4, .3))
+        self.assertBounds(drag.bounds_at(.48, .2, snapping=index, tol=tol), (.1, .1, .38, .3))
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from axpositioning.gui.guides import merge_close, guide_positions
+from axpositioning.gui.model import AxesSet
+
+
+class TestGuidePositions(unittest.TestCase):
+
+    def test_merge_close(self):
+        np.testing.assert_array_equal(merge_close([.3, .1, .1000000001, .2, .1]), [.1, .2, .3])
+        np.testing.assert_array_equal(merge_close([.1, .1001], tol=1e-3), [.1])
+        np.testing.assert_array_equal(merge_close([.1, .1001], tol=1e-5), [.1, .1001])
+        self.assertEqual(len(merge_close([])), 0)
+
+    def test_guide_positions(self):
+        x, y, xc, yc = guide_positions([(.1, .1, .3, .3), (.1000000001, .5, .3, .3)])
+        np.testing.assert_allclose(x, [.1, .4])
+        np.testing.assert_allclose(y, [.1, .4, .5, .8])
+        np.testing.assert_allclose(xc, [.25])
+        np.testing.assert_allclose(yc, [.25, .65])
+
+
+class TestGuideLayer(unittest.TestCase):
+
+    def setUp(self):
+        self.fig = Figure(figsize=(6, 4))
+        self.axes = AxesSet(self.fig, [(.1, .1, .3, .3), (.1000000001, .5, .3, .3), (.6, .6, .2, .2)])
+
+    def test_draw(self):
+        self.axes.plot_guides(selected=False)
+        guides = self.axes.guides
+        self.assertEqual([a for a in self.fig.artists if isinstance(a, LineCollection)], [guides.lines])
+        self.assertEqual(len(guides.lines.get_segments()), 14)
+        self.assertEqual(len(guides.texts), 28)
+        self.assertEqual(len(self.fig.artists), 29)
+        self.fig.canvas.draw()
+
+        # labels are reused and the artists are not duplicated
+        texts = guides.texts
+        self.axes.plot_guides(selected=False)
+        self.assertEqual(guides.texts, texts)
+        self.assertEqual(len(self.fig.artists), 29)
+
+        # also after the figure is cleared
+        self.fig.clear()
+        self.axes.plot_guides(selected=False)
+        self.assertEqual(len(self.fig.artists), 29)
+
+        self.axes.plot_guides(selected=True)
+        self.assertEqual(len(self.fig.artists), 0)
+        self.axes.select('C')
+        self.axes.plot_guides(selected=True, units='pixels')
+        self.assertEqual(len(guides.lines.get_segments()), 6)
+        self.assertEqual(sorted(t.get_text() for t in guides.texts)[:2], ['240', '240'])
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+from matplotlib.figure import Figure
+from axpositioning.gui.model import AxesSet
+from axpositioning.gui.history import History, snapshot, diff
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.axes = AxesSet(Figure(), np.column_stack([rng.rand(500, 2) * .5, rng.rand(500, 2) * .4]))
+        self.history = History(self.axes, maxlen=5)
+        self.before = snapshot(self.axes)
+
+    def assertState(self, state):
+        names, bounds, states, _ = snapshot(self.axes)
+        self.assertEqual(names, state[0])
+        np.testing.assert_array_equal(bounds, state[1])
+        self.assertEqual(states, state[2])
+
+    def test_align(self):
+        names = self.axes.names
+        with self.history.record():
+            with self.axes.batch(names[1:]):
+                for n in names[1:]:
+                    self.axes[n].x = self.axes['A'].x
+        delta = self.history.undo_stack[-1]
+        self.assertEqual(len(delta.names), 499)
+        self.assertEqual(delta.old_bounds.shape, (499, 4))
+        self.assertFalse(delta.removed or delta.added or delta.old_order)
+
+        after = snapshot(self.axes)
+        self.assertTrue(self.history.undo())
+        self.assertState(self.before)
+        self.assertFalse(self.history.undo())
+        self.assertTrue(self.history.redo())
+        self.assertState(after)
+
+    def test_structure(self):
+        self.axes.select('C')
+        self.axes['D'].lock_aspect(True)
+        self.axes['E'].set_anchor('NE')
+        before = snapshot(self.axes)
+        with self.history.record():
+            self.axes.pop('C')
+            self.axes.pop('D')
+            self.axes.pop('E')
+            self.axes.add(.1, .1, .1, .1)
+            self.axes.change_order(self.axes.names[::-1])
+            self.axes['F'].w = .3
+        after = snapshot(self.axes)
+
+        delta = self.history.undo_stack[-1]
+        self.assertEqual([r[1] for r in delta.removed], ['C', 'D', 'E'])
+        self.assertEqual([r[1] for r in delta.added], ['C'])
+        self.assertFalse(delta.added[0][-1])
+        self.assertIsNotNone(delta.old_order)
+        self.assertEqual(delta.names, ('F',))
+
+        self.history.undo()
+        self.assertState(before)
+        self.assertTrue(self.axes.is_selected('C'))
+        self.history.redo()
+        self.assertState(after)
+
+    def test_bounded(self):
+        for i in range(10):
+            with self.history.record():
+                self.axes['A'].bounds = (i / 10, .1, .1, .1)
+        # nothing changed, nothing recorded
+        with self.history.record():
+            self.axes['A'].bounds = (.9, .1, .1, .1)
+        self.assertEqual(len(self.history.undo_stack), 5)
+        while self.history.undo():
+            pass
+        np.testing.assert_allclose(self.axes['A'].bounds, (.4, .1, .1, .1))
+
+        # a new change clears the redo stack
+        with self.history.record():
+            self.axes['B'].x = .1
+        self.assertFalse(self.history.can_redo())
+
+    def test_diff_empty(self):
+        self.assertFalse(diff(self.before, snapshot(self.axes)))
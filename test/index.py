@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+from axpositioning.gui.index import GridIndex, SnapIndex
+
+
+def brute_force(boxes, x0, y0, x1, y1, contain=False):
+    b = boxes
+    if contain:
+        m = (x0 <= b[:, 0]) & (b[:, 2] <= x1) & (y0 <= b[:, 1]) & (b[:, 3] <= y1)
+    else:
+        m = (b[:, 0] <= x1) & (x0 <= b[:, 2]) & (b[:, 1] <= y1) & (y0 <= b[:, 3])
+    return set(np.flatnonzero(m).tolist())
+
+
+class TestGridIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.bounds = np.column_stack([rng.rand(2000, 2) * 1.2 - .1, rng.rand(2000, 2) * .3])
+        self.index = GridIndex(size=16)
+        for i, b in enumerate(self.bounds):
+            self.index.insert(i, b)
+
+    def boxes(self):
+        b = self.bounds
+        return np.column_stack([b[:, :2], b[:, :2] + b[:, 2:]])
+
+    def test_queries(self):
+        boxes = self.boxes()
+        rng = np.random.RandomState(1)
+        for x, y in rng.rand(50, 2) * 1.4 - .2:
+            self.assertEqual(set(self.index.query_point(x, y)), brute_force(boxes, x, y, x, y))
+        for x0, y0, x1, y1 in rng.rand(50, 4):
+            for contain in (False, True):
+                self.assertEqual(set(self.index.query_box(x0, y0, x1, y1, contain=contain)),
+                                 brute_force(boxes, min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1),
+                                             contain=contain))
+
+    def test_update_remove(self):
+        rng = np.random.RandomState(2)
+        for i in range(0, 2000, 3):
+            self.bounds[i] = np.concatenate([rng.rand(2), rng.rand(2) * .2])
+            self.index.update(i, self.bounds[i])
+        for i in range(1, 2000, 7):
+            self.index.remove(i)
+        self.index.remove('unknown')
+        removed = set(range(1, 2000, 7))
+
+        boxes = self.boxes()
+        for x, y in rng.rand(50, 2):
+            self.assertEqual(set(self.index.query_point(x, y)), brute_force(boxes, x, y, x, y) - removed)
+        self.assertEqual(len(self.index), 2000 - len(removed))
+
+    def test_negative_size(self):
+        index = GridIndex()
+        index.insert('A', (.5, .5, -.2, -.2))
+        self.assertEqual(index.bounds('A'), (.3, .3, .5, .5))
+        self.assertEqual(index.query_point(.4, .4), ['A'])
+
+
+class TestSnapIndex(unittest.TestCase):
+
+    def test_index(self):
+        index = SnapIndex()
+        index.insert('A', (.1, .1, .3, .3))
+        index.insert('B', (.5, .2, .2, .2))
+        np.testing.assert_allclose(index.values('x'), [.1, .25, .4, .5, .6, .7])
+        np.testing.assert_allclose(index.values('y'), [.1, .2, .25, .3, .4, .4])
+
+        self.assertAlmostEqual(index.nearest(.398, 'x', tol=.005), .4)
+        self.assertIsNone(index.nearest(.398, 'x', tol=.001))
+        self.assertIsNone(index.nearest(.398, 'x', tol=.005, exclude='A'))
+        self.assertAlmostEqual(index.snap_offset([.2, .3, .402], 'x', tol=.005), -.002)
+        self.assertEqual(index.snap_offset([.2, .3], 'x', tol=.005), 0)
+
+        index.update('A', (.2, .1, .3, .3))
+        np.testing.assert_allclose(index.values('x'), [.2, .35, .5, .5, .6, .7])
+        index.remove('B')
+        index.remove('unknown')
+        np.testing.assert_allclose(index.values('x'), [.2, .35, .5])
+        self.assertEqual(len(index), 1)
+
+    def test_random(self):
+        rng = np.random.RandomState(0)
+        bounds = rng.rand(200, 4) * .5
+        index = SnapIndex()
+        for i, b in enumerate(bounds):
+            index.insert(i, b)
+        for i in range(0, 200, 2):
+            bounds[i] = rng.rand(4) * .5
+            index.update(i, bounds[i])
+        x = np.concatenate([bounds[:, 0], bounds[:, 0] + bounds[:, 2] / 2, bounds[:, 0] + bounds[:, 2]])
+        np.testing.assert_allclose(index.values('x'), np.sort(x))
+        for v in rng.rand(20):
+            nearest = x[np.abs(x - v).argmin()]
+            self.assertEqual(index.nearest(v, 'x', tol=1), nearest)
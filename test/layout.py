@@ -0,0 +1,180 @@
+import unittest
+import numpy as np
+from matplotlib import axes, figure
+from axpositioning import PositioningAxes, LayoutBox, AxesLayout, hsubplots
+from axpositioning.layout import split_bounds, grid_bounds
+
+
+class TestLayoutBox(unittest.TestCase):
+
+    def test_anchor(self):
+        bounds = (.1, .1, .8, .8)
+        b = LayoutBox(bounds, anchor='SW')
+        self.assertEqual(b.bounds, bounds)
+        self.assertEqual((b.x, b.y, b.w, b.h), bounds)
+
+        b.set_anchor('C')
+        self.assertEqual((b.x, b.y, b.w, b.h), (.5, .5, .8, .8))
+
+        b.set_anchor('NE')
+        self.assertEqual((b.x, b.y, b.w, b.h), (.9, .9, .8, .8))
+
+    def test_resize_anchor(self):
+        b = LayoutBox((.1, .1, .8, .8), anchor='C')
+        b.w = .4
+        b.h = .6
+        self.assertAlmostEqual(b.x, .5)
+        self.assertAlmostEqual(b.y, .5)
+        for v, expected in zip(b.bounds, (.3, .2, .4, .6)):
+            self.assertAlmostEqual(v, expected)
+
+    def test_locked_aspect(self):
+        b = LayoutBox((.1, .1, .4, .2), anchor='SW', lock_aspect=True, figaspect=2)
+        A = b.aspect
+        b.w = .2
+        self.assertAlmostEqual(b.h, .1)
+        self.assertAlmostEqual(b.aspect, A)
+
+        b.aspect = 1
+        self.assertAlmostEqual(b.aspect, 1)
+
+    def test_split(self):
+        b = LayoutBox((.1, .1, .8, .8), anchor='C')
+        newbounds = b.split(.5, .2)
+        for v, expected in zip(b.bounds, (.1, .1, .3, .8)):
+            self.assertAlmostEqual(v, expected)
+        for v, expected in zip(newbounds, (.6, .1, .3, .8)):
+            self.assertAlmostEqual(v, expected)
+        self.assertEqual(b.get_anchor(), (.5, .5))
+
+    def test_slots(self):
+        b = LayoutBox((.1, .1, .8, .8))
+        with self.assertRaises(AttributeError):
+            b.foo = 1
+
+    def test_axes_conversion(self):
+        fig = figure.Figure(figsize=(6, 3))
+        ax = axes.Axes(fig, [.1, .1, .8, .8])
+        b = LayoutBox.from_axes(ax, anchor='SW')
+        self.assertEqual(b.bounds, (.1, .1, .8, .8))
+        self.assertEqual(b.figaspect, 2)
+
+        b.w = .4
+        b.apply_to(ax)
+        self.assertEqual(ax.get_position().bounds, b.bounds)
+
+        p = PositioningAxes.from_box(fig, b)
+        self.assertEqual(p.bounds, b.bounds)
+        self.assertEqual(p.get_anchor(), (0, 0))
+        self.assertEqual(p.box.bounds, b.bounds)
+
+
+class TestAxesLayout(unittest.TestCase):
+
+    anchors = ['C', 'SW', 'NE', 'N', 'W']
+
+    def create(self, n=10, lock_aspect=False):
+        rng = np.random.RandomState(0)
+        bounds = np.column_stack([rng.rand(n, 2) * .5, .1 + rng.rand(n, 2) * .4])
+        anchors = [self.anchors[i % len(self.anchors)] for i in range(n)]
+        layout = AxesLayout(bounds, anchor=anchors, lock_aspect=lock_aspect, figaspect=1.5)
+        boxes = [LayoutBox(b, anchor=a, lock_aspect=lock_aspect, figaspect=1.5)
+                 for b, a in zip(bounds, anchors)]
+        return layout, boxes
+
+    def assertBoxesEqual(self, layout, boxes):
+        np.testing.assert_allclose(layout.bounds, [b.bounds for b in boxes])
+
+    def test_positions(self):
+        layout, boxes = self.create()
+        np.testing.assert_allclose(layout.x, [b.x for b in boxes])
+        np.testing.assert_allclose(layout.y, [b.y for b in boxes])
+        np.testing.assert_allclose(layout.aspect, [b.aspect for b in boxes])
+
+        layout.x = .5
+        layout.y = np.linspace(.1, .9, len(boxes))
+        for b, y in zip(boxes, np.linspace(.1, .9, len(boxes))):
+            b.x, b.y = .5, y
+        self.assertBoxesEqual(layout, boxes)
+
+    def test_resize(self):
+        for lock in (False, True):
+            layout, boxes = self.create(lock_aspect=lock)
+            layout.w = .2
+            layout.set_h(.3, index=[1, 3])
+            for i, b in enumerate(boxes):
+                b.w = .2
+                if i in (1, 3):
+                    b.h = .3
+            self.assertBoxesEqual(layout, boxes)
+
+    def test_aspect_ratio(self):
+        layout, boxes = self.create(lock_aspect=True)
+        layout.set_aspect_ratio(2)
+        layout.set_aspect_ratio(.5, fix_height=True, index=slice(0, 3))
+        for i, b in enumerate(boxes):
+            b.set_aspect_ratio(2)
+            if i < 3:
+                b.set_aspect_ratio(.5, fix_height=True)
+        self.assertBoxesEqual(layout, boxes)
+
+    def test_anchor(self):
+        layout, boxes = self.create()
+        layout.set_anchor('NE', index=[0, 2])
+        np.testing.assert_allclose(layout.anchors[[0, 2]], [(1, 1), (1, 1)])
+        self.assertEqual(layout.box(0).x, boxes[0].bounds[0] + boxes[0].w)
+
+    def test_boxes(self):
+        layout, boxes = self.create()
+        layout2 = AxesLayout.from_boxes(boxes)
+        np.testing.assert_array_equal(layout.bounds, layout2.bounds)
+        np.testing.assert_array_equal(layout.anchors, layout2.anchors)
+        self.assertEqual([b.bounds for b in layout.boxes()], [b.bounds for b in boxes])
+
+
+class TestSplit(unittest.TestCase):
+
+    def test_two_parts(self):
+        b = LayoutBox((.1, .1, .8, .8))
+        parts = split_bounds(b.bounds, .5, .2)
+        newbounds = b.split(.5, .2)
+        np.testing.assert_allclose(parts, [b.bounds, newbounds])
+
+    def test_n_parts(self):
+        parts = split_bounds((.1, .1, .8, .8), [1, 2, 1], [.1, .2], wsplit=False)
+        np.testing.assert_allclose(parts, [(.1, .1, .8, .125),
+                                           (.1, .325, .8, .25),
+                                           (.1, .775, .8, .125)])
+
+    def test_single_part(self):
+        # a one element sequence is the ratios of all parts, not a two part split
+        np.testing.assert_allclose(split_bounds((.1, .1, .8, .8), [1], .1), [(.1, .1, .8, .8)])
+        grid = grid_bounds((.1, .1, .8, .8), (1, 2), .1)
+        np.testing.assert_allclose(grid, [[(.1, .1, .35, .8), (.55, .1, .35, .8)]])
+
+    def test_many_boxes(self):
+        bounds = np.array([(.1, .1, .8, .8), (0, 0, .5, .5), (.2, .4, .1, .3)])
+        parts = split_bounds(bounds, np.ones(8), .01)
+        self.assertEqual(parts.shape, (3, 8, 4))
+        for bnd, p in zip(bounds, parts):
+            np.testing.assert_allclose(p, split_bounds(bnd, np.ones(8), .01))
+            np.testing.assert_allclose(p[-1, 0] + p[-1, 2], bnd[0] + bnd[2])
+
+    def test_axes_split(self):
+        fig = figure.Figure(figsize=(6, 6))
+        p = PositioningAxes(fig, (.1, .1, .8, .8))
+        newbounds = p.split([1, 1, 1, 1], .1)
+        self.assertEqual(newbounds.shape, (3, 4))
+        np.testing.assert_allclose(p.bounds, (.1, .1, .125, .8))
+
+    def test_spacing_too_large(self):
+        with self.assertRaises(ValueError):
+            split_bounds([(.1, .1, .8, .8), (.1, .1, .1, .1)], [1, 1, 1], .1)
+
+    def test_grid(self):
+        _, positions = hsubplots(5, (3, 4), hpad=.05, vpad=.02, box=(.1, .1, .9, .9))
+        grid = grid_bounds((.1, .1, .8, .8), (3, 4), .05, .02)
+        np.testing.assert_allclose(grid, positions)
+
+        grid = LayoutBox((0, 0, 1, 1)).grid_bounds((2, 2), height_ratios=[3, 1])
+        np.testing.assert_allclose(grid[:, 0], [(0, .25, .5, .75), (0, 0, .5, .25)])
@@ -0,0 +1,72 @@
+import unittest
+import numpy as np
+from matplotlib import figure
+from axpositioning import PositioningAxes
+from axpositioning.metrics import FigureMetrics
+
+
+class TestFigureMetrics(unittest.TestCase):
+
+    def test_values(self):
+        fig = figure.Figure(figsize=(6, 4), dpi=100)
+        m = FigureMetrics.of(fig)
+        self.assertEqual(m.size, (6, 4))
+        self.assertEqual(m.dpi, 100)
+        self.assertEqual(m.aspect, 1.5)
+        self.assertEqual(m.scale, (600, 400))
+        np.testing.assert_allclose(m.rel2abs(np.array([.1, .5]), 'x'), [60, 300])
+        np.testing.assert_allclose(m.bounds_rel2abs([[.1, .1, .5, .5]]), [[60, 40, 300, 200]])
+        np.testing.assert_allclose(m.bounds_abs2rel([[60, 40, 300, 200]]), [[.1, .1, .5, .5]])
+
+    def test_shared(self):
+        fig = figure.Figure(figsize=(6, 4))
+        a1 = PositioningAxes(fig, (.1, .1, .3, .3))
+        a2 = PositioningAxes(fig, (.5, .5, .3, .3))
+        self.assertIs(a1.metrics, a2.metrics)
+        self.assertIsNot(a1.metrics, FigureMetrics.of(figure.Figure()))
+
+    def test_invalidate(self):
+        fig = figure.Figure(figsize=(6, 4), dpi=100)
+        p = PositioningAxes(fig, (.1, .1, .5, .5))
+        self.assertEqual(p.figaspect, 1.5)
+        self.assertEqual(p.rel2abs(.5, 'w'), 300)
+
+        fig.set_size_inches(4, 4)
+        self.assertEqual(p.figaspect, 1)
+        self.assertEqual(p.rel2abs(.5, 'w'), 200)
+
+        fig.set_dpi(50)
+        self.assertEqual(p.rel2abs(.5, 'w'), 100)
+        self.assertEqual(p.absolute_bounds, (20, 20, 100, 100))
+        self.assertEqual(p.abs2rel(100, 'h'), .5)
+
+
+class TestUnitTransform(unittest.TestCase):
+
+    def test_units(self):
+        fig = figure.Figure(figsize=(6, 4), dpi=100)
+        m = FigureMetrics.of(fig)
+        bounds = np.array([[.1, .1, .5, .5], [0, 0, 1, 1]])
+        np.testing.assert_allclose(m.transform('relative', 'inches').transform_bounds(bounds),
+                                   bounds * [6, 4, 6, 4])
+        np.testing.assert_allclose(m.transform('relative', 'cm').transform(.5, 'w'), 7.62)
+        np.testing.assert_allclose(m.transform('inches', 'points').transform(1, 'y'), 72)
+        np.testing.assert_allclose(m.transform('pixels', 'cm').transform_points([[100, 100]]),
+                                   [[2.54, 2.54]])
+
+        t = m.transform('cm', 'pixels')
+        np.testing.assert_allclose(t.inverted().transform_bounds(t.transform_bounds(bounds)), bounds)
+        np.testing.assert_allclose(t.affine().transform([[2.54, 2.54]]), [[100, 100]])
+
+        with self.assertRaises(ValueError):
+            m.transform('relative', 'furlong')
+
+    def test_cache(self):
+        fig = figure.Figure(figsize=(6, 4), dpi=100)
+        t = FigureMetrics.of(fig).transform('relative', 'inches')
+        self.assertIs(FigureMetrics.of(fig).transform('relative', 'inches'), t)
+
+        fig.set_size_inches(3, 3)
+        t2 = FigureMetrics.of(fig).transform('relative', 'inches')
+        self.assertIsNot(t2, t)
+        np.testing.assert_allclose(t2.scale, (3, 3))
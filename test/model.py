@@ -0,0 +1,166 @@
+import unittest
+from matplotlib.figure import Figure
+from axpositioning.gui.model import AxesSet, axes_name, axes_name_index
+
+
+class TestAxesNames(unittest.TestCase):
+
+    def test_axes_name(self):
+        self.assertEqual([axes_name(i) for i in (0, 25, 26, 27, 51, 52, 701, 702)],
+                         ['A', 'Z', 'AA', 'AB', 'AZ', 'BA', 'ZZ', 'AAA'])
+        for i in range(1000):
+            self.assertEqual(axes_name_index(axes_name(i)), i)
+        self.assertIsNone(axes_name_index('a'))
+        self.assertIsNone(axes_name_index(''))
+
+
+class TestAxesSet(unittest.TestCase):
+
+    def setUp(self):
+        self.axes = AxesSet(Figure(), [(.1, .1, .1, .1)] * 60)
+
+    def test_names(self):
+        names = self.axes.names
+        self.assertEqual(names[:3], ['A', 'B', 'C'])
+        self.assertEqual(names[-1], 'BH')
+        self.assertEqual(len(set(names)), 60)
+
+        # freed names are reused first
+        self.axes.pop('B')
+        del self.axes['AC']
+        self.assertEqual(self.axes.next_axes_name(), 'B')
+        self.axes.add(.1, .1, .1, .1)
+        self.assertEqual(self.axes.next_axes_name(), 'AC')
+        self.axes.add(.1, .1, .1, .1)
+        self.assertEqual(self.axes.next_axes_name(), 'BI')
+
+    def test_index(self):
+        self.assertEqual(self.axes.name_at(2), 'C')
+        self.assertEqual(self.axes.index('C'), 2)
+        self.axes.pop('A')
+        self.assertEqual(self.axes.name_at(2), 'D')
+        self.assertEqual(self.axes.index('C'), 1)
+        self.axes.add(.1, .1, .1, .1)
+        self.assertEqual(self.axes.name_at(-1), 'A')
+        self.assertEqual(self.axes.index('A'), 59)
+
+    def test_change_order(self):
+        names = self.axes.names[::-1]
+        axes = [self.axes[n] for n in names]
+        self.axes.change_order(names)
+        self.assertEqual(self.axes.names, names)
+        self.assertEqual(list(self.axes.values()), axes)
+        self.assertEqual(self.axes.index(names[0]), 0)
+        with self.assertRaises(ValueError):
+            self.axes.change_order(names[1:])
+        with self.assertRaises(ValueError):
+            self.axes.change_order(names[1:] + ['?'])
+
+    def test_selection(self):
+        axes = self.axes
+        self.assertFalse(axes.any_selected())
+        axes.select('C')
+        axes['A']._selected = True
+        self.assertTrue(axes['C']._selected)
+        self.assertEqual(axes.selected_names, ['A', 'C'])
+        self.assertEqual(axes.selected, [axes['A'], axes['C']])
+        self.assertTrue(axes.any_selected())
+
+        # selection follows the row order
+        axes.change_order(axes.names[::-1])
+        self.assertEqual(axes.selected_names, ['C', 'A'])
+
+        # removed axes are deselected
+        a = axes.pop('C')
+        self.assertEqual(axes.selected_names, ['A'])
+        self.assertFalse(a._selected)
+
+        axes.select_all()
+        self.assertEqual(len(axes.selected), len(axes))
+        axes.select('B', False)
+        self.assertNotIn('B', axes.selected_names)
+        axes.select_none()
+        self.assertFalse(axes.any_selected())
+        with self.assertRaises(KeyError):
+            axes.select('?')
+
+    def test_selection_of_added_axes(self):
+        a = self.axes.pop('A')
+        a._selected = True
+        self.assertTrue(a._selected)
+        self.axes['X'] = a
+        self.assertEqual(a.axname, 'X')
+        self.assertEqual(self.axes.selected_names, ['X'])
+        with self.axes.batch(selected=True) as selected:
+            self.assertEqual(selected, [a])
+
+    def test_hit(self):
+        axes = AxesSet(Figure(), [(.1, .1, .3, .3), (.2, .2, .3, .3), (.6, .6, .2, .2)])
+        self.assertEqual(axes.hit(.25, .25), 'B')
+        self.assertEqual(axes.hit(.15, .15), 'A')
+        self.assertIsNone(axes.hit(.9, .1))
+        self.assertEqual(axes.names_in(0, 0, .55, .55, contain=True), ['A', 'B'])
+        self.assertEqual(axes.names_in(.45, .45, 1, 1), ['B', 'C'])
+
+        # the index follows position changes, also in a batch
+        axes['C'].x = .15
+        self.assertEqual(axes.hit(.2, .7), 'C')
+        with axes.batch(['A']):
+            axes['A'].y = .6
+            self.assertEqual(axes.hit(.15, .15), 'A')
+        self.assertIsNone(axes.hit(.15, .15))
+        axes.pop('C')
+        self.assertEqual(axes.hit(.2, .7), 'A')
+
+    def test_snap(self):
+        fig = Figure(figsize=(10, 10), dpi=100)
+        axes = AxesSet(fig, [(.1, .1, .3, .3), (.5, .5, .3, .3)], anchor='SW')
+
+        # within 5 pixels the left edge snaps to the right edge of A
+        axes.set_property('B', 'x', .404, snap=5)
+        self.assertAlmostEqual(axes['B'].x, .4)
+        axes.set_property('B', 'x', .406, snap=5)
+        self.assertAlmostEqual(axes['B'].x, .406)
+        axes.set_property('B', 'x', .253, snap=5)
+        self.assertAlmostEqual(axes['B'].x, .25)
+
+        # only the moving edges snap when resizing
+        axes.set_property('B', 'x', .05)
+        axes.set_property('B', 'w', .348, snap=5)
+        self.assertAlmostEqual(axes['B'].w, .35)
+        axes['A'].set_anchor('C')
+        axes.set_property('A', 'w', .296, snap=5)
+        self.assertAlmostEqual(axes['A'].w, .3)
+        self.assertAlmostEqual(axes['A'].x, .25)
+
+        # pixel values are snapped in relative coordinates
+        axes.set_property('B', 'y', 102, units='pixels', snap=5)
+        self.assertAlmostEqual(axes['B'].y, .1)
+
+    def test_changes(self):
+        axes = AxesSet(Figure(), [(.1, .1, .1, .1)] * 5)
+        self.assertEqual(axes.take_changes('canvas'), (['A', 'B', 'C', 'D', 'E'], True))
+        self.assertEqual(axes.take_changes('canvas'), ([], False))
+
+        axes['D'].x = .5
+        axes['B'].set_anchor('SW')
+        axes.select('E')
+        axes.select('E')
+        self.assertEqual(axes.take_changes('canvas'), (['B', 'D', 'E'], False))
+
+        # each view keeps its own changes
+        self.assertEqual(axes.take_changes('table'), (['A', 'B', 'C', 'D', 'E'], True))
+        with axes.batch(['A', 'C']):
+            axes['A'].y = .5
+            axes['C'].y = .5
+            self.assertEqual(axes.take_changes('table'), ([], False))
+        self.assertEqual(axes.take_changes('table'), (['A', 'C'], False))
+
+        axes.select_none()
+        axes.pop('A')
+        axes.change_order(axes.names[::-1])
+        self.assertEqual(axes.take_changes('canvas'), (['E', 'C'], True))
+
+        axes.mark_dirty(views=['table'])
+        self.assertEqual(axes.take_changes('table'), (['E', 'D', 'C', 'B'], True))
+        self.assertEqual(axes.take_changes('canvas'), ([], False))
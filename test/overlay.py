@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from matplotlib.figure import Figure
+from axpositioning.gui.overlay import box_vertices
+from axpositioning.gui.model import AxesSet
+
+
+class TestPlaceholderOverlay(unittest.TestCase):
+
+    def setUp(self):
+        self.fig = Figure(figsize=(6, 4))
+        self.axes = AxesSet(self.fig, [(.1, .1, .3, .3), (.5, .5, .2, .2), (.6, .1, .2, .2)], anchor='SW')
+
+    def test_box_vertices(self):
+        np.testing.assert_allclose(box_vertices([(.1, .2, .3, .4)]),
+                                   [[(.1, .2), (.4, .2), (.4, .6), (.1, .6)]])
+        self.assertEqual(box_vertices([]).shape, (0, 4, 2))
+
+    def test_update(self):
+        self.axes.select('B')
+        self.axes.plot_overlay()
+        overlay = self.axes.overlay
+        self.assertEqual(self.fig.artists, overlay.artists)
+        self.assertEqual(len(self.fig.artists), 3)
+        self.assertEqual(len(overlay.boxes.get_paths()), 3)
+        np.testing.assert_array_equal(overlay.boxes.get_linewidths(), [1, 2, 1])
+        np.testing.assert_allclose(overlay.anchors.get_offsets()[::2], [(.1, .1), (.5, .5), (.6, .1)])
+        self.assertEqual(len(overlay.labels.get_paths()), 3)
+        self.fig.canvas.draw()
+
+        # the artists are reused, also after the figure is cleared
+        artists = overlay.artists
+        self.fig.clear()
+        self.axes.plot_overlay(exclude='A')
+        self.assertEqual(self.fig.artists, artists)
+        self.assertEqual(len(overlay.boxes.get_paths()), 2)
+        np.testing.assert_allclose(overlay.anchors.get_offsets()[::2], [(.5, .5), (.6, .1)])
+
+        # text paths of the labels are cached
+        path = overlay.label_path('B')
+        self.assertIs(overlay.label_path('B'), path)
+        self.assertAlmostEqual(path.get_extents().y1, 0)
+
+        self.axes.clear()
+        self.axes.plot_overlay()
+        self.assertEqual(len(self.fig.artists), 0)
@@ -0,0 +1,43 @@
+import unittest
+from PyQt5 import QtCore
+from axpositioning.gui.scheduler import RedrawScheduler
+
+
+class TestRedrawScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    def setUp(self):
+        self.calls = []
+        self.scheduler = RedrawScheduler(lambda: self.calls.append('canvas'),
+                                         lambda: self.calls.append('table'))
+
+    def test_flush(self):
+        s = self.scheduler
+        s.request()
+        s.request(table=True)
+        s.request(canvas=False, table=True)
+        self.assertEqual(self.calls, [])
+        self.assertTrue(s.pending)
+        s.flush()
+        self.assertEqual(self.calls, ['canvas', 'table'])
+        self.assertEqual(s.stats(), dict(requests=3, flushes=1, coalesced=2))
+
+        # nothing to redraw
+        s.flush()
+        self.assertEqual(s.flushes, 1)
+        s.request(canvas=False)
+        self.assertFalse(s.pending)
+
+    def test_event_loop(self):
+        s = self.scheduler
+        for _ in range(10):
+            s.request()
+        s.request(table=True)
+        loop = QtCore.QEventLoop()
+        QtCore.QTimer.singleShot(0, loop.quit)
+        loop.exec_()
+        self.assertEqual(self.calls, ['canvas', 'table'])
+        self.assertEqual(s.coalesced, 10)
@@ -0,0 +1,180 @@
+import unittest
+import weakref
+import numpy as np
+from matplotlib.cm import ScalarMappable
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from axpositioning import hsubplots, xyshared_plots
+from axpositioning.bench import scatter_panel
+from axpositioning.subplots import _union_limits
+
+
+def hsubplots_loop(figwidth, shape, hpad=0, vpad=0, box=(0, 0, 1, 1), ax_aspect=1):
+    """reference implementation with uniform sizes and paddings"""
+    m, n = shape
+    axwidth = (box[2] - box[0] - hpad * (n - 1)) / n
+    axheight = (box[3] - box[1] - vpad * (m - 1)) / m
+    figheight = figwidth * (axwidth / axheight) * ax_aspect
+
+    axpos = []
+    for i in range(m):
+        axpos.append([])
+        for j in range(n):
+            x = box[0] + j * axwidth + j * hpad
+            y = box[1] + i * axheight + i * vpad
+            axpos[-1].append([x, y, axwidth, axheight])
+    return (figwidth, figheight), np.array(axpos[::-1])
+
+
+class TestHSubplots(unittest.TestCase):
+
+    def test_uniform(self):
+        for shape in [(1, 1), (2, 3), (5, 1), (30, 40)]:
+            kw = dict(hpad=.01, vpad=.005, box=(.08, .07, .9, .95), ax_aspect=1.5)
+            figsize, positions = hsubplots(10, shape, **kw)
+            figsize0, positions0 = hsubplots_loop(10, shape, **kw)
+            np.testing.assert_allclose(figsize, figsize0)
+            np.testing.assert_allclose(positions, positions0)
+            self.assertEqual(positions.shape, shape + (4,))
+
+    def test_ratios(self):
+        figsize, positions = hsubplots(10, (2, 3), hpad=.1, vpad=[.2],
+                                       width_ratios=[1, 2, 1], height_ratios=[3, 1])
+        figsize0, _ = hsubplots_loop(10, (2, 3), hpad=.1, vpad=.2)
+        self.assertEqual(figsize, figsize0)
+
+        # widths per column, heights per row (top row first)
+        np.testing.assert_allclose(positions[0, :, 2], [.2, .4, .2])
+        np.testing.assert_allclose(positions[:, 0, 3], [.6, .2])
+        np.testing.assert_allclose(positions[0, :, 1], .4)
+        np.testing.assert_allclose(positions[1, :, 1], 0, atol=1e-12)
+        np.testing.assert_allclose(positions[:, 2, 0] + positions[:, 2, 2], 1)
+
+    def test_padding_arrays(self):
+        _, positions = hsubplots(10, (3, 3), hpad=[.1, 0], vpad=[0, .1])
+        x = positions[0, :, 0]
+        w = positions[0, :, 2]
+        np.testing.assert_allclose(x[1:] - (x[:-1] + w[:-1]), [.1, 0], atol=1e-12)
+        y = positions[:, 0, 1]
+        h = positions[:, 0, 3]
+        np.testing.assert_allclose(y[:-1] - (y[1:] + h[1:]), [0, .1], atol=1e-12)
+
+
+class TestXYSharedPlots(unittest.TestCase):
+
+    def setUp(self):
+        figsize, positions = hsubplots(4, (2, 2), hpad=.02, vpad=.02, box=(.1, .1, .9, .9))
+        self.fig = Figure(figsize=figsize, dpi=50)
+        self.axes = [self.fig.add_axes(pos) for pos in positions.reshape(-1, 4)]
+        rng = np.random.RandomState(0)
+        self.datasets = [dict(x=rng.rand(20), y=rng.rand(20), z=rng.rand(20)) for _ in range(4)]
+
+    def test_serial(self):
+        r = xyshared_plots((2, 2), self.axes, self.datasets, scatter_panel, 'x', 'y', labels='A')
+        self.assertEqual(len(self.axes[-1].collections), 1)
+        self.assertIs(r, self.axes[-1].collections[0])
+        self.assertEqual(self.axes[2].get_xlabel(), 'x')
+        self.assertEqual(self.axes[0].get_xlabel(), '')
+
+    def test_interior_tick_labels(self):
+        for kw in [{}, dict(processes=2)]:
+            self.setUp()
+            FigureCanvasAgg(self.fig)
+            xyshared_plots((2, 2), self.axes, self.datasets, scatter_panel, 'x', 'y', **kw)
+            self.fig.canvas.draw()
+            a0, a1, a2, a3 = self.axes
+            for axis in [a0.xaxis, a1.xaxis, a1.yaxis, a3.yaxis]:
+                labels = [t.label1 for t in axis.get_major_ticks() + axis.get_minor_ticks()]
+                self.assertFalse(any(t.get_visible() for t in labels))
+                self.assertEqual([t.get_text() for t in labels if t.get_text()], [])
+            for axis in [a2.xaxis, a0.yaxis]:
+                self.assertTrue(any(t.get_text() for t in axis.get_ticklabels()))
+
+    def test_processes(self):
+        r = xyshared_plots((2, 2), self.axes, self.datasets, scatter_panel, 'x', 'y',
+                           labels='A', processes=2)
+        self.assertIsInstance(r, ScalarMappable)
+        for ax in self.axes:
+            self.assertEqual(len(ax.images), 1)
+            self.assertEqual(len(ax.collections), 0)
+            np.testing.assert_allclose(ax.get_xlim(), (-.1, 1.1))
+            np.testing.assert_allclose(ax.get_ylim(), (-.1, 1.1))
+        self.assertEqual(self.axes[0].get_ylabel(), 'y')
+        self.assertEqual(self.axes[1].get_ylabel(), '')
+        self.fig.canvas.draw()
+
+    def test_share(self):
+        xyshared_plots((2, 2), self.axes, self.datasets, scatter_panel, 'x', 'y', share=True)
+        a0, a1, a2, a3 = self.axes
+        self.assertIs(a3.xaxis.major, a0.xaxis.major)
+        self.assertIn(a3, a0.get_shared_x_axes().get_siblings(a0))
+        self.assertIn(a3, a0.get_shared_y_axes().get_siblings(a0))
+
+        # only outer panels have tick labels, without fixing the formatter
+        self.assertFalse(a0.xaxis._major_tick_kw['label1On'])
+        self.assertTrue(a2.xaxis._major_tick_kw.get('label1On', True))
+        self.assertFalse(a1.yaxis._major_tick_kw['label1On'])
+        self.assertNotIn('Fixed', type(a0.xaxis.get_major_formatter()).__name__)
+        FigureCanvasAgg(self.fig).draw()
+        self.assertFalse(any(t.label1.get_visible() for t in a0.xaxis.get_major_ticks()))
+        self.assertTrue(any(t.get_text() for t in a2.xaxis.get_ticklabels()))
+
+    def test_share_processes(self):
+        xyshared_plots((2, 2), self.axes, self.datasets, scatter_panel, 'x', 'y',
+                       processes=2, share=True)
+        for ax in self.axes:
+            self.assertEqual(len(ax.images), 1)
+            np.testing.assert_allclose(ax.images[0].get_extent(), (-.1, 1.1, -.1, 1.1))
+            np.testing.assert_allclose(ax.get_xlim(), (-.1, 1.1))
+        self.fig.canvas.draw()
+
+    def test_union_limits(self):
+        self.assertEqual(_union_limits([(0, 1), (-1, .5)]), (-1, 1))
+        self.assertEqual(_union_limits([(1, 0), (-1, .5)]), (1, -1))
+
+    def test_lazy_datasets(self):
+        loaded = []
+
+        def load(i):
+            loaded.append(i)
+            return self.datasets[i]
+
+        def plotfn(ax, d):
+            # panels are loaded one at a time right before plotting
+            self.assertEqual(loaded[-1], self.axes.index(ax))
+            return scatter_panel(ax, d)
+
+        xyshared_plots((2, 2), self.axes, load, plotfn, 'x', 'y')
+        self.assertEqual(loaded, [0, 1, 2, 3])
+
+        fig = Figure()
+        axes = [fig.add_subplot(2, 2, i + 1) for i in range(4)]
+        xyshared_plots((2, 2), axes, iter(self.datasets), scatter_panel, 'x', 'y')
+        self.assertEqual([len(ax.collections) for ax in axes], [1, 1, 1, 1])
+
+    def test_lazy_datasets_released(self):
+        class Dataset(object):
+            def __init__(self, d):
+                self.x, self.y, self.z = d['x'], d['y'], d['z']
+
+        refs = []
+
+        def load(i):
+            # the dataset of the previous panel is no longer referenced
+            if refs:
+                self.assertIsNone(refs[-1]())
+            d = Dataset(self.datasets[i])
+            refs.append(weakref.ref(d))
+            return d
+
+        def plotfn(ax, d):
+            return ax.scatter(d.x, d.y, c=d.z)
+
+        xyshared_plots((2, 2), self.axes, load, plotfn, 'x', 'y')
+        self.assertEqual(len(refs), 4)
+
+    def test_lazy_datasets_processes(self):
+        datasets = (d for d in self.datasets)
+        xyshared_plots((2, 2), self.axes, datasets, scatter_panel, 'x', 'y',
+                       processes=2)
+        self.assertEqual([len(ax.images) for ax in self.axes], [1, 1, 1, 1])
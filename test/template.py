@@ -0,0 +1,107 @@
+import unittest
+import io
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import FixedLocator
+from matplotlib.colors import to_hex
+from axpositioning import hsubplots, PositioningAxes, LayoutTemplate
+
+
+def plotfn(axes, d):
+    for i, ax in enumerate(axes):
+        ax.scatter(d['x'] * (i + 1), d['y'], c=d['z'], lw=0)
+        ax.plot(d['x'], d['y'], 'k-')
+        ax.plot(d['x'], d['y'] * .5)
+    axes[0].set_xticks([0, .5, 1])
+    axes[0].set_yscale('log')
+    axes[0].set_title(d['title'])
+    axes[-1].legend(['a', 'b'])
+    axes[-1].figure.text(.5, .98, d['title'])
+
+
+def render(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format='rgba')
+    return buf.getvalue()
+
+
+class TestLayoutTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.figsize, self.positions = hsubplots(4, (2, 2), hpad=.05, vpad=.05, box=(.1, .1, .9, .9))
+        rng = np.random.RandomState(0)
+        self.datasets = [dict(x=rng.rand(20), y=rng.rand(20) + .1, z=rng.rand(20), title=str(i))
+                         for i in range(3)]
+
+    def test_reuse(self):
+        template = LayoutTemplate.from_hsubplots(self.figsize, self.positions, dpi=50)
+        fig = template.figure
+        axes = list(template.axes)
+        n_children = [len(ax.get_children()) for ax in axes]
+        n_fig_children = len(fig.get_children())
+        locator = axes[0].xaxis.get_major_locator()
+
+        figures = list(template.render(self.datasets, plotfn))
+        self.assertTrue(all(f is fig for f in figures))
+        self.assertEqual(len(axes[0].collections), 1)
+        self.assertEqual(axes[0].get_title(), '2')
+
+        template.clear()
+        self.assertEqual(fig.axes, axes)
+        self.assertEqual([len(ax.get_children()) for ax in axes], n_children)
+        self.assertEqual(len(fig.get_children()), n_fig_children)
+        self.assertIs(axes[0].xaxis.get_major_locator(), locator)
+        self.assertEqual(axes[0].get_yscale(), 'linear')
+        self.assertEqual(axes[0].get_title(), '')
+        self.assertIsNone(axes[-1].get_legend())
+
+    def test_prop_cycle(self):
+        template = LayoutTemplate.from_hsubplots(self.figsize, self.positions, dpi=50)
+        colors = []
+        for i in range(3):
+            template.plot(lambda axes, d: axes[0].plot([0, 1], [0, d]), i)
+            colors.append(to_hex(template.axes[0].lines[-1].get_color()))
+        self.assertEqual(colors, [to_hex('C0')] * 3)
+
+    def test_same_as_rebuild(self):
+        template = LayoutTemplate.from_hsubplots(self.figsize, self.positions, dpi=50)
+        for d in self.datasets:
+            fig = Figure(figsize=self.figsize, dpi=50)
+            FigureCanvasAgg(fig)
+            plotfn([fig.add_axes(pos) for pos in self.positions.reshape(-1, 4)], d)
+            self.assertEqual(render(template.plot(plotfn, d)), render(fig))
+
+    def test_decorate(self):
+        def decorate(fig, axes):
+            axes[0].axhline(.5)
+            axes[0].xaxis.set_major_locator(FixedLocator([.2]))
+
+        template = LayoutTemplate(self.figsize, self.positions, decorate=decorate)
+        template.plot(plotfn, self.datasets[0])
+        template.clear()
+        ax = template.axes[0]
+        self.assertEqual(len(ax.lines), 1)
+        np.testing.assert_allclose(ax.get_xticks(), [.2])
+
+    def test_decorate_prop_cycle(self):
+        def decorate(fig, axes):
+            axes[0].set_prop_cycle(color=['r', 'g', 'b'])
+            axes[0].plot([0, 1], [1, 1])
+
+        template = LayoutTemplate(self.figsize, self.positions, decorate=decorate)
+        colors = []
+        for i in range(3):
+            template.plot(lambda axes, d: axes[0].plot([0, 1], [0, d]), i)
+            colors.append(to_hex(template.axes[0].lines[-1].get_color()))
+        self.assertEqual(colors, [to_hex('g')] * 3)
+
+    def test_from_axes(self):
+        fig = Figure(figsize=(6, 4), dpi=80)
+        axes = [PositioningAxes(fig, b) for b in [(.1, .1, .3, .3), (.5, .5, .4, .4)]]
+        template = LayoutTemplate.from_axes(axes)
+        self.assertEqual(template.figsize, (6, 4))
+        self.assertEqual(template.figure.dpi, 80)
+        np.testing.assert_allclose(template.bounds, [(.1, .1, .3, .3), (.5, .5, .4, .4)])
+        with self.assertRaises(ValueError):
+            LayoutTemplate.from_axes([])
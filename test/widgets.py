@@ -0,0 +1,45 @@
+import unittest
+from matplotlib.figure import Figure
+from PyQt5 import QtCore
+from axpositioning.gui.model import AxesSet
+from axpositioning.gui.widgets import AxesTableModel
+
+
+class TestAxesTableModel(unittest.TestCase):
+
+    def setUp(self):
+        self.axes = AxesSet(Figure(figsize=(4, 4), dpi=100), [(.1, .1, .2, .2)] * 5, anchor='SW')
+        self.model = AxesTableModel(self.axes)
+        self.changes = []
+        self.model.dataChanged.connect(lambda a, b: self.changes.append((a.row(), b.row())))
+
+    def test_data(self):
+        m = self.model
+        self.assertEqual((m.rowCount(), m.columnCount()), (5, 6))
+        self.assertEqual(m.headerData(2, QtCore.Qt.Vertical), 'C')
+        self.assertEqual(m.headerData(3, QtCore.Qt.Horizontal), 'Width')
+        self.assertEqual(m.data(m.index(1, 1)), '0.100')
+        self.assertEqual(m.data(m.index(1, 0), QtCore.Qt.CheckStateRole), QtCore.Qt.Unchecked)
+        self.axes.select('B')
+        self.assertEqual(m.data(m.index(1, 0), QtCore.Qt.CheckStateRole), QtCore.Qt.Checked)
+
+        # the values are formatted in the current units
+        m.set_units(units='pixels')
+        self.assertEqual(m.data(m.index(1, 3)), '80')
+        self.assertEqual(self.changes, [(0, 4)])
+
+    def test_set_data(self):
+        m = self.model
+        changed, invalid = [], []
+        m.changed.connect(lambda *args: changed.append(args))
+        m.invalid_value.connect(lambda *args: invalid.append(args))
+
+        self.assertTrue(m.setData(m.index(2, 1), '0.5'))
+        self.assertTrue(m.setData(m.index(3, 0), QtCore.Qt.Checked, QtCore.Qt.CheckStateRole))
+        self.assertFalse(m.setData(m.index(2, 2), 'abc'))
+        self.assertEqual(changed, [(2, 'x', .5), (3, '_selected', True)])
+        self.assertEqual(invalid, [(2, 2, 'y')])
+
+    def test_update_rows(self):
+        self.model.update_rows(['E', 'B', 'A', 'D'])
+        self.assertEqual(self.changes, [(0, 1), (3, 4)])